@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Infer constraint tags for every config file under a directory",
+    )
+    parser.add_argument("root", type=str, help="Directory to audit")
+    parser.add_argument(
+        "--glob",
+        action="append",
+        help="Repeatable file pattern (default: JSON/YAML/TOML/INI/CFG)",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help="Skip files unchanged since this manifest (created if missing)",
+    )
+    parser.add_argument(
+        "--rules", type=str, default=None, help="Constraint rules file (JSON/YAML)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--max-nodes",
+        type=int,
+        default=None,
+        help="Stop analyzing a file after this many nodes",
+    )
+    parser.add_argument(
+        "--sample-arrays",
+        type=int,
+        default=None,
+        help="Keep only the first N items of each JSON array as nodes",
+    )
+    parser.add_argument("--files", action="store_true", help="Print tags per file")
+    parser.add_argument("--json", type=str, default=None, help="Also write JSON here")
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(repo_root / "src"))
+
+    from maus.python.core.config_tree import TreeStats
+    from maus.python.core.constraint_rules import ConstraintRules
+    from maus.python.core.semantic_config import SemanticConfigAnalyzer
+
+    root = Path(args.root)
+    if not root.is_dir():
+        print(f"Not a directory: {root}")
+        return 1
+    rules = ConstraintRules.from_file(args.rules) if args.rules else None
+    analyzer = SemanticConfigAnalyzer(rules)
+    stats = TreeStats()
+    files = []
+    for result in analyzer.analyze_tree(
+        root,
+        args.glob,
+        manifest_path=args.manifest,
+        workers=args.workers,
+        max_nodes=args.max_nodes,
+        sample_arrays=args.sample_arrays,
+        stats=stats,
+    ):
+        files.append(
+            {"path": result.path, "tags": result.tags, "cached": result.cached}
+            | ({"error": result.error} if result.error else {})
+        )
+        if args.files:
+            note = f"  [{result.error}]" if result.error else ""
+            print(f"{result.path}: {' '.join(result.tags) or '-'}{note}")
+
+    report = stats.to_dict()
+    print(
+        f"{stats.files} files | analyzed {stats.analyzed} | unchanged "
+        f"{stats.unchanged + stats.rehashed} | errors {stats.errors} | "
+        f"{stats.seconds:.2f}s on {stats.workers} worker(s), "
+        f"efficiency {stats.parallel_efficiency:.0%}"
+    )
+    for tag, count in report["tag_counts"].items():
+        print(f"  {tag:<20} {count}")
+    if report["slowest"]:
+        print("Slowest files:")
+        for entry in report["slowest"]:
+            print(f"  {entry['ms']:>10.3f} ms  {entry['path']}")
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps({"stats": report, "files": files}, indent=2), encoding="utf-8"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,75 +3,239 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, TextIO
 
+if TYPE_CHECKING:
+    from maus.python.analysis.ast_diff import ASTNode
+    from maus.python.analysis.hash_cache import HashCache
 
-def _load_nodes(data: dict) -> list[dict[str, Any]]:
-    nodes = data.get("nodes")
-    if isinstance(nodes, list):
-        return [n for n in nodes if isinstance(n, dict)]
+JSONL_SUFFIXES = {".jsonl", ".ndjson"}
+
+
+def _load_nodes(data: dict | list) -> list[dict[str, Any]]:
     # Backward-compat: allow top-level list
     if isinstance(data, list):
         return [n for n in data if isinstance(n, dict)]
+    nodes = data.get("nodes")
+    if isinstance(nodes, list):
+        return [n for n in nodes if isinstance(n, dict)]
     return []
 
 
-def _to_ast_nodes(nodes_raw: list[dict[str, Any]]) -> list[Any]:
-    from maus_doc.ast_diff import ASTNode, hash_content
-
-    ast_nodes: list[ASTNode] = []
-    for d in nodes_raw:
-        node_id = str(d.get("id", ""))
-        node_type = str(d.get("type", "DOCUMENT"))
-        path = str(d.get("path", ""))
-        weight = float(d.get("weight", 1.0))
-        content_hash = d.get("content_hash")
-        if not content_hash:
-            content = d.get("content", "")
-            content_hash = hash_content(str(content))
-        ast_nodes.append(
-            ASTNode(
-                id=node_id,
-                type=node_type,  # type: ignore[arg-type]
-                content_hash=str(content_hash),
-                path=path,
-                weight=weight,
+def _is_jsonl(path: Path, fmt: str) -> bool:
+    if fmt != "auto":
+        return fmt == "jsonl"
+    return path.suffix.lower() in JSONL_SUFFIXES
+
+
+def _iter_jsonl(path: Path) -> Iterator[dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                d = json.loads(line)
+                if isinstance(d, dict):
+                    yield d
+
+
+def _read_raw(path: Path, fmt: str) -> list[dict[str, Any]]:
+    if _is_jsonl(path, fmt):
+        return list(_iter_jsonl(path))
+    return _load_nodes(json.loads(path.read_text(encoding="utf-8")))
+
+
+def _iter_raw_sorted(path: Path, fmt: str) -> Iterator[dict[str, Any]]:
+    """JSON-lines are streamed as-is (must be id-sorted); JSON is sorted here."""
+    if _is_jsonl(path, fmt):
+        return _iter_jsonl(path)
+    nodes = _load_nodes(json.loads(path.read_text(encoding="utf-8")))
+    # Stable sort keeps the last duplicate last, as compute_delta expects
+    return iter(sorted(nodes, key=lambda d: str(d.get("id", ""))))
+
+
+def _ref(n: ASTNode) -> dict[str, Any]:
+    return {"id": n.id, "type": n.type, "path": n.path}
+
+
+def _stream_delta(
+    args: argparse.Namespace, cache: HashCache | None, out: TextIO
+) -> int:
+    """
+    Write one JSON record per delta entry as the merge-join produces it,
+    then a trailing summary record. With --moves, added/removed records are
+    held (O(changes) memory) until the inputs end, for move pairing; only
+    modified records stream.
+    """
+    from maus.python.analysis.ast_diff import (
+        ASTDelta,
+        iter_delta_sorted,
+        node_from_dict,
+        pair_moves,
+    )
+    from maus.python.analysis.hash_cache import HashStats, iter_hashed
+
+    with_sketch = args.near_duplicates is not None
+    stats = HashStats()
+    counts = {"added": 0, "removed": 0, "modified": 0, "moved": 0}
+
+    def nodes(path: str) -> Iterator[ASTNode]:
+        raw = _iter_raw_sorted(Path(path), args.input_format)
+        for d in iter_hashed(raw, stats, cache, args.workers):
+            yield node_from_dict(d, with_sketch)
+
+    def emit(record: dict[str, Any]) -> None:
+        counts[record["kind"]] += 1
+        out.write(json.dumps(record) + "\n")
+
+    held = ASTDelta(added=[], removed=[], modified=[])
+    try:
+        for rec in iter_delta_sorted(nodes(args.old), nodes(args.new)):
+            if rec.kind == "modified":
+                emit({"kind": "modified", "old": _ref(rec.old), "new": _ref(rec.new)})
+            elif args.moves:
+                (held.added if rec.kind == "added" else held.removed).append(
+                    rec.new if rec.kind == "added" else rec.old
+                )
+            elif rec.kind == "added":
+                emit({"kind": "added", "node": _ref(rec.new)})
+            else:
+                emit({"kind": "removed", "node": _ref(rec.old)})
+    except (OSError, ValueError) as exc:
+        out.flush()
+        print(f"Streaming diff failed: {exc}", file=sys.stderr)
+        return 2
+
+    if args.moves:
+        paired = pair_moves(held, args.near_duplicates)
+        for n in paired.added:
+            emit({"kind": "added", "node": _ref(n)})
+        for n in paired.removed:
+            emit({"kind": "removed", "node": _ref(n)})
+        for o, n in paired.moved:
+            emit(
+                {
+                    "kind": "moved",
+                    "old": _ref(o),
+                    "new": _ref(n),
+                    "content_changed": o.content_hash != n.content_hash,
+                }
             )
-        )
-    return ast_nodes
+
+    out.write(
+        json.dumps({"kind": "summary", "counts": counts, "hashing": stats.to_dict()})
+        + "\n"
+    )
+    if cache is not None:
+        cache.save()
+    return 0
+
+
+def _to_ast_nodes(
+    nodes_raw: list[dict[str, Any]], with_sketch: bool = False
+) -> list[Any]:
+    from maus.python.analysis.ast_diff import node_from_dict
+
+    return [node_from_dict(d, with_sketch) for d in nodes_raw]
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Compute AST differential between two snapshots",
     )
-    parser.add_argument("old", help="Path to old AST JSON snapshot")
-    parser.add_argument("new", help="Path to new AST JSON snapshot")
+    parser.add_argument("old", help="Path to old AST JSON/JSON-lines snapshot")
+    parser.add_argument("new", help="Path to new AST JSON/JSON-lines snapshot")
     parser.add_argument(
         "--json", action="store_true", help="Output results as JSON"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write one JSON delta record per line while diffing "
+        "(JSON-lines inputs must be sorted by id; implies --no-moves unless "
+        "--moves is given)",
+    )
+    parser.add_argument(
+        "--input-format",
+        choices=["auto", "json", "jsonl"],
+        default="auto",
+        help="Snapshot format (auto: .jsonl/.ndjson are JSON-lines)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Hashing threads (default: CPU count; 1 disables the pool)",
+    )
+    parser.add_argument(
+        "--hash-cache",
+        type=str,
+        default=None,
+        help="Persistent hash cache (default: build/cache/ast_hashes.json)",
+    )
+    parser.add_argument(
+        "--no-hash-cache", action="store_true", help="Disable the hash cache"
+    )
+    parser.add_argument(
+        "--moves",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Pair removed + added nodes with the same content as moved "
+        "(default: on, except with --stream)",
+    )
+    parser.add_argument(
+        "--near-duplicates",
+        type=float,
+        default=None,
+        metavar="SIMILARITY",
+        help="Also pair near-duplicate content (MinHash similarity, e.g. 0.8)",
+    )
     args = parser.parse_args()
 
     repo_root = Path(__file__).resolve().parents[1]
     sys.path.insert(0, str(repo_root / "src"))
 
-    from maus_doc.ast_diff import compute_delta, prioritize_insertions
+    from maus.python.analysis.ast_diff import compute_delta, prioritize_insertions
+    from maus.python.analysis.hash_cache import HashCache, fill_content_hashes
 
     old_path = Path(args.old)
     new_path = Path(args.new)
 
+    cache = None
+    if not args.no_hash_cache:
+        cache = HashCache(
+            args.hash_cache or repo_root / "build" / "cache" / "ast_hashes.json"
+        )
+
+    if args.moves is None:
+        # Move pairing needs every added/removed node, which would hold back
+        # most of a streamed diff until the inputs end
+        args.moves = not args.stream
+    if args.stream:
+        return _stream_delta(args, cache, sys.stdout)
+
     try:
-        old_data = json.loads(old_path.read_text(encoding="utf-8"))
-        new_data = json.loads(new_path.read_text(encoding="utf-8"))
+        old_raw = _read_raw(old_path, args.input_format)
+        new_raw = _read_raw(new_path, args.input_format)
     except Exception as exc:  # pragma: no cover
         print(f"Failed to read snapshots: {exc}")
         return 1
 
-    old_nodes = _to_ast_nodes(_load_nodes(old_data))
-    new_nodes = _to_ast_nodes(_load_nodes(new_data))
+    hash_stats = fill_content_hashes([*old_raw, *new_raw], cache, args.workers)
+    if cache is not None:
+        cache.save()
 
-    delta = compute_delta(old_nodes, new_nodes)
+    with_sketch = args.near_duplicates is not None
+    old_nodes = _to_ast_nodes(old_raw, with_sketch)
+    new_nodes = _to_ast_nodes(new_raw, with_sketch)
+
+    delta = compute_delta(
+        old_nodes,
+        new_nodes,
+        detect_moves=args.moves,
+        near_threshold=args.near_duplicates,
+    )
     ordered_add = prioritize_insertions(delta)
 
     if args.json:
@@ -80,6 +244,7 @@ def main() -> int:
                 "added": len(delta.added),
                 "removed": len(delta.removed),
                 "modified": len(delta.modified),
+                "moved": len(delta.moved),
             },
             "added": [
                 {"id": n.id, "type": n.type, "path": n.path} for n in delta.added
@@ -94,9 +259,18 @@ def main() -> int:
                 }
                 for (o, n) in delta.modified
             ],
+            "moved": [
+                {
+                    "old": {"id": o.id, "type": o.type, "path": o.path},
+                    "new": {"id": n.id, "type": n.type, "path": n.path},
+                    "content_changed": o.content_hash != n.content_hash,
+                }
+                for (o, n) in delta.moved
+            ],
             "prioritized_insertions": [
                 {"id": n.id, "type": n.type, "path": n.path} for n in ordered_add
             ],
+            "hashing": hash_stats.to_dict(),
         }
         print(json.dumps(out, indent=2))
         return 0
@@ -104,7 +278,7 @@ def main() -> int:
     # Human-readable output
     print(
         f"Added: {len(delta.added)} | Removed: {len(delta.removed)} | "
-        f"Modified: {len(delta.modified)}"
+        f"Modified: {len(delta.modified)} | Moved: {len(delta.moved)}"
     )
     if delta.added:
         print("\nAdded:")
@@ -118,6 +292,10 @@ def main() -> int:
         print("\nModified:")
         for (o, n) in delta.modified:
             print(f"  ~ {o.type} {o.id} @ {o.path} -> {n.path}")
+    if delta.moved:
+        print("\nMoved:")
+        for (o, n) in delta.moved:
+            print(f"  > {o.type} {o.id} @ {o.path} -> {n.id} @ {n.path}")
     return 0
 
 
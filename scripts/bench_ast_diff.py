@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+
+def _max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def synthetic_nodes(n: int, version: int, change_every: int) -> Iterator[Any]:
+    """Sorted synthetic snapshot; every `change_every`-th node differs."""
+    from maus.python.analysis.ast_diff import ASTNode
+
+    for i in range(n):
+        changed = version and i % change_every == 0
+        # drop one node and add one node per change window between versions
+        if version and i % change_every == 1:
+            continue
+        if not version and i % change_every == 2:
+            continue
+        yield ASTNode(
+            id=f"n{i:010d}",
+            type="DATA",
+            content_hash=f"{i:x}{'*' if changed else ''}",
+            # fan-out of 100 per directory level
+            path=f"Docs/{i // 10**6}/{i // 10**4 % 100}/{i // 100 % 100}/{i}.md",
+        )
+
+
+def bench_stream(n: int, change_every: int) -> dict[str, Any]:
+    from maus.python.analysis.ast_diff import iter_delta_sorted
+
+    counts = {"added": 0, "removed": 0, "modified": 0}
+    rss0 = _max_rss_mb()
+    t0 = time.perf_counter()
+    for rec in iter_delta_sorted(
+        synthetic_nodes(n, 0, change_every), synthetic_nodes(n, 1, change_every)
+    ):
+        counts[rec.kind] += 1
+    dt = time.perf_counter() - t0
+    return {
+        "mode": "stream",
+        "nodes": n,
+        "seconds": round(dt, 3),
+        "nodes_per_sec": round(2 * n / dt),
+        "rss_growth_mb": round(_max_rss_mb() - rss0, 1),
+        "counts": counts,
+    }
+
+
+def bench_dict(n: int, change_every: int) -> dict[str, Any]:
+    from maus.python.analysis.ast_diff import compute_delta
+
+    rss0 = _max_rss_mb()
+    t0 = time.perf_counter()
+    delta = compute_delta(
+        synthetic_nodes(n, 0, change_every), synthetic_nodes(n, 1, change_every)
+    )
+    dt = time.perf_counter() - t0
+    return {
+        "mode": "dict",
+        "nodes": n,
+        "seconds": round(dt, 3),
+        "nodes_per_sec": round(2 * n / dt),
+        "rss_growth_mb": round(_max_rss_mb() - rss0, 1),
+        "counts": {
+            "added": len(delta.added),
+            "removed": len(delta.removed),
+            "modified": len(delta.modified),
+        },
+    }
+
+
+def bench_merkle(n: int, change_every: int) -> dict[str, Any]:
+    from maus.python.analysis.ast_diff import (
+        MerkleSnapshot,
+        compute_delta,
+        compute_delta_merkle,
+    )
+
+    old_nodes = list(synthetic_nodes(n, 0, change_every))
+    new_nodes = list(synthetic_nodes(n, 1, change_every))
+    t0 = time.perf_counter()
+    old = MerkleSnapshot.build(old_nodes)
+    new = MerkleSnapshot.build(new_nodes)
+    t_build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    delta = compute_delta_merkle(old, new)
+    t_diff = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    compute_delta(old_nodes, new_nodes)
+    t_flat = time.perf_counter() - t0
+    return {
+        "mode": "merkle",
+        "nodes": n,
+        "changed_fraction": 1 / change_every,
+        "build_seconds": round(t_build, 3),
+        "diff_seconds": round(t_diff, 4),
+        "compute_delta_seconds": round(t_flat, 3),
+        "counts": {
+            "added": len(delta.added),
+            "removed": len(delta.removed),
+            "modified": len(delta.modified),
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark AST diff strategies")
+    parser.add_argument("--nodes", type=int, default=10**7)
+    parser.add_argument("--change-every", type=int, default=1000)
+    parser.add_argument(
+        "--mode",
+        choices=["stream", "dict", "merkle"],
+        action="append",
+        help="Repeatable; defaults to stream only",
+    )
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(repo_root / "src"))
+
+    runners = {"stream": bench_stream, "dict": bench_dict, "merkle": bench_merkle}
+    for mode in args.mode or ["stream"]:
+        print(json.dumps(runners[mode](args.nodes, args.change_every)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+DOC_SUFFIXES = {".md", ".maus", ".json"}
+
+
+def _corpus(docs_root: Path, unit: str = "file") -> list[tuple[str, str]]:
+    """Docs texts as whole files or as blank-line separated paragraphs."""
+    out = []
+    for path in sorted(docs_root.rglob("*")):
+        if path.is_file() and path.suffix.lower() in DOC_SUFFIXES:
+            text = path.read_text(encoding="utf-8", errors="ignore")
+            parts = [text] if unit == "file" else text.split("\n\n")
+            out.extend((p, path.suffix.lower()) for p in parts if p.strip())
+    return out
+
+
+def bench_predict(
+    docs_root: Path, repeat: int, unit: str, hash_buckets: int | None = None
+) -> dict[str, Any]:
+    from maus.python.analysis.bayesian_extractor import BayesianRuleExtractor
+
+    br = BayesianRuleExtractor(hash_buckets=hash_buckets)
+    br.train_from_docs(docs_root)
+    corpus = _corpus(docs_root, unit) * repeat
+    texts = [t for t, _ in corpus]
+    fts = [ft for _, ft in corpus]
+    n_bytes = sum(len(t.encode("utf-8")) for t in texts)
+
+    timings: dict[str, float] = {}
+    t0 = time.perf_counter()
+    for text, ft in corpus:
+        br.predict_distribution(text, file_type=ft)
+    timings["single"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    br.predict_many(texts, fts)
+    timings["many"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in br.predict_stream(iter(texts), iter(fts), top_k=3, chunk_size=256):
+        pass
+    timings["stream_top3"] = time.perf_counter() - t0
+
+    return {
+        "mode": "predict",
+        "unit": unit,
+        "hash_buckets": hash_buckets,
+        "docs": len(texts),
+        "mb": round(n_bytes / 1e6, 2),
+        "labels": len(br.label_to_count),
+        "features": len(br.vocabulary),
+        **{
+            f"{name}_docs_per_sec": round(len(texts) / dt, 1)
+            for name, dt in timings.items()
+        },
+    }
+
+
+def _replicate(docs_root: Path, dest: Path, repeat: int) -> int:
+    """Copy the docs tree `repeat` times under dest; returns the file count."""
+    n = 0
+    for path in sorted(docs_root.rglob("*")):
+        if path.is_file() and path.suffix.lower() in DOC_SUFFIXES:
+            rel = path.relative_to(docs_root)
+            for i in range(repeat):
+                target = dest / f"copy{i:04d}" / rel
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, target)
+                n += 1
+    return n
+
+
+def bench_train(docs_root: Path, repeat: int, workers: list[int]) -> dict[str, Any]:
+    from maus.python.analysis.bayesian_extractor import BayesianRuleExtractor
+
+    def state(br: BayesianRuleExtractor) -> tuple:
+        return br.label_to_count, br.label_feature_counts, br.total_docs
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp)
+        n_files = _replicate(docs_root, corpus, repeat)
+        timings: dict[str, float] = {}
+
+        t0 = time.perf_counter()
+        serial = BayesianRuleExtractor()
+        serial.train_from_docs(corpus)
+        timings["serial"] = time.perf_counter() - t0
+
+        identical = True
+        for w in workers:
+            t0 = time.perf_counter()
+            par = BayesianRuleExtractor()
+            par.train_parallel(corpus, workers=w)
+            timings[f"workers_{w}"] = time.perf_counter() - t0
+            identical = identical and state(par) == state(serial)
+
+    return {
+        "mode": "train",
+        "files": n_files,
+        "cpus": os.cpu_count(),
+        "identical": identical,
+        **{f"{name}_s": round(dt, 3) for name, dt in timings.items()},
+        **{
+            f"{name}_speedup": round(timings["serial"] / dt, 2)
+            for name, dt in timings.items()
+            if name != "serial"
+        },
+    }
+
+
+def bench_load(docs_root: Path, repeat: int) -> dict[str, Any]:
+    from maus.python.analysis.bayesian_extractor import BayesianRuleExtractor
+
+    br = BayesianRuleExtractor()
+    br.train_from_docs(docs_root)
+    query = " ".join(t for t, _ in _corpus(docs_root)[:1])[:2000]
+    out: dict[str, Any] = {"mode": "load", "features": len(br.vocabulary)}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("json", "nbin"):
+            path = Path(tmp) / f"model.{fmt}"
+            br.save_model(path)
+            out[f"{fmt}_mb"] = round(path.stat().st_size / 1e6, 2)
+            load_s, first_s = [], []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                model = BayesianRuleExtractor()
+                model.load_model(path)
+                t1 = time.perf_counter()
+                model.predict_distribution(query, file_type=".md")
+                load_s.append(t1 - t0)
+                first_s.append(time.perf_counter() - t1)
+            out[f"{fmt}_load_ms"] = round(min(load_s) * 1000, 2)
+            out[f"{fmt}_first_predict_ms"] = round(min(first_s) * 1000, 2)
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Bayes tag extractor")
+    parser.add_argument("--docs", type=str, default=None, help="Default: Docs/")
+    parser.add_argument("--repeat", type=int, default=5, help="Corpus repetitions")
+    parser.add_argument(
+        "--unit",
+        choices=["file", "paragraph"],
+        default="file",
+        help="Prediction granularity over the corpus",
+    )
+    parser.add_argument(
+        "--hash-buckets",
+        type=int,
+        default=None,
+        help="Predict mode: use feature hashing with this many buckets",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        action="append",
+        help="Train mode pool sizes; repeatable (default: 2, 4 and CPU count)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["predict", "train", "load"],
+        action="append",
+        help="Repeatable; defaults to all",
+    )
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(repo_root / "src"))
+    docs_root = Path(args.docs) if args.docs else repo_root / "Docs"
+
+    workers = args.workers or sorted({2, 4, os.cpu_count() or 1})
+    runners = {
+        "predict": lambda: bench_predict(
+            docs_root, args.repeat, args.unit, args.hash_buckets
+        ),
+        "train": lambda: bench_train(docs_root, args.repeat, workers),
+        "load": lambda: bench_load(docs_root, args.repeat),
+    }
+    for mode in args.mode or list(runners):
+        print(json.dumps(runners[mode]()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
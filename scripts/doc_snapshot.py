@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Build an AST snapshot of a markdown docs tree",
+    )
+    parser.add_argument("--root", type=str, default=None, help="Default: Docs/")
+    parser.add_argument("--out", type=str, default="snapshot.json")
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help="Per-file parse cache (default: build/cache/doc_snapshot.json)",
+    )
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument(
+        "--stats", action="store_true", help="Print build stats as JSON"
+    )
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(repo_root / "src"))
+
+    from maus.python.analysis.doc_snapshot import DocSnapshotBuilder, write_snapshot
+
+    root = Path(args.root) if args.root else repo_root / "Docs"
+    if not root.is_dir():
+        print(f"Docs directory not found: {root}")
+        return 1
+
+    cache_path = None
+    if not args.no_cache:
+        cache_path = args.cache or repo_root / "build" / "cache" / "doc_snapshot.json"
+    builder = DocSnapshotBuilder(root, cache_path)
+    nodes = builder.build()
+    builder.save_cache()
+    write_snapshot(nodes, args.out)
+
+    if args.stats:
+        stats = asdict(builder.stats)
+        stats["seconds"] = round(builder.stats.seconds, 4)
+        print(json.dumps({"nodes": len(nodes), **stats}))
+    else:
+        print(
+            f"Wrote {args.out}: {len(nodes)} nodes from {builder.stats.files} files "
+            f"({builder.stats.parsed} parsed) in {builder.stats.seconds * 1000:.1f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
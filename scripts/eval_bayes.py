@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import sys
+from pathlib import Path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="K-fold accuracy/speed evaluation of Bayes tag configurations",
+    )
+    parser.add_argument("--docs", type=str, default=None, help="Default: Docs/")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0, help="Fold shuffle seed")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes for (config, fold) jobs (default: CPU count)",
+    )
+    parser.add_argument(
+        "--alpha", type=float, action="append", help="Repeatable (default: 1.0)"
+    )
+    parser.add_argument(
+        "--features",
+        choices=["uni", "uni+bi"],
+        action="append",
+        help="Repeatable (default: uni+bi)",
+    )
+    parser.add_argument(
+        "--hash-buckets",
+        type=int,
+        action="append",
+        help="Repeatable; 0 means string features (default: 0)",
+    )
+    parser.add_argument(
+        "--prune",
+        type=int,
+        action="append",
+        help="Repeatable minimum feature count; 0 disables (default: 0)",
+    )
+    parser.add_argument("--top-k", type=int, default=1, help="Labels predicted per doc")
+    parser.add_argument("--json", type=str, default=None, help="Also write JSON here")
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(repo_root / "src"))
+
+    from maus.python.analysis.bayes_eval import (
+        EvalConfig,
+        cross_validate,
+        format_table,
+        load_examples,
+    )
+
+    docs_root = Path(args.docs) if args.docs else repo_root / "Docs"
+    examples = load_examples(docs_root)
+    if len(examples) < 2:
+        print(f"Need at least two tagged docs under {docs_root}")
+        return 1
+
+    configs = [
+        EvalConfig(
+            alpha=alpha,
+            features=features,
+            hash_buckets=buckets or None,
+            prune=prune,
+            top_k=args.top_k,
+        )
+        for alpha, features, buckets, prune in itertools.product(
+            args.alpha or [1.0],
+            args.features or ["uni+bi"],
+            args.hash_buckets or [0],
+            args.prune or [0],
+        )
+    ]
+    results = cross_validate(examples, configs, args.folds, args.workers, args.seed)
+
+    print(f"{len(examples)} tagged docs, {args.folds}-fold, top-{args.top_k}\n")
+    print(format_table(results))
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(
+                {
+                    "docs": len(examples),
+                    "folds": args.folds,
+                    "seed": args.seed,
+                    "results": [r.to_dict() for r in results],
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+
+from maus.python.core.drag_simplify import simplify_map
+from maus.python.core.maus_data_map import MausDataMap
+
+
+def setup_logger(verbose: bool) -> None:
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format="%(levelname)s %(message)s",
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Simplify drag paths in .maus JSON")
+    parser.add_argument("file", help="Path to .maus JSON")
+    parser.add_argument("--out", type=str, default=None, help="Defaults to in-place")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.5, help="Max deviation in grid units"
+    )
+    parser.add_argument(
+        "--max-gap-ms", type=int, default=None, help="Max time between kept drags"
+    )
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    setup_logger(args.verbose)
+
+    path = Path(args.file)
+    if not path.exists():
+        logging.error("File not found: %s", path)
+        return 1
+
+    try:
+        text = path.read_text(encoding="utf-8")
+        mdm, stats = simplify_map(
+            MausDataMap.from_json(text), args.tolerance, args.max_gap_ms
+        )
+        out_text = mdm.to_json(indent=2)
+        out_path = Path(args.out) if args.out else path
+        out_path.write_text(out_text, encoding="utf-8")
+        logging.info(
+            "Drag events %d -> %d (%.2fx), max deviation %.3f grid units",
+            stats.events_in,
+            stats.events_out,
+            stats.ratio,
+            stats.max_deviation,
+        )
+        logging.info(
+            "Wrote %s (%d -> %d bytes)",
+            out_path,
+            len(text.encode("utf-8")),
+            len(out_text.encode("utf-8")),
+        )
+        return 0
+    except Exception as exc:
+        logging.exception("Simplify failed: %s", exc)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
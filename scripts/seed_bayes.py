@@ -1,14 +1,31 @@
 from __future__ import annotations
 
+import argparse
 import sys
 from pathlib import Path
 
 
 def main() -> int:
+    parser = argparse.ArgumentParser(description="Train the Bayes tag model")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the per-file manifest and retrain from scratch",
+    )
+    parser.add_argument(
+        "--export-json",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Also write the model in the JSON interchange format",
+    )
+    args = parser.parse_args()
+
     repo_root = Path(__file__).resolve().parents[1]
     src_path = repo_root / "src"
     docs_root = repo_root / "Docs"
-    model_path = repo_root / "build" / "models" / "bayes_tags.json"
+    model_path = repo_root / "build" / "models" / "bayes_tags.nbin"
+    manifest_path = model_path.with_suffix(".manifest.json")
 
     if not docs_root.exists():
         print(f"Docs directory not found: {docs_root}")
@@ -16,19 +33,32 @@ def main() -> int:
 
     sys.path.insert(0, str(src_path))
     try:
-        from src.maus.python.core.bayesian_extractor import (
-            BayesianRuleExtractor,  # type: ignore
-        )
+        from maus.python.analysis.bayesian_extractor import BayesianRuleExtractor
+        from maus.python.core.file_lock import FileLock
     except Exception as exc:  # pragma: no cover
         print(f"Failed to import BayesianRuleExtractor: {exc}")
         return 1
 
     extractor = BayesianRuleExtractor()
     print(f"Training Bayes model from: {docs_root}")
-    extractor.train_from_docs(str(docs_root))
-    model_path.parent.mkdir(parents=True, exist_ok=True)
-    extractor.save_model(model_path)
-    print(f"Saved model: {model_path}")
+    # Same lock the reasoner takes, so a starting service never trains
+    # alongside this script or reads a half-updated manifest
+    with FileLock(model_path.with_suffix(".lock")):
+        if args.full:
+            manifest_path.unlink(missing_ok=True)
+        else:
+            extractor.load_model(model_path)
+        stats = extractor.train_incremental(docs_root, manifest_path)
+        extractor.save_model(model_path)
+    print(
+        f"Files: {stats.files} | added {stats.added} | changed {stats.changed} | "
+        f"deleted {stats.deleted} | unchanged {stats.unchanged + stats.rehashed} "
+        f"({stats.seconds * 1000:.1f} ms)"
+    )
+    print(f"Saved model: {model_path} (version {extractor.model_version})")
+    if args.export_json:
+        extractor.save_model(args.export_json)
+        print(f"Exported JSON: {args.export_json}")
     return 0
 
 
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
 import hashlib
-from collections.abc import Iterable
-from dataclasses import dataclass
-from typing import Literal
+import json
+import random
+import re
+from collections import deque
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
 
-NodeType = Literal["DOCUMENT", "FUNCTION", "DATA"]
+NodeType = Literal["DOCUMENT", "SECTION", "FUNCTION", "DATA"]
+DeltaKind = Literal["added", "removed", "modified"]
+
+MINHASH_PERMUTATIONS = 32
+MINHASH_BAND_ROWS = 4
+# Fixed seed: sketches must be comparable across runs and processes
+_mask_rng = random.Random(0x5EED)
+_MINHASH_MASKS = [_mask_rng.getrandbits(64) for _ in range(MINHASH_PERMUTATIONS)]
 
 
 @dataclass
@@ -15,6 +27,7 @@ class ASTNode:
     content_hash: str
     path: str
     weight: float = 1.0
+    sketch: tuple[int, ...] | None = None  # MinHash of content, see minhash_sketch
 
 
 @dataclass
@@ -22,16 +35,127 @@ class ASTDelta:
     added: list[ASTNode]
     removed: list[ASTNode]
     modified: list[tuple[ASTNode, ASTNode]]  # (old, new)
+    # Same (or near-duplicate) content under a new id: (old, new)
+    moved: list[tuple[ASTNode, ASTNode]] = field(default_factory=list)
+
+
+@dataclass
+class DeltaRecord:
+    """One streamed delta entry; `old`/`new` is None for added/removed."""
+
+    kind: DeltaKind
+    old: ASTNode | None
+    new: ASTNode | None
+
+
+@dataclass
+class MerkleTree:
+    """Subtree for one `ASTNode.path` prefix; `nodes` sit exactly at it."""
+
+    hash: str = ""
+    children: dict[str, MerkleTree] = field(default_factory=dict)
+    nodes: dict[str, ASTNode] = field(default_factory=dict)
+
+
+@dataclass
+class MerkleSnapshot:
+    """
+    Snapshot with Merkle hashes aggregated over the `/`-separated path tree.
+
+    A subtree hash covers the id, type and content hash of every node below
+    it (not weight, which compute_delta ignores), so equal hashes mean the
+    subtree holds no added, removed or modified nodes. `order` records each
+    id's position so diff output matches compute_delta ordering.
+    """
+
+    root: MerkleTree
+    order: dict[str, int]
+
+    @classmethod
+    def build(cls, nodes: Iterable[ASTNode]) -> MerkleSnapshot:
+        by_id = {n.id: n for n in nodes}
+        root = MerkleTree()
+        for n in by_id.values():
+            tree = root
+            for part in n.path.split("/"):
+                child = tree.children.get(part)
+                if child is None:
+                    child = tree.children[part] = MerkleTree()
+                tree = child
+            tree.nodes[n.id] = n
+        _hash_tree(root)
+        return cls(root=root, order={nid: i for i, nid in enumerate(by_id)})
 
 
 def hash_content(content: str) -> str:
     return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
 
+def minhash_sketch(content: str, shingle: int = 3) -> tuple[int, ...]:
+    """
+    MinHash signature over word shingles of `content`.
+
+    The fraction of equal positions in two sketches estimates the Jaccard
+    similarity of their shingle sets. One stable 64-bit hash per shingle is
+    XOR-ed with fixed masks to emulate independent permutations.
+    """
+    words = re.findall(r"[A-Za-z0-9_]+", content.lower())
+    grams = {
+        " ".join(words[i : i + shingle])
+        for i in range(max(1, len(words) - shingle + 1))
+    }
+    hashes = [
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest())
+        for g in grams
+    ]
+    return tuple(min(h ^ m for h in hashes) for m in _MINHASH_MASKS)
+
+
+def sketch_similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(x == y for x, y in zip(a, b, strict=True)) / len(a)
+
+
+def node_from_dict(d: dict[str, Any], with_sketch: bool = False) -> ASTNode:
+    content_hash = d.get("content_hash")
+    if not content_hash:
+        content_hash = hash_content(str(d.get("content", "")))
+    sketch = d.get("sketch")
+    if sketch is None and with_sketch and "content" in d:
+        sketch = minhash_sketch(str(d["content"]))
+    return ASTNode(
+        id=str(d.get("id", "")),
+        type=str(d.get("type", "DOCUMENT")),  # type: ignore[arg-type]
+        content_hash=str(content_hash),
+        path=str(d.get("path", "")),
+        weight=float(d.get("weight", 1.0)),
+        sketch=tuple(int(x) for x in sketch) if sketch is not None else None,
+    )
+
+
+def iter_jsonl_nodes(path: str | Path) -> Iterator[ASTNode]:
+    """Lazily read a JSON-lines snapshot (one node object per line)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield node_from_dict(json.loads(line))
+
+
 def compute_delta(
     old_nodes: Iterable[ASTNode],
     new_nodes: Iterable[ASTNode],
+    detect_moves: bool = True,
+    near_threshold: float | None = None,
 ) -> ASTDelta:
+    """
+    Diff two snapshots by node id.
+
+    With `detect_moves`, removed/added pairs sharing type and content hash
+    are reported as `moved` instead; `near_threshold` additionally pairs
+    nodes whose MinHash sketches are at least that similar.
+    """
     old_by_id = {n.id: n for n in old_nodes}
     new_by_id = {n.id: n for n in new_nodes}
 
@@ -44,16 +168,258 @@ def compute_delta(
             added.append(n)
         else:
             old = old_by_id[nid]
-            if old.content_hash != n.content_hash or old.type != n.type:
+            if _is_modified(old, n):
                 modified.append((old, n))
 
     for nid, n in old_by_id.items():
         if nid not in new_by_id:
             removed.append(n)
 
-    return ASTDelta(added=added, removed=removed, modified=modified)
+    delta = ASTDelta(added=added, removed=removed, modified=modified)
+    return pair_moves(delta, near_threshold) if detect_moves else delta
+
+
+def pair_moves(delta: ASTDelta, near_threshold: float | None = None) -> ASTDelta:
+    """
+    Re-classify removed/added nodes with matching content as `moved`.
+
+    Exact matches come from a (type, content_hash) index over the removed
+    nodes, pairing in delta order. Near-duplicates use MinHash LSH banding so
+    only nodes sharing a band are compared. Both stay near-linear in the
+    number of unmatched nodes.
+    """
+    by_content: dict[tuple[str, str], deque[ASTNode]] = {}
+    for n in delta.removed:
+        by_content.setdefault((n.type, n.content_hash), deque()).append(n)
+
+    moved = list(delta.moved)
+    matched: set[str] = set()
+    added: list[ASTNode] = []
+    for n in delta.added:
+        queue = by_content.get((n.type, n.content_hash))
+        if queue:
+            old = queue.popleft()
+            matched.add(old.id)
+            moved.append((old, n))
+        else:
+            added.append(n)
+    removed = [n for n in delta.removed if n.id not in matched]
+
+    if near_threshold is not None and added and removed:
+        pairs = _near_duplicate_pairs(removed, added, near_threshold)
+        moved.extend(pairs)
+        old_ids = {o.id for o, _ in pairs}
+        new_ids = {n.id for _, n in pairs}
+        removed = [n for n in removed if n.id not in old_ids]
+        added = [n for n in added if n.id not in new_ids]
+
+    return ASTDelta(
+        added=added, removed=removed, modified=delta.modified, moved=moved
+    )
+
+
+def iter_delta_sorted(
+    old_nodes: Iterable[ASTNode],
+    new_nodes: Iterable[ASTNode],
+) -> Iterator[DeltaRecord]:
+    """
+    Merge-join diff over two node streams sorted by `id` (str ordering).
+
+    Holds one node per side in memory and yields records as soon as they are
+    known, in id order. Duplicate ids keep the last occurrence, as the dicts
+    in `compute_delta` do; collecting the output with `collect_delta` gives
+    the same ASTDelta as `compute_delta` on the same sorted inputs. Raises
+    ValueError if either stream is not sorted.
+    """
+    old_it = _unique_sorted(old_nodes, "old")
+    new_it = _unique_sorted(new_nodes, "new")
+    o = next(old_it, None)
+    n = next(new_it, None)
+
+    while o is not None and n is not None:
+        if o.id == n.id:
+            if _is_modified(o, n):
+                yield DeltaRecord("modified", o, n)
+            o = next(old_it, None)
+            n = next(new_it, None)
+        elif o.id < n.id:
+            yield DeltaRecord("removed", o, None)
+            o = next(old_it, None)
+        else:
+            yield DeltaRecord("added", None, n)
+            n = next(new_it, None)
+
+    while o is not None:
+        yield DeltaRecord("removed", o, None)
+        o = next(old_it, None)
+    while n is not None:
+        yield DeltaRecord("added", None, n)
+        n = next(new_it, None)
+
+
+def compute_delta_merkle(
+    old: MerkleSnapshot,
+    new: MerkleSnapshot,
+    detect_moves: bool = True,
+    near_threshold: float | None = None,
+) -> ASTDelta:
+    """
+    Same result as compute_delta, descending only into subtrees whose
+    aggregate hash differs. Cost tracks the number and spread of changes
+    rather than snapshot size. Nodes that changed path are seen on both
+    sides and reconciled by id afterwards.
+    """
+    removed: dict[str, ASTNode] = {}
+    added: dict[str, ASTNode] = {}
+    modified: list[tuple[ASTNode, ASTNode]] = []
+
+    stack = [(old.root, new.root)]
+    while stack:
+        o, n = stack.pop()
+        if o.hash == n.hash:
+            continue
+        for nid, node in o.nodes.items():
+            other = n.nodes.get(nid)
+            if other is None:
+                removed[nid] = node
+            elif _is_modified(node, other):
+                modified.append((node, other))
+        for nid, node in n.nodes.items():
+            if nid not in o.nodes:
+                added[nid] = node
+        for name, child in o.children.items():
+            other_child = n.children.get(name)
+            if other_child is None:
+                removed.update(_subtree_nodes(child))
+            else:
+                stack.append((child, other_child))
+        for name, child in n.children.items():
+            if name not in o.children:
+                added.update(_subtree_nodes(child))
+
+    for nid in removed.keys() & added.keys():
+        o_node, n_node = removed.pop(nid), added.pop(nid)
+        if _is_modified(o_node, n_node):
+            modified.append((o_node, n_node))
+
+    delta = ASTDelta(
+        added=sorted(added.values(), key=lambda n: new.order[n.id]),
+        removed=sorted(removed.values(), key=lambda n: old.order[n.id]),
+        modified=sorted(modified, key=lambda pair: new.order[pair[1].id]),
+    )
+    return pair_moves(delta, near_threshold) if detect_moves else delta
+
+
+def collect_delta(
+    records: Iterable[DeltaRecord],
+    detect_moves: bool = True,
+    near_threshold: float | None = None,
+) -> ASTDelta:
+    """
+    Gather streamed records into an ASTDelta. Move pairing needs every
+    unmatched node, so it runs here rather than in iter_delta_sorted.
+    """
+    delta = ASTDelta(added=[], removed=[], modified=[])
+    for r in records:
+        if r.kind == "added" and r.new is not None:
+            delta.added.append(r.new)
+        elif r.kind == "removed" and r.old is not None:
+            delta.removed.append(r.old)
+        elif r.kind == "modified" and r.old is not None and r.new is not None:
+            delta.modified.append((r.old, r.new))
+    return pair_moves(delta, near_threshold) if detect_moves else delta
 
 
 def prioritize_insertions(delta: ASTDelta) -> list[ASTNode]:
     # Simple strategy: sort by path length (shallower first) then by weight desc
     return sorted(delta.added, key=lambda n: (n.path.count("/"), -n.weight))
+
+
+def _is_modified(old: ASTNode, new: ASTNode) -> bool:
+    return old.content_hash != new.content_hash or old.type != new.type
+
+
+def _near_duplicate_pairs(
+    removed: list[ASTNode],
+    added: list[ASTNode],
+    threshold: float,
+    max_bucket: int = 32,
+) -> list[tuple[ASTNode, ASTNode]]:
+    order = {n.id: i for i, n in enumerate(removed)}
+    buckets: dict[tuple[int, str, tuple[int, ...]], list[ASTNode]] = {}
+    for n in removed:
+        for key in _band_keys(n):
+            bucket = buckets.setdefault(key, [])
+            if len(bucket) < max_bucket:
+                bucket.append(n)
+
+    scored: list[tuple[float, int, int, ASTNode, ASTNode]] = []
+    for j, n in enumerate(added):
+        seen: set[str] = set()
+        for key in _band_keys(n):
+            for o in buckets.get(key, ()):
+                if o.id in seen:
+                    continue
+                seen.add(o.id)
+                sim = sketch_similarity(o.sketch or (), n.sketch or ())
+                if sim >= threshold:
+                    scored.append((sim, order[o.id], j, o, n))
+
+    # Greedy best-first assignment; ties resolve in delta order
+    scored.sort(key=lambda t: (-t[0], t[2], t[1]))
+    used_old: set[str] = set()
+    used_new: set[str] = set()
+    pairs: list[tuple[ASTNode, ASTNode]] = []
+    for _, _, _, o, n in scored:
+        if o.id in used_old or n.id in used_new:
+            continue
+        used_old.add(o.id)
+        used_new.add(n.id)
+        pairs.append((o, n))
+    return pairs
+
+
+def _band_keys(n: ASTNode) -> Iterator[tuple[int, str, tuple[int, ...]]]:
+    if not n.sketch:
+        return
+    for b in range(0, len(n.sketch), MINHASH_BAND_ROWS):
+        yield b, n.type, n.sketch[b : b + MINHASH_BAND_ROWS]
+
+
+def _unique_sorted(nodes: Iterable[ASTNode], side: str) -> Iterator[ASTNode]:
+    it = iter(nodes)
+    prev = next(it, None)
+    if prev is None:
+        return
+    for node in it:
+        if node.id < prev.id:
+            raise ValueError(
+                f"{side} snapshot is not sorted by id: {node.id!r} after {prev.id!r}"
+            )
+        if node.id != prev.id:
+            yield prev
+        prev = node
+    yield prev
+
+
+def _hash_tree(tree: MerkleTree) -> str:
+    parts = [
+        f"c\0{name}\0{_hash_tree(tree.children[name])}"
+        for name in sorted(tree.children)
+    ]
+    parts.extend(
+        f"n\0{nid}\0{n.type}\0{n.content_hash}"
+        for nid, n in sorted(tree.nodes.items())
+    )
+    tree.hash = hashlib.blake2b(
+        "\n".join(parts).encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return tree.hash
+
+
+def _subtree_nodes(tree: MerkleTree) -> Iterator[tuple[str, ASTNode]]:
+    stack = [tree]
+    while stack:
+        t = stack.pop()
+        yield from t.nodes.items()
+        stack.extend(t.children.values())
@@ -0,0 +1,280 @@
+"""
+Binary, memory-mappable storage for BayesianRuleExtractor models.
+
+Layout (native byte order, recorded in the header):
+
+    MAGIC | u64 header offset | u64 header length | sections... | JSON header
+
+Sections are flat arrays, 8-byte aligned, describing a feature x label CSR
+matrix keyed by an interned feature table sorted by 64-bit feature hash:
+
+    hashes       Q  per feature, ascending
+    name_offsets q  per feature + 1, into `names`
+    names        B  UTF-8 feature strings, concatenated
+    indptr       q  per feature + 1, into the posting arrays
+    label_idx    i  per posting
+    counts       q  per posting (raw counts, for export and retraining)
+    weights      d  per posting, log1p(count / alpha)
+
+The header holds the labels, their document counts and feature totals, so
+opening a model only maps the file and parses a few hundred bytes; features
+are found by binary search over `hashes` instead of building a dict. Models
+trained with feature hashing store their bucket numbers as decimal names.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .bayesian_extractor import CompiledNaiveBayes, _np
+
+if TYPE_CHECKING:
+    from .bayesian_extractor import BayesianRuleExtractor
+
+MAGIC = b"MAUSNB\x00\x01"
+FORMAT_VERSION = 1
+BINARY_SUFFIX = ".nbin"
+_PREFIX = struct.Struct("<8sQQ")
+_SECTIONS = (
+    ("hashes", "Q"),
+    ("name_offsets", "q"),
+    ("names", "B"),
+    ("indptr", "q"),
+    ("label_idx", "i"),
+    ("counts", "q"),
+    ("weights", "d"),
+)
+
+
+def feature_hash(feature: str) -> int:
+    """Stable 64-bit hash used to order and look up interned features."""
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def is_binary_model(path: str | Path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_binary_model(extractor: BayesianRuleExtractor, path: str | Path) -> None:
+    labels = list(extractor.label_to_count)
+    label_ix = {label: i for i, label in enumerate(labels)}
+    postings: dict[str, list[tuple[int, int]]] = {f: [] for f in extractor.vocabulary}
+    totals: list[int] = []
+    for label in labels:
+        lf = extractor.label_feature_counts.get(label, {})
+        totals.append(sum(lf.values()))
+        li = label_ix[label]
+        for feat, c in lf.items():
+            postings.setdefault(feat, []).append((li, c))
+
+    alpha = extractor.alpha
+    arrays = {name: array(code) for name, code in _SECTIONS}
+    arrays["name_offsets"].append(0)
+    arrays["indptr"].append(0)
+    names = bytearray()
+    for h, name, feat in sorted((feature_hash(str(f)), str(f), f) for f in postings):
+        arrays["hashes"].append(h)
+        names += name.encode("utf-8")
+        arrays["name_offsets"].append(len(names))
+        for li, c in postings[feat]:
+            arrays["label_idx"].append(li)
+            arrays["counts"].append(c)
+            arrays["weights"].append(math.log1p(c / alpha))
+        arrays["indptr"].append(len(arrays["label_idx"]))
+    arrays["names"].frombytes(bytes(names))
+
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    sections: dict[str, list[Any]] = {}
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * _PREFIX.size)
+        for name, code in _SECTIONS:
+            f.write(b"\0" * (-f.tell() % 8))
+            sections[name] = [f.tell(), code, len(arrays[name])]
+            arrays[name].tofile(f)
+        header = json.dumps(
+            {
+                "version": FORMAT_VERSION,
+                "byteorder": sys.byteorder,
+                "alpha": alpha,
+                "total_docs": extractor.total_docs,
+                "vocab_size": len(extractor.vocabulary),
+                "labels": labels,
+                "label_counts": [extractor.label_to_count[lbl] for lbl in labels],
+                "label_totals": totals,
+                "hash_buckets": extractor.hash_buckets,
+                "model_version": extractor.model_version,
+                "sections": sections,
+            }
+        ).encode("utf-8")
+        offset = f.tell()
+        f.write(header)
+        f.seek(0)
+        f.write(_PREFIX.pack(MAGIC, offset, len(header)))
+    os.replace(tmp, p)
+
+
+class BinaryModel:
+    """A mapped model file: the parsed header plus zero-copy section views."""
+
+    def __init__(self, path: str | Path) -> None:
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+        size = len(self._buf)
+        if size < _PREFIX.size or bytes(self._buf[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f"not a binary Bayes model: {path}")
+        _, offset, length = _PREFIX.unpack_from(self._buf)
+        if offset + length > size:
+            raise ValueError(f"truncated binary Bayes model: {path}")
+        self.header: dict[str, Any] = json.loads(
+            bytes(self._buf[offset : offset + length])
+        )
+        version = self.header.get("version")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported model version: {version}")
+        if self.header.get("byteorder") != sys.byteorder:
+            raise ValueError("model was written on a machine with another byte order")
+
+    @property
+    def labels(self) -> list[str]:
+        return list(self.header["labels"])
+
+    def section(self, name: str) -> memoryview:
+        offset, code, count = self.header["sections"][name]
+        size = array(code).itemsize
+        return self._buf[offset : offset + count * size].cast(code)
+
+    def ndarray(self, name: str) -> _np.ndarray:
+        offset, code, count = self.header["sections"][name]
+        return _np.frombuffer(self._buf, dtype=code, count=count, offset=offset)
+
+    def read_counts(self) -> tuple[dict[str, dict[Any, int]], set[Any]]:
+        """Materialize label_feature_counts and vocabulary (O(model size))."""
+        key = int if self.header.get("hash_buckets") else str
+        labels = self.labels
+        lfc: dict[str, dict[Any, int]] = {label: {} for label in labels}
+        names = self.section("names")
+        name_offsets = self.section("name_offsets")
+        indptr = self.section("indptr")
+        label_idx = self.section("label_idx")
+        counts = self.section("counts")
+        vocabulary: set[Any] = set()
+        for i in range(len(name_offsets) - 1):
+            feat = key(bytes(names[name_offsets[i] : name_offsets[i + 1]]).decode())
+            vocabulary.add(feat)
+            for k in range(indptr[i], indptr[i + 1]):
+                lfc[labels[label_idx[k]]][feat] = counts[k]
+        return {lbl: lf for lbl, lf in lfc.items() if lf}, vocabulary
+
+
+class MappedNaiveBayes(CompiledNaiveBayes):
+    """
+    CompiledNaiveBayes served straight from a mapped BinaryModel.
+
+    Construction costs O(labels); the CSR arrays are views into the file.
+    Single queries look features up by hash; the token maps used by batch
+    scoring are built on first use. Requires NumPy.
+    """
+
+    def __init__(self, model: BinaryModel) -> None:
+        h = model.header
+        alpha = float(h["alpha"])
+        self.hash_buckets = h.get("hash_buckets")
+        self.labels = model.labels
+        n_labels = len(self.labels)
+        vocab_size = h["vocab_size"] or 1
+        self.log_prior = _np.asarray(
+            [
+                math.log((c + alpha) / (h["total_docs"] + alpha * n_labels))
+                for c in h["label_counts"]
+            ],
+            dtype=_np.float64,
+        )
+        self.log_unseen = _np.asarray(
+            [math.log(alpha / (t + alpha * vocab_size)) for t in h["label_totals"]],
+            dtype=_np.float64,
+        )
+        self._postings = None
+        self._model = model
+        self._hashes = model.ndarray("hashes")
+        self._names = model.section("names")
+        self._name_offsets = model.section("name_offsets")
+        self.indptr = model.ndarray("indptr")
+        self.label_idx = model.ndarray("label_idx")
+        self.weights = model.ndarray("weights")
+
+    def _feature_name(self, fid: int) -> str:
+        start, end = self._name_offsets[fid], self._name_offsets[fid + 1]
+        return bytes(self._names[start:end]).decode("utf-8")
+
+    def _lookup(self, features: dict[Any, int]) -> tuple[list[int], list[int], int]:
+        total = sum(features.values())
+        ids: list[int] = []
+        counts: list[int] = []
+        n = len(self._hashes)
+        if not features or not n:
+            return ids, counts, total
+        keys = list(features)
+        feats = list(map(str, keys)) if self.hash_buckets else keys
+        wanted = _np.fromiter(
+            map(feature_hash, feats), dtype=_np.uint64, count=len(feats)
+        )
+        pos = _np.searchsorted(self._hashes, wanted)
+        hit = self._hashes[_np.minimum(pos, n - 1)] == wanted
+        for k in _np.flatnonzero(hit).tolist():
+            fid, feat = int(pos[k]), feats[k]
+            # Equal hashes are adjacent; confirm against the interned string
+            while fid < n and self._hashes[fid] == wanted[k]:
+                if self._feature_name(fid) == feat:
+                    ids.append(fid)
+                    counts.append(features[keys[k]])
+                    break
+                fid += 1
+        return ids, counts, total
+
+    @cached_property
+    def feature_ids(self) -> dict[Any, int]:  # type: ignore[override]
+        key = int if self.hash_buckets else str
+        return {key(self._feature_name(i)): i for i in range(len(self._hashes))}
+
+    @cached_property
+    def _bucket_fid(self) -> _np.ndarray:
+        table = _np.full(self.hash_buckets or 0, -1, dtype=_np.int64)
+        for bucket, fid in self.feature_ids.items():
+            table[bucket] = fid
+        return table
+
+    @cached_property
+    def _token_maps(
+        self,
+    ) -> tuple[dict[str, int], dict[tuple[str, str], int], dict[str, int]]:
+        return self._split_feature_ids(self.feature_ids)
+
+    @property
+    def _uni(self) -> dict[str, int]:  # type: ignore[override]
+        return self._token_maps[0]
+
+    @property
+    def _bi(self) -> dict[tuple[str, str], int]:  # type: ignore[override]
+        return self._token_maps[1]
+
+    @property
+    def _ft(self) -> dict[str, int]:  # type: ignore[override]
+        return self._token_maps[2]
@@ -0,0 +1,248 @@
+"""
+K-fold evaluation of BayesianRuleExtractor configurations on tagged docs.
+
+Every doc file with at least one TAG_PATTERN tag is one example; its tags are
+the gold labels. Folds are a seeded shuffle of those files. Test texts have
+their tag markers stripped before prediction, otherwise the tag names leak
+into the features. A prediction is the top-k labels of the posterior.
+
+(config, fold) jobs run on a process pool; results are aggregated per
+config into micro precision/recall/F1, macro F1, train time, per-document
+predict latency percentiles and model size.
+"""
+
+from __future__ import annotations
+
+import random
+import tempfile
+import time
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import repeat
+from pathlib import Path
+from typing import Any
+
+from .bayesian_extractor import TAG_PATTERN, BayesianRuleExtractor, EvidenceVector
+
+FEATURE_SETS = ("uni", "uni+bi")
+
+
+@dataclass(frozen=True)
+class EvalConfig:
+    alpha: float = 1.0
+    features: str = "uni+bi"
+    hash_buckets: int | None = None
+    prune: int = 0  # drop features counted fewer times than this
+    top_k: int = 1
+
+    @property
+    def name(self) -> str:
+        parts = [f"a={self.alpha:g}", self.features]
+        if self.hash_buckets:
+            parts.append(f"hash={self.hash_buckets}")
+        if self.prune:
+            parts.append(f"prune<{self.prune}")
+        parts.append(f"top{self.top_k}")
+        return " ".join(parts)
+
+
+@dataclass
+class EvalResult:
+    config: EvalConfig
+    docs: int = 0
+    precision: float = 0.0
+    recall: float = 0.0
+    f1: float = 0.0
+    macro_f1: float = 0.0
+    train_ms: float = 0.0  # mean per fold
+    predict_ms_p50: float = 0.0
+    predict_ms_p95: float = 0.0
+    predict_ms_p99: float = 0.0
+    features: int = 0  # mean per fold
+    postings: int = 0  # mean per fold (non-zero feature x label counts)
+    model_bytes: int = 0  # mean .nbin size per fold
+
+    def to_dict(self) -> dict[str, Any]:
+        out = asdict(self)
+        out["config"] = {"name": self.config.name, **asdict(self.config)}
+        return {k: round(v, 4) if isinstance(v, float) else v for k, v in out.items()}
+
+
+@dataclass
+class _FoldOutcome:
+    train_s: float
+    latencies: list[float]
+    # (gold, predicted) label lists per test doc
+    pairs: list[tuple[list[str], list[str]]] = field(default_factory=list)
+    features: int = 0
+    postings: int = 0
+    model_bytes: int = 0
+
+
+# (file_type, text, gold labels)
+Example = tuple[str, str, list[str]]
+
+
+class _UnigramExtractor(BayesianRuleExtractor):
+    def _featurize(self, tokens: list[str], file_type: str) -> dict[Any, int]:
+        ev = EvidenceVector(tokens=tokens, file_type=file_type, bigrams=False)
+        if self.hash_buckets:
+            return ev.to_hashed_features(self.hash_buckets)
+        return ev.to_features()
+
+
+def load_examples(docs_root: str | Path) -> list[Example]:
+    """Tagged doc files under `docs_root`, in sorted path order."""
+    reader = BayesianRuleExtractor()
+    out: list[Example] = []
+    for path in sorted(reader._iter_doc_files(Path(docs_root))):
+        text = reader._safe_read(path)
+        labels = list(dict.fromkeys(reader._extract_tags(text)))
+        if labels:
+            out.append((path.suffix.lower(), text, labels))
+    return out
+
+
+def fold_indices(n: int, k: int, seed: int = 0) -> list[list[int]]:
+    order = list(range(n))
+    random.Random(seed).shuffle(order)
+    return [sorted(order[i::k]) for i in range(k)]
+
+
+def cross_validate(
+    examples: Sequence[Example],
+    configs: Sequence[EvalConfig],
+    folds: int = 5,
+    workers: int | None = None,
+    seed: int = 0,
+) -> list[EvalResult]:
+    """Run every config over the same k folds; one EvalResult per config."""
+    k = max(2, min(folds, len(examples)))
+    splits = fold_indices(len(examples), k, seed)
+    jobs = [(cfg, test) for cfg in configs for test in splits]
+    if workers == 1 or len(jobs) == 1:
+        outcomes = [_run_fold(examples, cfg, test) for cfg, test in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(
+                pool.map(
+                    _run_fold,
+                    repeat(examples),
+                    [cfg for cfg, _ in jobs],
+                    [test for _, test in jobs],
+                )
+            )
+    return [
+        _aggregate(cfg, outcomes[i * k : (i + 1) * k]) for i, cfg in enumerate(configs)
+    ]
+
+
+def format_table(results: Sequence[EvalResult]) -> str:
+    header = (
+        f"{'config':<38} {'P':>6} {'R':>6} {'F1':>6} {'mF1':>6} "
+        f"{'train ms':>9} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+        f"{'features':>9} {'KB':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.config.name:<38} {r.precision:>6.3f} {r.recall:>6.3f} "
+            f"{r.f1:>6.3f} {r.macro_f1:>6.3f} {r.train_ms:>9.1f} "
+            f"{r.predict_ms_p50:>7.3f} {r.predict_ms_p95:>7.3f} "
+            f"{r.predict_ms_p99:>7.3f} {r.features:>9} {r.model_bytes / 1024:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+# ------------------------------ internals ------------------------------
+def _make_extractor(cfg: EvalConfig) -> BayesianRuleExtractor:
+    if cfg.features not in FEATURE_SETS:
+        raise ValueError(f"unknown feature set: {cfg.features}")
+    cls = _UnigramExtractor if cfg.features == "uni" else BayesianRuleExtractor
+    return cls(alpha=cfg.alpha, hash_buckets=cfg.hash_buckets)
+
+
+def _run_fold(
+    examples: Sequence[Example], cfg: EvalConfig, test: Sequence[int]
+) -> _FoldOutcome:
+    held_out = set(test)
+    model = _make_extractor(cfg)
+    t0 = time.perf_counter()
+    model.train_texts(
+        (text, ft) for i, (ft, text, _) in enumerate(examples) if i not in held_out
+    )
+    if cfg.prune:
+        model.prune(cfg.prune)
+    outcome = _FoldOutcome(train_s=time.perf_counter() - t0, latencies=[])
+
+    outcome.features = len(model.vocabulary)
+    outcome.postings = sum(len(lf) for lf in model.label_feature_counts.values())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "model.nbin"
+        model.save_model(path)
+        outcome.model_bytes = path.stat().st_size
+
+    for i in test:
+        ft, text, gold = examples[i]
+        query = TAG_PATTERN.sub(" ", text)
+        t0 = time.perf_counter()
+        dist = model.predict_distribution(query, file_type=ft)
+        outcome.latencies.append(time.perf_counter() - t0)
+        predicted = sorted(dist, key=lambda lbl: dist[lbl], reverse=True)[: cfg.top_k]
+        outcome.pairs.append((gold, predicted))
+    return outcome
+
+
+def _aggregate(cfg: EvalConfig, outcomes: Sequence[_FoldOutcome]) -> EvalResult:
+    tp = fp = fn = 0
+    per_label: dict[str, list[int]] = {}  # label -> [tp, fp, fn]
+    latencies: list[float] = []
+    for outcome in outcomes:
+        latencies.extend(outcome.latencies)
+        for gold, predicted in outcome.pairs:
+            g, p = set(gold), set(predicted)
+            for label in g | p:
+                counts = per_label.setdefault(label, [0, 0, 0])
+                if label in g and label in p:
+                    counts[0] += 1
+                elif label in p:
+                    counts[1] += 1
+                else:
+                    counts[2] += 1
+            tp += len(g & p)
+            fp += len(p - g)
+            fn += len(g - p)
+
+    n = len(outcomes) or 1
+    result = EvalResult(
+        config=cfg,
+        docs=sum(len(o.pairs) for o in outcomes),
+        train_ms=sum(o.train_s for o in outcomes) / n * 1000,
+        features=round(sum(o.features for o in outcomes) / n),
+        postings=round(sum(o.postings for o in outcomes) / n),
+        model_bytes=round(sum(o.model_bytes for o in outcomes) / n),
+    )
+    result.precision, result.recall, result.f1 = _prf(tp, fp, fn)
+    f1s = [_prf(*c)[2] for c in per_label.values()]
+    result.macro_f1 = sum(f1s) / len(f1s) if f1s else 0.0
+    ms = sorted(x * 1000 for x in latencies)
+    result.predict_ms_p50 = _percentile(ms, 50)
+    result.predict_ms_p95 = _percentile(ms, 95)
+    result.predict_ms_p99 = _percentile(ms, 99)
+    return result
+
+
+def _prf(tp: int, fp: int, fn: int) -> tuple[float, float, float]:
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[min(len(sorted_values), int(rank)) - 1]
@@ -1,13 +1,37 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import math
+import os
 import re
-from collections.abc import Iterable
+import time
+import zlib
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from itertools import repeat
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .bayes_binary import BinaryModel
+
+try:
+    import numpy as _np  # type: ignore
+except Exception:  # pragma: no cover
+    _np = None
 
 TAG_PATTERN = re.compile(r"\[#([A-Za-z0-9_]+)\]|\B#([A-Za-z0-9_]+)")
+DOC_SUFFIXES = {".md", ".maus", ".maus.md", ".json"}
+MANIFEST_VERSION = 1
+# Below this many files process start-up and pickling outweigh the speed-up
+PARALLEL_MIN_FILES = 64
+# Feature hashing: bigram bucket = (crc(a) * _BIGRAM_MIX ^ crc(b)) % buckets,
+# file-type bucket = crc32 seeded with _FILE_TYPE_SEED (no string joins)
+_BIGRAM_MIX = 0x9E3779B1
+_FILE_TYPE_SEED = 0x5F3759DF
 
 
 @dataclass
@@ -21,6 +45,7 @@ class EvidenceVector:
 
     tokens: list[str]
     file_type: str
+    bigrams: bool = True
 
     def to_features(self) -> dict[str, int]:
         features: dict[str, int] = {}
@@ -30,7 +55,8 @@ class EvidenceVector:
             features[f"uni::{token}"] = features.get(f"uni::{token}", 0) + 1
 
         # Bigrams
-        for a, b in zip(self.tokens, self.tokens[1:], strict=False):
+        pairs = zip(self.tokens, self.tokens[1:], strict=False) if self.bigrams else ()
+        for a, b in pairs:
             bigram = f"{a}|{b}"
             features[f"bi::{bigram}"] = features.get(f"bi::{bigram}", 0) + 1
 
@@ -39,6 +65,287 @@ class EvidenceVector:
 
         return features
 
+    def to_hashed_features(self, buckets: int) -> dict[int, int]:
+        """
+        Same unigram/bigram/file-type counts folded into `buckets` slots.
+
+        Each token is crc32-hashed once; bigram buckets mix the two token
+        hashes arithmetically, so no feature strings are built. crc32 is
+        stable across processes and platforms, unlike hash().
+        """
+        return dict(
+            Counter(hashed_buckets(self.tokens, self.file_type, buckets, self.bigrams))
+        )
+
+
+def hashed_buckets(
+    tokens: Sequence[str], file_type: str, buckets: int, bigrams: bool = True
+) -> list[int]:
+    """Bucket of every unigram, then every bigram, then the file type."""
+    hashes = list(map(zlib.crc32, map(str.encode, tokens)))
+    out = [h % buckets for h in hashes]
+    if bigrams:
+        pairs = zip(hashes, hashes[1:], strict=False)
+        out.extend((a * _BIGRAM_MIX ^ b) % buckets for a, b in pairs)
+    out.append(zlib.crc32(file_type.encode("utf-8"), _FILE_TYPE_SEED) % buckets)
+    return out
+
+
+@dataclass
+class TrainStats:
+    files: int = 0
+    unchanged: int = 0  # size/mtime unchanged
+    rehashed: int = 0  # stat changed, content identical
+    added: int = 0
+    changed: int = 0
+    deleted: int = 0
+    rebuilt: bool = False  # counts reconstructed from the manifest
+    seconds: float = 0.0
+
+
+class CompiledNaiveBayes:
+    """
+    Array-backed form of a trained BayesianRuleExtractor.
+
+    Uses the identity
+        log((n_lf + a) / d_l) = log(a / d_l) + log1p(n_lf / a)
+    so a query's score per label is
+        prior_l + N * log(a / d_l) + sum_f c_f * log1p(n_lf / a)
+    where only features actually seen with a label contribute to the last
+    term. That term is stored as a sparse feature x label matrix (CSR) and
+    evaluated with one gather + bincount; per-label denominators and priors
+    are computed once here instead of on every prediction. Falls back to
+    per-feature posting lists when NumPy is unavailable.
+    """
+
+    def __init__(self, extractor: BayesianRuleExtractor) -> None:
+        alpha = extractor.alpha
+        self.hash_buckets = extractor.hash_buckets
+        self.labels = list(extractor.label_to_count)
+        n_labels = len(self.labels)
+        vocab_size = len(extractor.vocabulary) if extractor.vocabulary else 1
+        self.feature_ids: dict[str, int] = {
+            f: i for i, f in enumerate(sorted(extractor.vocabulary))
+        }
+
+        log_prior: list[float] = []
+        log_unseen: list[float] = []
+        postings: list[list[tuple[int, float]]] = [[] for _ in self.feature_ids]
+        for li, label in enumerate(self.labels):
+            log_prior.append(
+                math.log(
+                    (extractor.label_to_count[label] + alpha)
+                    / (extractor.total_docs + alpha * n_labels)
+                )
+            )
+            lf = extractor.label_feature_counts.get(label, {})
+            denom = sum(lf.values()) + alpha * vocab_size
+            log_unseen.append(math.log(alpha / denom))
+            for feat, c in lf.items():
+                fid = self.feature_ids.get(feat)
+                if fid is None:  # counted but missing from vocabulary
+                    fid = self.feature_ids[feat] = len(postings)
+                    postings.append([])
+                postings[fid].append((li, math.log1p(c / alpha)))
+
+        if _np is None:
+            self._postings: list[list[tuple[int, float]]] | None = postings
+            self.log_prior: Any = log_prior
+            self.log_unseen: Any = log_unseen
+            return
+
+        self._postings = None
+        if self.hash_buckets:
+            self._bucket_fid = _np.full(self.hash_buckets, -1, dtype=_np.int64)
+            for bucket, fid in self.feature_ids.items():
+                self._bucket_fid[bucket] = fid
+        else:
+            self._uni, self._bi, self._ft = self._split_feature_ids(self.feature_ids)
+        self.log_prior = _np.asarray(log_prior, dtype=_np.float64)
+        self.log_unseen = _np.asarray(log_unseen, dtype=_np.float64)
+        lengths = _np.fromiter((len(p) for p in postings), dtype=_np.int64)
+        self.indptr = _np.zeros(len(postings) + 1, dtype=_np.int64)
+        _np.cumsum(lengths, out=self.indptr[1:])
+        flat = [entry for p in postings for entry in p]
+        self.label_idx = _np.fromiter(
+            (li for li, _ in flat), dtype=_np.int64, count=len(flat)
+        )
+        self.weights = _np.fromiter(
+            (w for _, w in flat), dtype=_np.float64, count=len(flat)
+        )
+
+    @staticmethod
+    def _split_feature_ids(
+        feature_ids: dict[str, int],
+    ) -> tuple[dict[str, int], dict[tuple[str, str], int], dict[str, int]]:
+        """Token-keyed views of feature_ids so batches skip f-string keys."""
+        uni: dict[str, int] = {}
+        bi: dict[tuple[str, str], int] = {}
+        ft: dict[str, int] = {}
+        for feat, fid in feature_ids.items():
+            kind, _, key = feat.partition("::")
+            if kind == "uni":
+                uni[key] = fid
+            elif kind == "bi":
+                a, _, b = key.partition("|")
+                bi[(a, b)] = fid
+            elif kind == "ft":
+                ft[key] = fid
+        return uni, bi, ft
+
+    def _lookup(self, features: dict[str, int]) -> tuple[list[int], list[int], int]:
+        """Known feature ids, their counts, and the total feature count."""
+        ids: list[int] = []
+        counts: list[int] = []
+        total = 0
+        for feat, c in features.items():
+            total += c
+            fid = self.feature_ids.get(feat)
+            if fid is not None:
+                ids.append(fid)
+                counts.append(c)
+        return ids, counts, total
+
+    def log_scores(self, features: dict[str, int]) -> list[float] | _np.ndarray:
+        """Unnormalized log posterior per label (same order as `labels`)."""
+        ids, counts, total = self._lookup(features)
+        if self._postings is not None:
+            scores = [
+                p + total * u
+                for p, u in zip(self.log_prior, self.log_unseen, strict=True)
+            ]
+            for fid, c in zip(ids, counts, strict=True):
+                for li, w in self._postings[fid]:
+                    scores[li] += c * w
+            return scores
+
+        scores = self.log_prior + total * self.log_unseen
+        if ids:
+            fids = _np.asarray(ids, dtype=_np.int64)
+            starts = self.indptr[fids]
+            lengths = self.indptr[fids + 1] - starts
+            n = int(lengths.sum())
+            if n:
+                # Concatenate the posting ranges of all query features
+                offsets = _np.repeat(starts - (_np.cumsum(lengths) - lengths), lengths)
+                pos = offsets + _np.arange(n)
+                weights = self.weights[pos] * _np.repeat(
+                    _np.asarray(counts, dtype=_np.float64), lengths
+                )
+                scores += _np.bincount(
+                    self.label_idx[pos], weights=weights, minlength=len(self.labels)
+                )
+        return scores
+
+    def distribution(self, features: dict[str, int]) -> dict[str, float]:
+        scores = self.log_scores(features)
+        max_log = max(scores)
+        exp_vals = [math.exp(v - max_log) for v in scores]
+        z = sum(exp_vals) or 1.0
+        return {lbl: v / z for lbl, v in zip(self.labels, exp_vals, strict=True)}
+
+    def probabilities_batch(
+        self,
+        token_lists: Sequence[list[str]],
+        file_types: Sequence[str],
+    ) -> _np.ndarray:
+        """
+        (n_docs, n_labels) posterior matrix for a batch of tokenized texts.
+
+        Features are looked up by token/bigram tuple rather than built as
+        strings (or hashed in one vectorized pass), and all documents are
+        scored in one bincount over (doc, label) cells. Requires NumPy.
+        """
+        if self.hash_buckets:
+            doc_all, fid_all, totals = self._hashed_batch_ids(token_lists, file_types)
+        else:
+            doc_all, fid_all, totals = self._batch_ids(token_lists, file_types)
+        n_labels = len(self.labels)
+        scores = self.log_prior[None, :] + totals[:, None] * self.log_unseen[None, :]
+        known = fid_all >= 0
+        if known.any():
+            # Collapse repeated (doc, feature) pairs before expanding postings
+            n_feats = len(self.indptr) - 1
+            keys, counts = _np.unique(
+                doc_all[known] * n_feats + fid_all[known], return_counts=True
+            )
+            doc_arr, fid_arr = _np.divmod(keys, n_feats)
+            starts = self.indptr[fid_arr]
+            lengths = self.indptr[fid_arr + 1] - starts
+            n = int(lengths.sum())
+            if n:
+                offsets = _np.repeat(starts - (_np.cumsum(lengths) - lengths), lengths)
+                pos = offsets + _np.arange(n)
+                cells = _np.repeat(doc_arr, lengths) * n_labels + self.label_idx[pos]
+                weights = self.weights[pos] * _np.repeat(counts, lengths)
+                scores += _np.bincount(
+                    cells, weights=weights, minlength=scores.size
+                ).reshape(scores.shape)
+
+        scores -= scores.max(axis=1, keepdims=True)
+        _np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def _batch_ids(
+        self,
+        token_lists: Sequence[list[str]],
+        file_types: Sequence[str],
+    ) -> tuple[_np.ndarray, _np.ndarray, _np.ndarray]:
+        """(doc, feature id or -1) per feature occurrence, and per-doc totals."""
+        fids: list[int] = []
+        per_doc = _np.empty(len(token_lists), dtype=_np.int64)
+        totals = _np.empty(len(token_lists), dtype=_np.float64)
+        uni, bi, ft = self._uni, self._bi, self._ft
+        missing = repeat(-1)
+        for d, (tokens, file_type) in enumerate(
+            zip(token_lists, file_types, strict=True)
+        ):
+            start = len(fids)
+            # map(dict.get, keys, repeat(-1)) keeps the lookups in C
+            fids.extend(map(uni.get, tokens, missing))
+            fids.extend(map(bi.get, zip(tokens, tokens[1:], strict=False), missing))
+            fids.append(ft.get(file_type, -1))
+            per_doc[d] = len(fids) - start
+            totals[d] = len(tokens) + max(0, len(tokens) - 1) + 1
+        doc_all = _np.repeat(_np.arange(len(token_lists)), per_doc)
+        return doc_all, _np.asarray(fids, dtype=_np.int64), totals
+
+    def _hashed_batch_ids(
+        self,
+        token_lists: Sequence[list[str]],
+        file_types: Sequence[str],
+    ) -> tuple[_np.ndarray, _np.ndarray, _np.ndarray]:
+        """_batch_ids for hashed models: one crc32 per token, rest vectorized."""
+        buckets = self.hash_buckets
+        lengths = _np.fromiter(map(len, token_lists), dtype=_np.int64)
+        n_tok = int(lengths.sum())
+        hashes = _np.fromiter(
+            (zlib.crc32(t.encode("utf-8")) for toks in token_lists for t in toks),
+            dtype=_np.uint64,
+            count=n_tok,
+        )
+        tok_doc = _np.repeat(_np.arange(len(token_lists)), lengths)
+        # Bigrams never straddle two documents
+        same_doc = tok_doc[:-1] == tok_doc[1:]
+        bigrams = (hashes[:-1] * _np.uint64(_BIGRAM_MIX)) ^ hashes[1:]
+        ft_buckets = [
+            zlib.crc32(ft.encode("utf-8"), _FILE_TYPE_SEED) % buckets
+            for ft in file_types
+        ]
+        bucket_all = _np.concatenate(
+            [
+                hashes % _np.uint64(buckets),
+                bigrams[same_doc] % _np.uint64(buckets),
+                _np.asarray(ft_buckets, dtype=_np.uint64),
+            ]
+        ).astype(_np.int64)
+        doc_all = _np.concatenate(
+            [tok_doc, tok_doc[:-1][same_doc], _np.arange(len(token_lists))]
+        )
+        totals = (lengths + _np.maximum(lengths - 1, 0) + 1).astype(_np.float64)
+        return doc_all, self._bucket_fid[bucket_all], totals
+
 
 class BayesianRuleExtractor:
     """
@@ -47,14 +354,54 @@ class BayesianRuleExtractor:
     - Labels are derived from project docs tags (e.g., [#BerryTimeline]).
     - Features are simple n-grams over text, plus file type indicators.
     - Uses Laplace smoothing for stability on sparse features.
+    - With `hash_buckets`, features are hashed into a fixed number of
+      integer buckets, bounding vocabulary and model size.
     """
 
-    def __init__(self, alpha: float = 1.0) -> None:
+    def __init__(self, alpha: float = 1.0, hash_buckets: int | None = None) -> None:
         self.alpha = alpha
+        self.hash_buckets = hash_buckets
+        # Binary model whose per-feature counts have not been read yet
+        self._mapped: BinaryModel | None = None
         self.label_to_count: dict[str, int] = {}
-        self.label_feature_counts: dict[str, dict[str, int]] = {}
-        self.vocabulary: set[str] = set()
+        self.label_feature_counts = {}
+        self.vocabulary = set()
         self.total_docs: int = 0
+        self._compiled: CompiledNaiveBayes | None = None
+        self._model_version: str | None = None
+
+    @property
+    def label_feature_counts(self) -> dict[str, dict[str, int]]:
+        self._materialize()
+        return self._label_feature_counts
+
+    @label_feature_counts.setter
+    def label_feature_counts(self, value: dict[str, dict[str, int]]) -> None:
+        self._materialize()
+        self._label_feature_counts = value
+
+    @property
+    def vocabulary(self) -> set[str]:
+        self._materialize()
+        return self._vocabulary
+
+    @vocabulary.setter
+    def vocabulary(self, value: set[str]) -> None:
+        self._materialize()
+        self._vocabulary = value
+
+    @property
+    def model_version(self) -> str:
+        """
+        Stamp of the current counts: a digest of every (label, feature,
+        count), so equal stamps mean equal models. Saved with the model and
+        read back on load, so processes sharing a model file can tell which
+        one they have.
+        """
+        if self._model_version is None:
+            signature = self._count_signature().encode("utf-8")
+            self._model_version = hashlib.blake2b(signature, digest_size=8).hexdigest()
+        return self._model_version
 
     # --------------------------- Public API ---------------------------
     def train_from_docs(self, docs_root: str | Path) -> None:
@@ -66,25 +413,170 @@ class BayesianRuleExtractor:
         if not root.exists():
             return
 
-        for path in root.rglob("*"):
-            if not path.is_file():
+        for path in self._iter_doc_files(root):
+            contribution = self._file_contribution(self._safe_read(path), path)
+            if contribution is None:
+                continue
+            labels, features = contribution
+            self._update_counts(labels, features)
+            self.total_docs += 1
+
+        self.compile()
+
+    def train_parallel(
+        self,
+        docs_root: str | Path,
+        workers: int | None = None,
+        shards_per_worker: int = 1,
+    ) -> None:
+        """
+        Map-reduce form of train_from_docs over a process pool.
+
+        The file list is cut into contiguous shards; each worker reads and
+        tokenizes its shard into partial count tables, which are merged back
+        in shard order. Merging in file order keeps label and feature
+        insertion order, so the result is identical to serial training.
+        Small corpora (or workers=1) are trained serially.
+        """
+        root = Path(docs_root)
+        if not root.exists():
+            return
+        paths = [str(p) for p in self._iter_doc_files(root)]
+        n_workers = workers or os.cpu_count() or 1
+        if n_workers == 1 or len(paths) < PARALLEL_MIN_FILES:
+            partials: Iterable[_PartialCounts] = [
+                _count_shard(paths, self.hash_buckets)
+            ]
+        else:
+            n_shards = min(len(paths), n_workers * max(1, shards_per_worker))
+            step = -(-len(paths) // n_shards)
+            shards = [paths[i : i + step] for i in range(0, len(paths), step)]
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                partials = list(
+                    pool.map(_count_shard, shards, repeat(self.hash_buckets))
+                )
+        for partial in partials:
+            self._merge_counts(partial)
+        self.compile()
+
+    def train_texts(self, docs: Iterable[tuple[str, str]]) -> None:
+        """Train on in-memory (text, file_type) pairs, tags taken from the text."""
+        for text, file_type in docs:
+            labels = self._extract_tags(text)
+            if labels:
+                features = self._featurize(self._tokenize(text), file_type)
+                self._update_counts(labels, features)
+                self.total_docs += 1
+        self.compile()
+
+    def train_incremental(
+        self,
+        docs_root: str | Path,
+        manifest_path: str | Path,
+    ) -> TrainStats:
+        """
+        Bring the model in line with `docs_root`, touching only files that
+        were added, changed or deleted since the manifest was written.
+
+        The manifest stores each file's content hash and its contributed
+        labels/feature counts, so a changed or deleted file subtracts exactly
+        what it added. If the in-memory counts do not match the manifest,
+        they are rebuilt from the stored contributions (no file reads). The
+        result equals a fresh train_from_docs over the same tree.
+        """
+        t0 = time.perf_counter()
+        stats = TrainStats()
+        root = Path(docs_root)
+        manifest = self._read_manifest(Path(manifest_path), root)
+        files: dict[str, dict[str, Any]] = manifest["files"]
+
+        # The stored contributions only add up to the counts the manifest was
+        # written for; any other model is rebuilt from them
+        if manifest.get("model_version") != self.model_version:
+            self._reset_counts()
+            for entry in files.values():
+                if entry["labels"]:
+                    self._update_counts(entry["labels"], entry["features"])
+                    self.total_docs += 1
+            stats.rebuilt = bool(files)
+
+        seen: set[str] = set()
+        for path in self._iter_doc_files(root) if root.exists() else ():
+            rel = path.relative_to(root).as_posix()
+            seen.add(rel)
+            try:
+                st = path.stat()
+            except OSError:
                 continue
-            if path.suffix.lower() not in {".md", ".maus", ".maus.md", ".json"}:
+            old = files.get(rel)
+            if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                stats.unchanged += 1
                 continue
 
             text = self._safe_read(path)
-            if not text:
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if old and old["sha256"] == digest:
+                stats.rehashed += 1
+                old.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
                 continue
 
-            labels = self._extract_tags(text)
-            if not labels:
-                continue
+            if old:
+                self._subtract_entry(old)
+                stats.changed += 1
+            else:
+                stats.added += 1
+            labels, features = self._file_contribution(text, path) or ([], {})
+            if labels:
+                self._update_counts(labels, features)
+                self.total_docs += 1
+            files[rel] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "sha256": digest,
+                "labels": labels,
+                "features": features if labels else {},
+            }
+
+        for rel in [r for r in files if r not in seen]:
+            self._subtract_entry(files.pop(rel))
+            stats.deleted += 1
+
+        stats.files = len(files)
+        dirty = stats.added or stats.changed or stats.deleted or stats.rebuilt
+        if dirty or stats.rehashed:
+            manifest["model_version"] = self.model_version
+            self._write_manifest(Path(manifest_path), manifest)
+        if dirty or self._compiled is None:
+            self.compile()
+        stats.seconds = time.perf_counter() - t0
+        return stats
+
+    def compile(self) -> CompiledNaiveBayes | None:
+        """Build the array-backed predictor from the current counts."""
+        self._model_version = None  # counts may have changed; re-stamp lazily
+        self._compiled = CompiledNaiveBayes(self) if self.label_to_count else None
+        return self._compiled
+
+    def prune(self, min_count: int) -> int:
+        """
+        Drop features counted fewer than `min_count` times over all labels.
 
-            tokens = self._tokenize(text)
-            ev = EvidenceVector(tokens=tokens, file_type=path.suffix.lower())
-            features = ev.to_features()
-            self._update_counts(labels, features)
-            self.total_docs += 1
+        Shrinks the model for export; returns the number of features
+        removed. Incremental retraining restores the full counts.
+        """
+        totals: dict[Any, int] = {}
+        for lf in self.label_feature_counts.values():
+            for feat, c in lf.items():
+                totals[feat] = totals.get(feat, 0) + c
+        drop = {feat for feat, c in totals.items() if c < min_count}
+        if not drop:
+            return 0
+        for lf in self.label_feature_counts.values():
+            for feat in drop.intersection(lf):
+                del lf[feat]
+        self.vocabulary -= drop
+        self.compile()
+        return len(drop)
 
     def predict_distribution(
         self,
@@ -98,8 +590,91 @@ class BayesianRuleExtractor:
             # Untrained - return empty distribution
             return {}
 
-        tokens = self._tokenize(text)
-        features = EvidenceVector(tokens=tokens, file_type=file_type).to_features()
+        features = self._featurize(self._tokenize(text), file_type)
+        compiled = self._compiled or self.compile()
+        assert compiled is not None
+        return compiled.distribution(features)
+
+    def predict_many(
+        self,
+        texts: Sequence[str],
+        file_types: Sequence[str] | str = "text",
+        top_k: int | None = None,
+    ) -> list[dict[str, float]] | list[list[str]]:
+        """
+        Batch form of predict_distribution.
+
+        Returns one distribution per text, or with `top_k` the k most likely
+        labels per text (highest first). With NumPy the whole batch is scored
+        in one vectorized pass; otherwise it falls back to per-text scoring.
+        """
+        if isinstance(file_types, str):
+            file_types = [file_types] * len(texts)
+        if not self.label_to_count:
+            empty: list[Any] = [[] if top_k is not None else {} for _ in texts]
+            return empty
+        compiled = self._compiled or self.compile()
+        assert compiled is not None
+        token_lists = [self._tokenize(t) for t in texts]
+
+        if _np is None or compiled._postings is not None:
+            dists = [
+                compiled.distribution(self._featurize(toks, ft))
+                for toks, ft in zip(token_lists, file_types, strict=True)
+            ]
+            if top_k is None:
+                return dists
+            return [
+                sorted(d, key=lambda k, d=d: d[k], reverse=True)[:top_k] for d in dists
+            ]
+
+        probs = compiled.probabilities_batch(token_lists, file_types)
+        labels = compiled.labels
+        if top_k is None:
+            return [dict(zip(labels, row.tolist(), strict=True)) for row in probs]
+        k = min(top_k, len(labels))
+        # Stable sort on -p keeps label order for ties, like sorted() above
+        top = _np.argsort(-probs, axis=1, kind="stable")[:, :k]
+        return [[labels[i] for i in row] for row in top.tolist()]
+
+    def predict_stream(
+        self,
+        texts: Iterable[str],
+        file_types: Iterable[str] | str = "text",
+        top_k: int | None = None,
+        chunk_size: int = 256,
+    ) -> Iterator[dict[str, float] | list[str]]:
+        """
+        predict_many over an unbounded iterable, `chunk_size` texts at a
+        time. Like predict_many, raises ValueError when `file_types` is an
+        iterable of a different length than `texts`.
+        """
+        pairs: Iterator[tuple[str, str]] = (
+            zip(texts, repeat(file_types))
+            if isinstance(file_types, str)
+            else zip(texts, file_types, strict=True)
+        )
+        chunk: list[str] = []
+        chunk_ft: list[str] = []
+        for text, file_type in pairs:
+            chunk.append(text)
+            chunk_ft.append(file_type)
+            if len(chunk) >= chunk_size:
+                yield from self.predict_many(chunk, chunk_ft, top_k)
+                chunk, chunk_ft = [], []
+        if chunk:
+            yield from self.predict_many(chunk, chunk_ft, top_k)
+
+    def _predict_distribution_reference(
+        self,
+        text: str,
+        file_type: str = "text",
+    ) -> dict[str, float]:
+        """Uncompiled dict-walking implementation, kept to verify compile()."""
+        if not self.label_to_count:
+            return {}
+
+        features = self._featurize(self._tokenize(text), file_type)
         log_posteriors: dict[str, float] = {}
 
         vocab_size = len(self.vocabulary) if self.vocabulary else 1
@@ -129,36 +704,203 @@ class BayesianRuleExtractor:
         return {k: v / z for k, v in exp_vals.items()}
 
     def save_model(self, path: str | Path) -> None:
+        """
+        Write JSON, or the mappable binary format for `.nbin` paths. Either
+        is written to a temporary file and renamed over `path`, so readers
+        never see a partial model.
+        """
+        from .bayes_binary import BINARY_SUFFIX, write_binary_model
+
+        if Path(path).suffix == BINARY_SUFFIX:
+            write_binary_model(self, path)
+            return
         data = {
             "alpha": self.alpha,
             "label_to_count": self.label_to_count,
             "label_feature_counts": self.label_feature_counts,
             "vocabulary": sorted(self.vocabulary),
             "total_docs": self.total_docs,
+            "hash_buckets": self.hash_buckets,
+            "model_version": self.model_version,
         }
-        Path(path).parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(p.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
             json.dump(data, f)
+        os.replace(tmp, p)
 
     def load_model(self, path: str | Path) -> bool:
+        """
+        Load a JSON or binary model (detected by content). Binary models are
+        memory-mapped: per-feature counts are only read if training or
+        export needs them, and prediction is served from the mapped arrays
+        when NumPy is available.
+        """
+        from .bayes_binary import BinaryModel, MappedNaiveBayes, is_binary_model
+
         p = Path(path)
         if not p.exists():
             return False
+        self._mapped = None
+        if is_binary_model(p):
+            model = BinaryModel(p)
+            header = model.header
+            self.alpha = float(header["alpha"])
+            self.hash_buckets = header.get("hash_buckets")
+            self.total_docs = int(header["total_docs"])
+            self.label_to_count = dict(
+                zip(model.labels, header["label_counts"], strict=True)
+            )
+            self._label_feature_counts, self._vocabulary = {}, set()
+            self._mapped = model
+            if _np is None:
+                self.compile()
+            else:
+                self._compiled = MappedNaiveBayes(model)
+            # Models written before stamps existed are stamped from their
+            # counts on first use (which reads them in)
+            self._model_version = header.get("model_version")
+            return True
         data = json.loads(p.read_text(encoding="utf-8"))
         self.alpha = float(data.get("alpha", 1.0))
+        self.hash_buckets = data.get("hash_buckets")
         self.label_to_count = {
             str(k): int(v) for k, v in data.get("label_to_count", {}).items()
         }
         self.label_feature_counts = {
-            str(lbl): {str(f): int(c) for f, c in feats.items()}
+            str(lbl): {self._feature_key(f): int(c) for f, c in feats.items()}
             for lbl, feats in data.get("label_feature_counts", {}).items()
         }
-        self.vocabulary = set(map(str, data.get("vocabulary", [])))
+        self.vocabulary = set(map(self._feature_key, data.get("vocabulary", [])))
         self.total_docs = int(data.get("total_docs", 0))
+        self.compile()
+        self._model_version = data.get("model_version")
         return True
 
     # --------------------------- Internal ---------------------------
+    def _materialize(self) -> None:
+        model, self._mapped = self._mapped, None
+        if model is not None:
+            self._label_feature_counts, self._vocabulary = model.read_counts()
+
+    def _iter_doc_files(self, root: Path) -> Iterator[Path]:
+        for path in root.rglob("*"):
+            if path.is_file() and path.suffix.lower() in DOC_SUFFIXES:
+                yield path
+
+    def _file_contribution(
+        self, text: str, path: Path
+    ) -> tuple[list[str], dict[str, int]] | None:
+        """Labels and feature counts one file adds to the model, if any."""
+        if not text:
+            return None
+        labels = self._extract_tags(text)
+        if not labels:
+            return None
+        return labels, self._featurize(self._tokenize(text), path.suffix.lower())
+
+    def _featurize(self, tokens: list[str], file_type: str) -> dict[Any, int]:
+        ev = EvidenceVector(tokens=tokens, file_type=file_type)
+        if self.hash_buckets:
+            return ev.to_hashed_features(self.hash_buckets)
+        return ev.to_features()
+
+    def _feature_key(self, key: str) -> str | int:
+        """Feature key as stored in memory (JSON turns bucket ints into str)."""
+        return int(key) if self.hash_buckets else str(key)
+
+    def _merge_counts(self, partial: _PartialCounts) -> None:
+        """Reduce step: add one shard's count tables into the model."""
+        label_counts, feature_counts, docs = partial
+        self._compiled = self._model_version = None
+        for label, n in label_counts.items():
+            self.label_to_count[label] = self.label_to_count.get(label, 0) + n
+        for label, feats in feature_counts.items():
+            lf = self.label_feature_counts.setdefault(label, {})
+            for feat, c in feats.items():
+                lf[feat] = lf.get(feat, 0) + c
+            self.vocabulary.update(feats)
+        self.total_docs += docs
+
+    def _reset_counts(self) -> None:
+        self._mapped = None
+        self.label_to_count = {}
+        self.label_feature_counts = {}
+        self.vocabulary = set()
+        self.total_docs = 0
+        self._compiled = self._model_version = None
+
+    def _subtract_entry(self, entry: dict[str, Any]) -> None:
+        labels: list[str] = entry["labels"]
+        if not labels:
+            return
+        self._compiled = self._model_version = None
+        self.total_docs -= 1
+        emptied: set[str] = set()
+        for label in labels:
+            remaining = self.label_to_count.get(label, 0) - 1
+            if remaining > 0:
+                self.label_to_count[label] = remaining
+            else:
+                self.label_to_count.pop(label, None)
+            lf = self.label_feature_counts.get(label, {})
+            for feat, c in entry["features"].items():
+                left = lf.get(feat, 0) - c
+                if left > 0:
+                    lf[feat] = left
+                else:
+                    lf.pop(feat, None)
+                    emptied.add(feat)
+            if not lf:
+                self.label_feature_counts.pop(label, None)
+        # A feature leaves the vocabulary once no label counts it any more
+        for feat in emptied:
+            if not any(feat in lf for lf in self.label_feature_counts.values()):
+                self.vocabulary.discard(feat)
+
+    def _count_signature(self) -> str:
+        """
+        Digest of the full counts: every (label, feature, count), not just
+        per-label totals, which two different models can share.
+        """
+        h = hashlib.sha256()
+        h.update(f"{self.alpha}|{self.total_docs}|{len(self.vocabulary)}".encode())
+        for label in sorted(self.label_to_count):
+            lf = self.label_feature_counts.get(label, {})
+            h.update(f"|{label}:{self.label_to_count[label]}:{len(lf)}".encode())
+            items = sorted(f"{feat!r}={c}" for feat, c in lf.items())
+            h.update("\0".join(items).encode("utf-8"))
+        return h.hexdigest()
+
+    def _read_manifest(self, path: Path, root: Path) -> dict[str, Any]:
+        fresh = {
+            "version": MANIFEST_VERSION,
+            "root": str(root.resolve()),
+            "hash_buckets": self.hash_buckets,
+            "files": {},
+        }
+        if not path.exists():
+            return fresh
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return fresh
+        if any(data.get(k) != fresh[k] for k in ("version", "root", "hash_buckets")):
+            return fresh
+        if self.hash_buckets:
+            for entry in data["files"].values():
+                entry["features"] = {int(k): c for k, c in entry["features"].items()}
+        return data
+
+    def _write_manifest(self, path: Path, manifest: dict[str, Any]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, path)
+
     def _update_counts(self, labels: Iterable[str], features: dict[str, int]) -> None:
+        self._compiled = self._model_version = None
         for label in labels:
             self.label_to_count[label] = self.label_to_count.get(label, 0) + 1
             lf = self.label_feature_counts.setdefault(label, {})
@@ -183,3 +925,19 @@ class BayesianRuleExtractor:
             return path.read_text(encoding="utf-8", errors="ignore")
         except Exception:
             return ""
+
+
+_PartialCounts = tuple[dict[str, int], dict[str, dict[str, int]], int]
+
+
+def _count_shard(paths: Sequence[str], hash_buckets: int | None) -> _PartialCounts:
+    """Map step: label/feature count tables for one shard of doc files."""
+    shard = BayesianRuleExtractor(hash_buckets=hash_buckets)
+    for name in paths:
+        path = Path(name)
+        contribution = shard._file_contribution(shard._safe_read(path), path)
+        if contribution is None:
+            continue
+        shard._update_counts(*contribution)
+        shard.total_docs += 1
+    return shard.label_to_count, shard.label_feature_counts, shard.total_docs
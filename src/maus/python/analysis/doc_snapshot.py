@@ -0,0 +1,242 @@
+"""
+Incremental AST snapshot builder for markdown documentation trees.
+
+Each markdown file becomes a DOCUMENT node with SECTION children (one per
+heading) and FUNCTION/DATA children for fenced code/data blocks. A per-file
+cache keyed by size and mtime (then content hash) means a rebuild only
+re-reads and re-parses files that actually changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from .ast_diff import ASTNode, NodeType, hash_content
+
+CACHE_VERSION = 1
+DOC_SUFFIXES = (".md",)
+DATA_LANGS = {"json", "jsonc", "yaml", "yml", "toml", "ini", "csv", "xml"}
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(`{3,}|~{3,})\s*([A-Za-z0-9_+\-.]*)")
+
+
+@dataclass
+class BuildStats:
+    files: int = 0
+    reused: int = 0  # size/mtime unchanged
+    rehashed: int = 0  # stat changed, content identical
+    parsed: int = 0
+    removed: int = 0
+    seconds: float = 0.0
+
+
+def parse_markdown(rel_path: str, text: str) -> list[ASTNode]:
+    """Split one markdown file into DOCUMENT, SECTION and block nodes."""
+    nodes = [
+        ASTNode(
+            id=rel_path,
+            type="DOCUMENT",
+            content_hash=hash_content(text),
+            path=rel_path,
+        )
+    ]
+    slugs: dict[str, int] = {}
+    section_id, section_path, level = rel_path, rel_path, 0
+    section_lines: list[str] = []
+    block_lines: list[str] = []
+    fence: str | None = None
+    lang = ""
+    blocks = 0
+
+    def close_section() -> None:
+        if section_id != rel_path:
+            nodes.append(
+                ASTNode(
+                    id=section_id,
+                    type="SECTION",
+                    content_hash=hash_content("\n".join(section_lines)),
+                    path=section_path,
+                    weight=1.0 / level,
+                )
+            )
+
+    for line in text.splitlines():
+        if fence is not None:
+            if line.strip().startswith(fence):
+                blocks += 1
+                kind: NodeType = "DATA" if lang.lower() in DATA_LANGS else "FUNCTION"
+                nodes.append(
+                    ASTNode(
+                        id=f"{section_id}:block{blocks}",
+                        type=kind,
+                        content_hash=hash_content("\n".join(block_lines)),
+                        path=section_path,
+                    )
+                )
+                fence = None
+            else:
+                block_lines.append(line)
+            section_lines.append(line)
+            continue
+
+        fm = _FENCE.match(line)
+        if fm:
+            fence, lang, block_lines = fm.group(1), fm.group(2), []
+            section_lines.append(line)
+            continue
+
+        hm = _HEADING.match(line)
+        if hm:
+            close_section()
+            slug = _slugify(hm.group(2)) or "section"
+            seen = slugs.get(slug, 0)
+            slugs[slug] = seen + 1
+            if seen:
+                slug = f"{slug}-{seen}"
+            section_id = section_path = f"{rel_path}#{slug}"
+            level = len(hm.group(1))
+            section_lines = [line]
+            blocks = 0
+            continue
+
+        section_lines.append(line)
+
+    close_section()
+    return nodes
+
+
+class DocSnapshotBuilder:
+    """
+    Walks a docs root and produces ASTNode snapshots, reusing per-file
+    results from a persistent cache for files that did not change.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        cache_path: str | Path | None = None,
+    ) -> None:
+        self.root = Path(root)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.stats = BuildStats()
+        self._files: dict[str, dict[str, Any]] = {}
+        if self.cache_path and self.cache_path.exists():
+            try:
+                data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+                if data.get("version") == CACHE_VERSION and (
+                    data.get("root") == str(self.root.resolve())
+                ):
+                    self._files = data.get("files", {})
+            except Exception:
+                self._files = {}
+
+    def build(self) -> list[ASTNode]:
+        """Return all nodes, sorted by id (ready for iter_delta_sorted)."""
+        t0 = time.perf_counter()
+        self.stats = BuildStats()
+        prefix = self.root.name
+        seen: dict[str, dict[str, Any]] = {}
+        nodes: list[ASTNode] = []
+
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if not name.lower().endswith(DOC_SUFFIXES):
+                    continue
+                full = os.path.join(dirpath, name)
+                rel = f"{prefix}/{os.path.relpath(full, self.root)}".replace(
+                    os.sep, "/"
+                )
+                entry = self._load_file(full, rel)
+                if entry is None:
+                    continue
+                seen[rel] = entry
+                nodes.extend(ASTNode(**d) for d in entry["nodes"])
+
+        self.stats.files = len(seen)
+        self.stats.removed = len(self._files.keys() - seen.keys())
+        self._files = seen
+        nodes.sort(key=lambda n: n.id)
+        self.stats.seconds = time.perf_counter() - t0
+        return nodes
+
+    def save_cache(self) -> None:
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(self.cache_path.suffix + ".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "version": CACHE_VERSION,
+                    "root": str(self.root.resolve()),
+                    "files": self._files,
+                }
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.cache_path)
+
+    # ---------------------------- internals ----------------------------
+    def _load_file(self, full: str, rel: str) -> dict[str, Any] | None:
+        try:
+            st = os.stat(full)
+        except OSError:
+            return None
+        cached = self._files.get(rel)
+        if cached and cached["size"] == st.st_size and (
+            cached["mtime_ns"] == st.st_mtime_ns
+        ):
+            self.stats.reused += 1
+            return cached
+
+        try:
+            raw = Path(full).read_bytes()
+        except OSError:
+            return None
+        digest = hashlib.sha256(raw).hexdigest()
+        if cached and cached["sha256"] == digest:
+            self.stats.rehashed += 1
+            nodes = cached["nodes"]
+        else:
+            self.stats.parsed += 1
+            text = raw.decode("utf-8", errors="ignore")
+            nodes = [_node_dict(n) for n in parse_markdown(rel, text)]
+        return {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": digest,
+            "nodes": nodes,
+        }
+
+
+def write_snapshot(nodes: list[ASTNode], path: str | Path) -> None:
+    """Write `{"nodes": [...]}` JSON, or one node per line for .jsonl paths."""
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    if p.suffix.lower() in {".jsonl", ".ndjson"}:
+        with open(p, "w", encoding="utf-8") as f:
+            for n in nodes:
+                f.write(json.dumps(_node_dict(n)) + "\n")
+        return
+    data = {"nodes": [_node_dict(n) for n in nodes]}
+    p.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _node_dict(n: ASTNode) -> dict[str, Any]:
+    d = asdict(n)
+    if d.get("sketch") is None:
+        d.pop("sketch", None)
+    return d
+
+
+def _slugify(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
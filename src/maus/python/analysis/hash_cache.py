@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from .ast_diff import hash_content
+
+CACHE_VERSION = 2
+# Below this many pending hashes a thread pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+
+@dataclass
+class HashStats:
+    nodes: int = 0
+    precomputed: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # Repeats of a key already pending in the same run; hashed once
+    deduplicated: int = 0
+    uncacheable: int = 0
+    hashed: int = 0
+    bytes_hashed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+    @property
+    def throughput_mb_s(self) -> float:
+        return self.bytes_hashed / 1e6 / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        out = asdict(self)
+        out["seconds"] = round(self.seconds, 4)
+        out["hit_rate"] = round(self.hit_rate, 4)
+        out["throughput_mb_s"] = round(self.throughput_mb_s, 2)
+        return out
+
+    def merge(self, other: HashStats) -> None:
+        for name in (
+            "nodes",
+            "precomputed",
+            "cache_hits",
+            "cache_misses",
+            "deduplicated",
+            "uncacheable",
+            "hashed",
+            "bytes_hashed",
+            "seconds",
+        ):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+class HashCache:
+    """
+    Persistent content-hash cache for snapshot nodes.
+
+    Entries are keyed by node path and id plus either an upstream
+    `fingerprint` or the node's `mtime` (and `size`, when given); nodes
+    carrying neither are always hashed.
+    Only entries used since loading are written back, so deleted files drop
+    out of the cache on the next save.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path else None
+        self._entries: dict[str, str] = {}
+        self._used: dict[str, str] = {}
+        if self.path and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == CACHE_VERSION:
+                    self._entries = {
+                        str(k): str(v) for k, v in data.get("entries", {}).items()
+                    }
+            except Exception:
+                # Corrupt cache is only a performance problem; start fresh
+                self._entries = {}
+
+    def get(self, key: str) -> str | None:
+        value = self._entries.get(key)
+        if value is not None:
+            self._used[key] = value
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        self._entries[key] = value
+        self._used[key] = value
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": CACHE_VERSION, "entries": self._used}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+
+def cache_key(node: dict[str, Any]) -> str | None:
+    # Many nodes share a path (every block of a doc section), and all nodes
+    # of one file share its mtime, so the id is what tells them apart
+    where = f"{node.get('path', '')}\0{node.get('id', '')}"
+    if node.get("fingerprint"):
+        return f"{where}\0fp\0{node['fingerprint']}"
+    if node.get("mtime") is not None:
+        # No stand-in size from the content: an edit that keeps the length
+        # would keep the key
+        size = node.get("size")
+        return f"{where}\0{'' if size is None else size}\0{node['mtime']}"
+    return None
+
+
+def fill_content_hashes(
+    nodes: Iterable[dict[str, Any]],
+    cache: HashCache | None = None,
+    workers: int | None = None,
+    pool: ThreadPoolExecutor | None = None,
+) -> HashStats:
+    """
+    Set `content_hash` on every raw node dict that lacks one.
+
+    Cache misses are hashed on a thread pool; hashlib releases the GIL for
+    large buffers so this scales with cores for big documents. Pass `pool`
+    to reuse one executor across calls.
+    """
+    stats = HashStats()
+    pending: list[tuple[dict[str, Any], str | None]] = []
+    # Same key seen twice in one run (e.g. unchanged in old and new snapshot)
+    duplicates: dict[str, list[dict[str, Any]]] = {}
+    for node in nodes:
+        stats.nodes += 1
+        if node.get("content_hash"):
+            stats.precomputed += 1
+            continue
+        key = cache_key(node) if cache is not None else None
+        if key is None:
+            stats.uncacheable += 1
+        else:
+            cached = cache.get(key)  # type: ignore[union-attr]
+            if cached is not None:
+                stats.cache_hits += 1
+                node["content_hash"] = cached
+                continue
+            if key in duplicates:
+                stats.deduplicated += 1
+                duplicates[key].append(node)
+                continue
+            duplicates[key] = []
+            stats.cache_misses += 1
+        pending.append((node, key))
+
+    contents = [str(node.get("content", "")) for node, _ in pending]
+    t0 = time.perf_counter()
+    if pool is not None and len(contents) >= PARALLEL_THRESHOLD:
+        hashes = list(pool.map(hash_content, contents))
+    elif workers != 1 and len(contents) >= PARALLEL_THRESHOLD:
+        with ThreadPoolExecutor(max_workers=workers) as own_pool:
+            hashes = list(own_pool.map(hash_content, contents))
+    else:
+        hashes = [hash_content(c) for c in contents]
+    stats.seconds = time.perf_counter() - t0
+
+    for (node, key), content, digest in zip(pending, contents, hashes, strict=True):
+        node["content_hash"] = digest
+        stats.hashed += 1
+        stats.bytes_hashed += len(content.encode("utf-8"))
+        if key is not None and cache is not None:
+            cache.put(key, digest)
+            for dup in duplicates[key]:
+                dup["content_hash"] = digest
+    return stats
+
+
+def iter_hashed(
+    nodes: Iterable[dict[str, Any]],
+    stats: HashStats,
+    cache: HashCache | None = None,
+    workers: int | None = None,
+    chunk_size: int = 1024,
+) -> Iterator[dict[str, Any]]:
+    """
+    Streaming form of fill_content_hashes: hashes `chunk_size` nodes at a
+    time and yields them in input order, accumulating into `stats`.
+    """
+    pool = ThreadPoolExecutor(max_workers=workers) if workers != 1 else None
+    try:
+        chunk: list[dict[str, Any]] = []
+        for node in nodes:
+            chunk.append(node)
+            if len(chunk) >= chunk_size:
+                stats.merge(fill_content_hashes(chunk, cache, workers, pool))
+                yield from chunk
+                chunk = []
+        if chunk:
+            stats.merge(fill_content_hashes(chunk, cache, workers, pool))
+            yield from chunk
+    finally:
+        if pool is not None:
+            pool.shutdown()
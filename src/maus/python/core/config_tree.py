@@ -0,0 +1,318 @@
+"""
+Directory-wide config analysis on a process pool.
+
+analyze_tree() finds config files under a root, analyzes each one with a
+SemanticConfigAnalyzer in worker processes and yields one FileAnalysis per
+file, in sorted path order, as results arrive. A TreeStats passed in is
+filled with tag counts across the tree and per-file timings.
+
+With a manifest, files whose size and mtime match the stored entry are not
+read at all; files whose stat changed but whose content hash did not are
+not parsed. Either way their stored tags are reported (with no document).
+The manifest is tied to the root, the analyzer's rules version and the
+analysis options, and is rewritten atomically (once iteration completes)
+when anything changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import os
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import repeat
+from pathlib import Path
+from typing import Any
+
+from .semantic_config import SemanticConfigAnalyzer, SemanticDocument
+
+CONFIG_GLOBS = (
+    "**/*.json",
+    "**/*.yaml",
+    "**/*.yml",
+    "**/*.toml",
+    "**/*.ini",
+    "**/*.cfg",
+)
+EXCLUDE_DIRS = frozenset({".git", ".hg", "node_modules", "__pycache__", ".venv"})
+TREE_MANIFEST_VERSION = 1
+# Below this many files to analyze, process start-up costs more than it saves
+PARALLEL_MIN_FILES = 16
+SLOWEST_KEPT = 10
+
+
+@dataclass
+class FileAnalysis:
+    path: str  # relative to the root, POSIX separators
+    tags: list[str]
+    seconds: float = 0.0  # read + hash + analyze, in the worker
+    size: int = 0
+    cached: bool = False  # tags taken from the manifest
+    document: SemanticDocument | None = None
+    error: str | None = None
+    sha256: str | None = field(default=None, repr=False)
+
+
+@dataclass
+class TreeStats:
+    files: int = 0
+    analyzed: int = 0
+    unchanged: int = 0  # size/mtime unchanged, not read
+    rehashed: int = 0  # stat changed, content identical, not parsed
+    deleted: int = 0  # dropped from the manifest
+    errors: int = 0
+    bytes_analyzed: int = 0
+    seconds: float = 0.0  # wall clock
+    file_seconds: float = 0.0  # sum of per-file times
+    workers: int = 1
+    tag_counts: dict[str, int] = field(default_factory=dict)
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+
+    @property
+    def parallel_efficiency(self) -> float:
+        """file_seconds / (seconds * workers); 1.0 is perfect scaling."""
+        wall = self.seconds * self.workers
+        return self.file_seconds / wall if wall else 0.0
+
+    def add(self, result: FileAnalysis) -> None:
+        self.files += 1
+        for tag in result.tags:
+            self.tag_counts[tag] = self.tag_counts.get(tag, 0) + 1
+        if result.error:
+            self.errors += 1
+        if result.cached:
+            return
+        self.analyzed += 1
+        self.bytes_analyzed += result.size
+        self.file_seconds += result.seconds
+        entry = (result.seconds, result.path)
+        if len(self.slowest) < SLOWEST_KEPT:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+    def to_dict(self) -> dict[str, Any]:
+        out = asdict(self)
+        out["seconds"] = round(self.seconds, 4)
+        out["file_seconds"] = round(self.file_seconds, 4)
+        out["parallel_efficiency"] = round(self.parallel_efficiency, 3)
+        out["tag_counts"] = dict(sorted(self.tag_counts.items()))
+        out["slowest"] = [
+            {"path": p, "ms": round(s * 1000, 3)}
+            for s, p in sorted(self.slowest, reverse=True)
+        ]
+        return out
+
+
+def iter_config_files(
+    root: str | Path, globs: Iterable[str] = CONFIG_GLOBS
+) -> list[Path]:
+    """Files matching any of `globs` under `root`, sorted, skipping EXCLUDE_DIRS."""
+    base = Path(root)
+    found: set[Path] = set()
+    for pattern in globs:
+        for path in base.glob(pattern):
+            rel = path.relative_to(base)
+            if path.is_file() and not EXCLUDE_DIRS.intersection(rel.parts[:-1]):
+                found.add(path)
+    return sorted(found)
+
+
+def analyze_tree(
+    root: str | Path,
+    globs: Sequence[str] = CONFIG_GLOBS,
+    *,
+    analyzer: SemanticConfigAnalyzer | None = None,
+    manifest_path: str | Path | None = None,
+    workers: int | None = None,
+    documents: bool = False,
+    max_nodes: int | None = None,
+    sample_arrays: int | None = None,
+    stats: TreeStats | None = None,
+) -> Iterator[FileAnalysis]:
+    """
+    Analyze every config file under `root`; see the module docstring.
+
+    Yields tag sets only unless `documents` is set, in which case freshly
+    analyzed files also carry their SemanticDocument (node paths rendered,
+    trails dropped, so they are cheap to send back from the workers).
+    """
+    t0 = time.perf_counter()
+    stats = stats if stats is not None else TreeStats()
+    analyzer = analyzer or SemanticConfigAnalyzer()
+    base = Path(root)
+    options = {"max_nodes": max_nodes, "sample_arrays": sample_arrays}
+    manifest = (
+        _read_manifest(Path(manifest_path), base, analyzer, options)
+        if manifest_path
+        else None
+    )
+    known: dict[str, dict[str, Any]] = manifest["files"] if manifest else {}
+
+    rels: list[str] = []
+    pending: list[tuple[str, str | None]] = []  # (rel, known digest)
+    sizes: dict[str, tuple[int, int]] = {}
+    for path in iter_config_files(base, globs):
+        rel = path.relative_to(base).as_posix()
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        rels.append(rel)
+        sizes[rel] = (st.st_size, st.st_mtime_ns)
+        old = known.get(rel)
+        if old and (old["size"], old["mtime_ns"]) == sizes[rel]:
+            continue
+        pending.append((rel, old["sha256"] if old else None))
+
+    n_workers = workers or os.cpu_count() or 1
+    stats.workers = n_workers if len(pending) >= PARALLEL_MIN_FILES else 1
+    results = _run(
+        analyzer, base, pending, stats.workers, documents, max_nodes, sample_arrays
+    )
+    to_analyze = {rel for rel, _ in pending}
+    dirty = False
+    try:
+        for rel in rels:
+            if rel not in to_analyze:  # unchanged since the manifest
+                result = FileAnalysis(rel, list(known[rel]["tags"]), cached=True)
+                stats.unchanged += 1
+            else:
+                # Pending files are in `rels` order, as are their results
+                result = next(results)
+                entry = known.get(rel)
+                if result.error is None and result.cached and entry:
+                    stats.rehashed += 1
+                    result.tags = list(entry["tags"])
+                    entry.update(size=sizes[rel][0], mtime_ns=sizes[rel][1])
+                    dirty = True
+                elif result.error is None:
+                    known[rel] = {
+                        "size": sizes[rel][0],
+                        "mtime_ns": sizes[rel][1],
+                        "sha256": result.sha256,
+                        "tags": result.tags,
+                    }
+                    dirty = True
+            stats.add(result)
+            yield result
+    finally:
+        results.close()
+
+    for rel in [r for r in known if r not in sizes]:
+        del known[rel]
+        stats.deleted += 1
+        dirty = True
+    if manifest is not None and (dirty or not Path(manifest_path).exists()):
+        _write_manifest(Path(manifest_path), manifest)
+    stats.seconds = time.perf_counter() - t0
+
+
+# ------------------------------ internals ------------------------------
+_worker_analyzer: SemanticConfigAnalyzer | None = None
+
+
+def _init_worker(analyzer: SemanticConfigAnalyzer) -> None:
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _run(
+    analyzer: SemanticConfigAnalyzer,
+    base: Path,
+    pending: list[tuple[str, str | None]],
+    workers: int,
+    documents: bool,
+    max_nodes: int | None,
+    sample_arrays: int | None,
+) -> Iterator[FileAnalysis]:
+    """FileAnalysis per pending file, in order, serially or on a pool."""
+    args = (
+        repeat(str(base)),
+        [rel for rel, _ in pending],
+        [digest for _, digest in pending],
+        repeat(documents),
+        repeat(max_nodes),
+        repeat(sample_arrays),
+    )
+    if workers == 1:
+        yield from map(_analyze_one, *args, repeat(analyzer))
+        return
+    pool = ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(analyzer,)
+    )
+    try:
+        chunksize = max(1, len(pending) // (workers * 8))
+        yield from pool.map(_analyze_one, *args, chunksize=chunksize)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _analyze_one(
+    base: str,
+    rel: str,
+    known_digest: str | None,
+    documents: bool,
+    max_nodes: int | None,
+    sample_arrays: int | None,
+    analyzer: SemanticConfigAnalyzer | None = None,
+) -> FileAnalysis:
+    t0 = time.perf_counter()
+    path = Path(base, rel)
+    result = FileAnalysis(rel, [])
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+            result.size = f.tell()
+        if digest == known_digest:
+            result.cached = True
+        else:
+            analyzer = analyzer or _worker_analyzer or SemanticConfigAnalyzer()
+            doc = analyzer.analyze_file(path, max_nodes, sample_arrays)
+            result.tags = analyzer.infer_constraints(doc)
+            result.sha256 = digest
+            if documents:
+                for node in doc.nodes:
+                    node.path = node.path  # render, then drop the trail chain
+                    node.trail = None
+                result.document = doc
+    except (OSError, ValueError) as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.seconds = time.perf_counter() - t0
+    return result
+
+
+def _read_manifest(
+    path: Path,
+    root: Path,
+    analyzer: SemanticConfigAnalyzer,
+    options: dict[str, Any],
+) -> dict[str, Any]:
+    fresh = {
+        "version": TREE_MANIFEST_VERSION,
+        "root": str(root.resolve()),
+        "rules_version": analyzer.rules.version,
+        "options": options,
+        "files": {},
+    }
+    if not path.exists():
+        return fresh
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return fresh
+    keys = ("version", "root", "rules_version", "options")
+    if any(data.get(k) != fresh[k] for k in keys):
+        return fresh
+    return data
+
+
+def _write_manifest(path: Path, manifest: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(tmp, path)
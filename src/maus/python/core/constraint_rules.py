@@ -0,0 +1,213 @@
+"""
+Declarative constraint rules compiled into a keyword -> rule inverted index.
+
+A rule fires once per document when some leaf's name is one of its
+keywords and, when the rule has a `path` pattern, that leaf's path matches
+it. A tag's score is the sum of the weights of its fired rules, and the tag
+is inferred when the score exceeds the rule set's threshold.
+
+Evaluation is one pass over the leaves with a dict lookup per leaf, so its
+cost depends on the leaves and the rules sharing each keyword, not on the
+total number of rules. Paths are only rendered for leaves whose keyword has
+a path-conditioned rule.
+
+Rule files are JSON or YAML (PyYAML optional):
+
+    {"version": 1, "threshold": 0.0, "rules": [
+        {"tag": "#Performance", "keywords": ["fps", "latency"]},
+        {"tag": "#MausDataMap", "keywords": ["version"],
+         "path": "$.header.*", "weight": 2.0, "name": "header-version"}
+    ]}
+
+Path patterns are matched against the full `$.a[0].b` path: `*` matches
+within one key or index, `**` matches anything.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, TypeVar
+
+try:
+    import yaml as _yaml  # type: ignore
+except Exception:  # pragma: no cover
+    _yaml = None
+
+T = TypeVar("T")
+
+RULES_FORMAT_VERSION = 1
+
+# Built-in rules: constraint tag -> leaf names that imply it
+CONSTRAINT_KEYS: tuple[tuple[str, frozenset[str]], ...] = (
+    ("#Permissions", frozenset({"accessibility", "screen_recording"})),
+    ("#Performance", frozenset({"fps", "latency", "buffer", "batch", "grid"})),
+    ("#BerryTimeline", frozenset({"timeline", "playback", "zoom", "selection"})),
+    ("#BerryWindow", frozenset({"overlay", "opacity", "clickthrough", "grid"})),
+    ("#MausDataMap", frozenset({"events", "header", "metadata", "version"})),
+)
+
+
+@dataclass(frozen=True)
+class ConstraintRule:
+    tag: str
+    keywords: frozenset[str]
+    weight: float = 1.0
+    path: str | None = None
+    name: str = ""
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {"tag": self.tag, "keywords": sorted(self.keywords)}
+        if self.weight != 1.0:
+            out["weight"] = self.weight
+        if self.path is not None:
+            out["path"] = self.path
+        if self.name:
+            out["name"] = self.name
+        return out
+
+
+def compile_path_pattern(pattern: str) -> re.Pattern[str]:
+    if not pattern.startswith("$"):
+        pattern = "$." + pattern
+    parts = re.split(r"(\*\*|\*)", pattern)
+    return re.compile(
+        "".join(
+            ".*" if p == "**" else r"[^.\[\]]*" if p == "*" else re.escape(p)
+            for p in parts
+        )
+    )
+
+
+class ConstraintRules:
+    """A compiled rule set; see the module docstring for the semantics."""
+
+    def __init__(self, rules: Iterable[ConstraintRule], threshold: float = 0.0) -> None:
+        self.rules = tuple(
+            r if r.name else replace(r, name=f"{r.tag}:{i}")
+            for i, r in enumerate(rules)
+        )
+        self.threshold = threshold
+        self.tags = tuple(dict.fromkeys(r.tag for r in self.rules))
+        index: dict[str, list[tuple[int, re.Pattern[str] | None]]] = {}
+        for rid, rule in enumerate(self.rules):
+            pattern = compile_path_pattern(rule.path) if rule.path else None
+            for keyword in rule.keywords:
+                index.setdefault(keyword.lower(), []).append((rid, pattern))
+        self._index = {k: tuple(v) for k, v in index.items()}
+        self.keywords = frozenset(self._index)
+        self.needs_paths = any(r.path for r in self.rules)
+        # With only positive weights a tag can never drop out once inferred,
+        # so a walk may stop as soon as every tag has been inferred
+        self._monotone = all(r.weight > 0 for r in self.rules) and threshold <= 0
+        self._ids = {r.name: rid for rid, r in enumerate(self.rules)}
+        self.version = hashlib.blake2b(
+            json.dumps(self.to_dict(), sort_keys=True).encode("utf-8"), digest_size=8
+        ).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @classmethod
+    def default(cls) -> ConstraintRules:
+        return cls(ConstraintRule(tag, keys) for tag, keys in CONSTRAINT_KEYS)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> ConstraintRules:
+        version = data.get("version", RULES_FORMAT_VERSION)
+        if version != RULES_FORMAT_VERSION:
+            raise ValueError(f"unsupported rules version: {version}")
+        rules = []
+        for i, raw in enumerate(data.get("rules", [])):
+            try:
+                keywords = raw["keywords"]
+                if isinstance(keywords, str):
+                    keywords = [keywords]
+                rules.append(
+                    ConstraintRule(
+                        tag=str(raw["tag"]),
+                        keywords=frozenset(str(k).lower() for k in keywords),
+                        weight=float(raw.get("weight", 1.0)),
+                        path=raw.get("path"),
+                        name=str(raw.get("name", "")),
+                    )
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"invalid rule #{i}: {e!r}") from None
+        return cls(rules, threshold=float(data.get("threshold", 0.0)))
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> ConstraintRules:
+        p = Path(path)
+        text = p.read_text(encoding="utf-8")
+        if p.suffix.lower() in (".yaml", ".yml"):
+            if _yaml is None:
+                raise ValueError(f"PyYAML is required to read {p}")
+            data = _yaml.safe_load(text) or {}
+        else:
+            data = json.loads(text)
+        return cls.from_dict(data)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": RULES_FORMAT_VERSION,
+            "threshold": self.threshold,
+            "rules": [r.to_dict() for r in self.rules],
+        }
+
+    def fire(
+        self,
+        items: Iterable[T],
+        name: Callable[[T], str],
+        path: Callable[[T], str],
+        fired: set[int] | None = None,
+        early_stop: bool = False,
+    ) -> set[int]:
+        """
+        Ids of the rules fired by `items` (added to `fired` when given).
+        `name` and `path` read a leaf's name and `$.` path; `path` is only
+        called for keyword hits with a path-conditioned rule.
+        """
+        fired = set() if fired is None else fired
+        index = self._index
+        early_stop = early_stop and self._monotone
+        inferred = {self.rules[rid].tag for rid in fired} if early_stop else set()
+        for item in items:
+            hits = index.get(name(item).lower())
+            if hits is None:
+                continue
+            leaf_path = None
+            for rid, pattern in hits:
+                if rid in fired:
+                    continue
+                if pattern is not None:
+                    if leaf_path is None:
+                        leaf_path = path(item)
+                    if pattern.fullmatch(leaf_path) is None:
+                        continue
+                fired.add(rid)
+                if early_stop:
+                    inferred.add(self.rules[rid].tag)
+            if early_stop and len(inferred) == len(self.tags):
+                break
+        return fired
+
+    def scores(self, fired: Iterable[int]) -> dict[str, float]:
+        out: dict[str, float] = {}
+        for rid in fired:
+            rule = self.rules[rid]
+            out[rule.tag] = out.get(rule.tag, 0.0) + rule.weight
+        return out
+
+    def tags_for(self, fired: Iterable[int]) -> list[str]:
+        return sorted(t for t, s in self.scores(fired).items() if s > self.threshold)
+
+    def names_of(self, fired: Iterable[int]) -> list[str]:
+        return sorted(self.rules[rid].name for rid in fired)
+
+    def ids_of(self, names: Iterable[str]) -> set[int]:
+        return {self._ids[n] for n in names if n in self._ids}
@@ -0,0 +1,221 @@
+"""
+Drag-path simplification for .maus recordings.
+
+Runs of consecutive `drag` events (same button and modifiers) are thinned so
+that every dropped event lies within `tolerance` grid units of the kept path
+at its own timestamp (synchronized Euclidean distance). Measuring deviation at
+the event's time, rather than perpendicular to the segment, keeps playback
+speed along the path unchanged as well as its shape. The first and last event
+of every run are always kept verbatim.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
+
+from .maus_data_map import Event, MausDataMap
+
+DRAG = "drag"
+
+
+@dataclass
+class SimplifyStats:
+    events_in: int = 0
+    events_out: int = 0
+    max_deviation: float = 0.0
+
+    @property
+    def removed(self) -> int:
+        return self.events_in - self.events_out
+
+    @property
+    def ratio(self) -> float:
+        """Compression ratio (input drag events per kept drag event)."""
+        return self.events_in / self.events_out if self.events_out else 1.0
+
+    def merge(self, other: SimplifyStats) -> None:
+        self.events_in += other.events_in
+        self.events_out += other.events_out
+        self.max_deviation = max(self.max_deviation, other.max_deviation)
+
+
+def sync_deviation(p: Event, a: Event, b: Event) -> float:
+    """Distance in grid units between `p` and the a->b segment at p.time."""
+    span = b.time - a.time
+    f = (p.time - a.time) / span if span else 0.0
+    x = a.grid.x + f * (b.grid.x - a.grid.x)
+    y = a.grid.y + f * (b.grid.y - a.grid.y)
+    return math.hypot(p.grid.x - x, p.grid.y - y)
+
+
+def simplify_run(
+    run: Sequence[Event],
+    tolerance: float,
+    max_gap_ms: int | None = None,
+) -> tuple[list[Event], float]:
+    """
+    Ramer-Douglas-Peucker over one drag run.
+
+    Returns the kept events and the maximum deviation of any dropped event.
+    When `max_gap_ms` is set, no two kept events are further apart in time
+    than that (unless no event exists between them).
+    """
+    n = len(run)
+    if n <= 2:
+        return list(run), 0.0
+
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    max_dev = 0.0
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        a, b = run[i], run[j]
+        k, d = i + 1, -1.0
+        for m in range(i + 1, j):
+            dm = sync_deviation(run[m], a, b)
+            if dm > d:
+                k, d = m, dm
+        too_long = max_gap_ms is not None and b.time - a.time > max_gap_ms
+        if d > tolerance or too_long:
+            keep[k] = True
+            stack.append((i, k))
+            stack.append((k, j))
+        else:
+            max_dev = max(max_dev, d)
+
+    return [e for e, kept in zip(run, keep, strict=True) if kept], max_dev
+
+
+def simplify_events(
+    events: Sequence[Event],
+    tolerance: float = 0.5,
+    max_gap_ms: int | None = None,
+) -> tuple[list[Event], SimplifyStats]:
+    """Simplify every drag run in an event list; other events pass through."""
+    out: list[Event] = []
+    stats = SimplifyStats()
+    run: list[Event] = []
+
+    def flush() -> None:
+        kept, dev = simplify_run(run, tolerance, max_gap_ms)
+        out.extend(kept)
+        stats.merge(SimplifyStats(len(run), len(kept), dev))
+        run.clear()
+
+    for evt in events:
+        if run and not _continues_run(run[-1], evt):
+            flush()
+        if evt.action.type == DRAG:
+            run.append(evt)
+        else:
+            out.append(evt)
+    flush()
+    return out, stats
+
+
+def simplify_map(
+    mdm: MausDataMap,
+    tolerance: float = 0.5,
+    max_gap_ms: int | None = None,
+) -> tuple[MausDataMap, SimplifyStats]:
+    """Batch pass over a stored recording; returns a new MausDataMap."""
+    events, stats = simplify_events(mdm.events, tolerance, max_gap_ms)
+    return replace(mdm, events=events), stats
+
+
+class StreamingDragSimplifier:
+    """
+    Online drag simplification for EventPipeline (opening-window algorithm).
+
+    Each drag event is held back until a later event proves whether it is
+    needed, so memory is bounded by `max_buffer` pending events per run.
+    Every dropped event is still within `tolerance` of the emitted path.
+    """
+
+    def __init__(
+        self,
+        tolerance: float = 0.5,
+        max_gap_ms: int | None = None,
+        max_buffer: int = 256,
+    ) -> None:
+        self.tolerance = tolerance
+        self.max_gap_ms = max_gap_ms
+        self.max_buffer = max(2, max_buffer)
+        self.stats = SimplifyStats()
+        self._anchor: Event | None = None
+        self._pending: list[Event] = []
+        self._pending_dev = 0.0
+
+    def push(self, evt: Event) -> list[Event]:
+        """Feed one event; returns the events that are now final."""
+        if self._anchor is not None and _continues_run(self._anchor, evt):
+            self.stats.events_in += 1
+            return self._extend(evt)
+
+        out = self.flush()
+        if evt.action.type == DRAG:
+            self.stats.events_in += 1
+            self.stats.events_out += 1
+            self._anchor = evt
+        out.append(evt)
+        return out
+
+    def flush(self) -> list[Event]:
+        """Close the open drag run, emitting its final event."""
+        out = self.peek()
+        if out:
+            self._emit_pending_end()
+        self._anchor = None
+        self._pending = []
+        return out
+
+    def peek(self) -> list[Event]:
+        """Events `flush` would emit, without changing state."""
+        return self._pending[-1:]
+
+    # ---------------------------- internals ----------------------------
+    def _extend(self, evt: Event) -> list[Event]:
+        assert self._anchor is not None
+        if self._pending:
+            dev = self._window_deviation(evt)
+            gap_ok = (
+                self.max_gap_ms is None
+                or evt.time - self._anchor.time <= self.max_gap_ms
+            )
+            if dev > self.tolerance or not gap_ok or (
+                len(self._pending) >= self.max_buffer
+            ):
+                end = self._pending[-1]
+                self._emit_pending_end()
+                self._anchor = end
+                self._pending = [evt]
+                self._pending_dev = 0.0
+                return [end]
+            self._pending_dev = dev
+        self._pending.append(evt)
+        return []
+
+    def _window_deviation(self, end: Event) -> float:
+        assert self._anchor is not None
+        return max(
+            (sync_deviation(p, self._anchor, end) for p in self._pending),
+            default=0.0,
+        )
+
+    def _emit_pending_end(self) -> None:
+        self.stats.events_out += 1
+        self.stats.max_deviation = max(self.stats.max_deviation, self._pending_dev)
+
+
+def _continues_run(prev: Event, evt: Event) -> bool:
+    return (
+        prev.action.type == DRAG
+        and evt.action.type == DRAG
+        and prev.action.button == evt.action.button
+        and prev.action.modifiers == evt.action.modifiers
+    )
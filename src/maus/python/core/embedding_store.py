@@ -0,0 +1,375 @@
+"""
+Precomputed section embeddings for Docs/ with top-k cosine search.
+
+Every doc file is split into sections at its Markdown headings (outside
+code fences); each section is encoded once with TransformerEncoder and
+stored as a unit-length float32 row, so cosine similarity is a dot product.
+Use a positional=False encoder: with positional slots the same words at
+different offsets do not overlap, and similarities are noise.
+
+Store layout (one file, replaced atomically on every update):
+
+    MAGIC | u64 header offset | u64 header length | pad to 64
+    float32 matrix, rows x dim, native byte order | JSON header
+
+The header holds the section ids, titles and tags, plus a per-file
+manifest (size, mtime, sha256 and the file's row range). update() re-encodes
+only added or changed files and copies every other file's rows across.
+Loading maps the file; with NumPy the matrix is a zero-copy view and
+queries run as blocked matrix-vector products with a per-block top-k.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from ..analysis.bayesian_extractor import DOC_SUFFIXES, TAG_PATTERN
+from .encoder import ENCODER_SEED, TransformerEncoder
+
+try:
+    import numpy as _np  # type: ignore
+except Exception:  # pragma: no cover
+    _np = None
+
+if TYPE_CHECKING:
+    from .encoder import Embedding, EmbeddingMatrix
+
+MAGIC = b"MAUSEMB\x01"
+STORE_VERSION = 1
+_PREFIX = struct.Struct("<8sQQ")
+_DATA_OFFSET = 64
+# Rows per matrix-vector product in search(); bounds the score buffer
+SEARCH_BLOCK = 16384
+_HEADING = re.compile(r"#{1,6}\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"\s*(```|~~~)")
+_TAG_MARKER = re.compile(r"\s*\[#[A-Za-z0-9_]+\]")
+
+
+@dataclass
+class Section:
+    id: str  # "<relative path>#<heading>", numbered when a heading repeats
+    title: str
+    text: str
+    tags: list[str]
+
+
+@dataclass
+class StoreStats:
+    files: int = 0
+    unchanged: int = 0  # size/mtime unchanged
+    rehashed: int = 0  # stat changed, content identical
+    added: int = 0
+    changed: int = 0
+    deleted: int = 0
+    sections: int = 0
+    encoded: int = 0  # sections (re-)encoded by this update
+    seconds: float = 0.0
+
+
+# (relative path, manifest entry, kept row range or None, new sections)
+_PlanEntry = tuple[str, dict[str, Any], tuple[int, int] | None, list[Section]]
+
+
+def split_sections(text: str, rel: str) -> list[Section]:
+    """Sections of one doc at its headings; text before the first is the intro."""
+    chunks: list[tuple[str, list[str]]] = [("", [])]
+    in_fence = False
+    for line in text.splitlines():
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        m = None if in_fence else _HEADING.fullmatch(line)
+        if m is not None:
+            chunks.append((_TAG_MARKER.sub("", m.group(1)).strip(), [line]))
+        else:
+            chunks[-1][1].append(line)
+
+    sections: list[Section] = []
+    seen: dict[str, int] = {}
+    for title, lines in chunks:
+        body = "\n".join(lines).strip()
+        if not body:
+            continue
+        n = seen[title] = seen.get(title, 0) + 1
+        anchor = title if n == 1 else f"{title}~{n}"
+        tags = [f"#{a or b}" for a, b in TAG_PATTERN.findall(body)]
+        sections.append(
+            Section(f"{rel}#{anchor}", title or rel, body, list(dict.fromkeys(tags)))
+        )
+    return sections
+
+
+class EmbeddingStore:
+    """Section embeddings of a docs tree, persisted at `path`."""
+
+    def __init__(self, path: str | Path, encoder: TransformerEncoder) -> None:
+        self.path = Path(path)
+        self.encoder = encoder
+        self.ids: list[str] = []
+        self.titles: list[str] = []
+        self.tags: list[list[str]] = []
+        self._files: dict[str, dict[str, Any]] = {}
+        self._root: str | None = None
+        self._mm: mmap.mmap | None = None
+        self._matrix: Any = None  # ndarray view, or memoryview of floats
+        self._tag_index: dict[str, list[str]] | None = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.encoder.dim
+
+    def load(self) -> bool:
+        """Map the stored vectors; False if missing or built differently."""
+        try:
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        try:
+            magic, offset, length = _PREFIX.unpack_from(mm)
+            header = json.loads(mm[offset : offset + length]) if magic == MAGIC else {}
+        except (struct.error, ValueError):
+            header = {}
+        expected = {
+            "version": STORE_VERSION,
+            "dim": self.dim,
+            "encoder_seed": ENCODER_SEED,
+            "positional": self.encoder.positional,
+            "byteorder": sys.byteorder,
+        }
+        if any(header.get(k) != v for k, v in expected.items()):
+            mm.close()
+            return False
+        rows = len(header["ids"])
+        if _np is not None:
+            matrix: Any = _np.frombuffer(
+                mm, dtype=_np.float32, count=rows * self.dim, offset=_DATA_OFFSET
+            ).reshape(rows, self.dim)
+        else:
+            matrix = memoryview(mm)[_DATA_OFFSET : _DATA_OFFSET + rows * self.dim * 4]
+            matrix = matrix.cast("f")
+        self._unmap()
+        self._mm, self._matrix = mm, matrix
+        self.ids, self.titles = header["ids"], header["titles"]
+        self.tags = header["tags"]
+        self._files, self._root = header["files"], header["root"]
+        self._tag_index = None
+        return True
+
+    def update(self, docs_root: str | Path) -> StoreStats:
+        """
+        Bring the store in line with `docs_root`, encoding only files that
+        were added or changed since it was written (one encode_batch call).
+        """
+        t0 = time.perf_counter()
+        stats = StoreStats()
+        root = Path(docs_root)
+        if not self._matrix_loaded() and self.path.exists():
+            self.load()
+        old_files = self._files if self._root == str(root.resolve()) else {}
+
+        plan: list[_PlanEntry] = []
+        for path in sorted(self._iter_doc_files(root)):
+            rel = path.relative_to(root).as_posix()
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            old = old_files.get(rel)
+            entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            if old and (old["size"], old["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+                stats.unchanged += 1
+                plan.append((rel, {**old}, tuple(old["rows"]), []))
+                continue
+            text = path.read_text(encoding="utf-8", errors="ignore")
+            entry["sha256"] = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if old and old["sha256"] == entry["sha256"]:
+                stats.rehashed += 1
+                plan.append((rel, {**old, **entry}, tuple(old["rows"]), []))
+                continue
+            if old:
+                stats.changed += 1
+            else:
+                stats.added += 1
+            plan.append((rel, entry, None, split_sections(text, rel)))
+        stats.deleted = len(set(old_files) - {rel for rel, *_ in plan})
+        stats.files = len(plan)
+
+        dirty = stats.added or stats.changed or stats.deleted or stats.rehashed
+        if dirty or not self._matrix_loaded():
+            fresh = [s for *_, sections in plan for s in sections]
+            encoded = self.encoder.encode_batch([s.text for s in fresh])
+            vectors = self._normalized(encoded)
+            stats.encoded = len(fresh)
+            self._write(root, plan, vectors)
+            self.load()
+        stats.sections = len(self.ids)
+        stats.seconds = time.perf_counter() - t0
+        return stats
+
+    def search(self, query: Embedding, k: int = 5) -> list[tuple[str, float]]:
+        """Top-k (section id, cosine similarity), best first."""
+        if not self.ids or k <= 0:
+            return []
+        if _np is None:
+            return self._search_python(list(query), k)
+        q = _np.asarray(query, dtype=_np.float32)
+        norm = float(_np.linalg.norm(q))
+        if norm == 0.0:
+            return []
+        q = q / norm
+        rows = len(self.ids)
+        best_scores: list[Any] = []
+        best_rows: list[Any] = []
+        for start in range(0, rows, SEARCH_BLOCK):
+            scores = self._matrix[start : start + SEARCH_BLOCK] @ q
+            if len(scores) > k:
+                top = _np.argpartition(-scores, k - 1)[:k]
+                scores = scores[top]
+            else:
+                top = _np.arange(len(scores))
+            best_scores.append(scores)
+            best_rows.append(top + start)
+        scores = _np.concatenate(best_scores)
+        rows_ix = _np.concatenate(best_rows)
+        order = _np.lexsort((rows_ix, -scores))[:k]
+        return [(self.ids[rows_ix[i]], float(scores[i])) for i in order]
+
+    def search_text(self, text: str, k: int = 5) -> list[tuple[str, float]]:
+        return self.search(self.encoder.encode(text), k)
+
+    def search_tagged(
+        self, query: Embedding, k: int = 5
+    ) -> list[tuple[str, float, list[str]]]:
+        """search(), with each section's doc tags."""
+        if self._tag_index is None:
+            self._tag_index = dict(zip(self.ids, self.tags, strict=True))
+        return [(sid, s, self._tag_index[sid]) for sid, s in self.search(query, k)]
+
+    # ---------------------------- internals ----------------------------
+    def _matrix_loaded(self) -> bool:
+        return self._matrix is not None
+
+    def _unmap(self) -> None:
+        """Release the view of the mapped vectors and close the mapping."""
+        matrix, mm = self._matrix, self._mm
+        self._matrix = self._mm = None
+        if isinstance(matrix, memoryview):
+            matrix.release()
+        del matrix  # last reference to an ndarray view; frees its export
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                # Something still holds a view of the rows; GC unmaps it later
+                pass
+
+    def _iter_doc_files(self, root: Path) -> Iterator[Path]:
+        if not root.exists():
+            return
+        for path in root.rglob("*"):
+            if path.is_file() and path.suffix.lower() in DOC_SUFFIXES:
+                yield path
+
+    def _normalized(self, vectors: EmbeddingMatrix) -> EmbeddingMatrix:
+        if _np is not None:
+            vectors = _np.asarray(vectors, dtype=_np.float32).reshape(-1, self.dim)
+            norms = _np.linalg.norm(vectors, axis=1, keepdims=True)
+            return vectors / _np.where(norms == 0, 1, norms)
+        out = []
+        for vec in vectors:
+            norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+            out.append([x / norm for x in vec])
+        return out
+
+    def _rows_bytes(self, start: int, end: int) -> bytes:
+        if _np is not None:
+            return self._matrix[start:end].tobytes()
+        return self._matrix[start * self.dim : end * self.dim].tobytes()
+
+    def _search_python(self, query: list[float], k: int) -> list[tuple[str, float]]:
+        norm = math.sqrt(sum(x * x for x in query))
+        if norm == 0.0:
+            return []
+        nz = [(j, x / norm) for j, x in enumerate(query) if x]
+        dim = self.dim
+        scored = (
+            (sum(self._matrix[i * dim + j] * x for j, x in nz), -i)
+            for i in range(len(self.ids))
+        )
+        return [(self.ids[-neg], score) for score, neg in heapq.nlargest(k, scored)]
+
+    def _write(
+        self,
+        root: Path,
+        plan: list[_PlanEntry],
+        vectors: EmbeddingMatrix,
+    ) -> None:
+        ids: list[str] = []
+        titles: list[str] = []
+        tags: list[list[str]] = []
+        files: dict[str, dict[str, Any]] = {}
+        old_titles, old_tags, old_ids = self.titles, self.tags, self.ids
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        fresh_row = 0
+        with open(tmp, "wb") as f:
+            f.write(b"\0" * _DATA_OFFSET)
+            for rel, entry, kept, sections in plan:
+                start = len(ids)
+                if kept is not None:
+                    a, b = kept
+                    ids.extend(old_ids[a:b])
+                    titles.extend(old_titles[a:b])
+                    tags.extend(old_tags[a:b])
+                    f.write(self._rows_bytes(a, b))
+                else:
+                    for s in sections:
+                        ids.append(s.id)
+                        titles.append(s.title)
+                        tags.append(s.tags)
+                    n = len(sections)
+                    block = vectors[fresh_row : fresh_row + n]
+                    if _np is not None:
+                        f.write(block.astype(_np.float32).tobytes())
+                    else:
+                        f.write(array("f", chain.from_iterable(block)).tobytes())
+                    fresh_row += n
+                files[rel] = {**entry, "rows": [start, len(ids)]}
+            header = json.dumps(
+                {
+                    "version": STORE_VERSION,
+                    "dim": self.dim,
+                    "encoder_seed": ENCODER_SEED,
+                    "positional": self.encoder.positional,
+                    "byteorder": sys.byteorder,
+                    "root": str(root.resolve()),
+                    "ids": ids,
+                    "titles": titles,
+                    "tags": tags,
+                    "files": files,
+                }
+            ).encode("utf-8")
+            offset = f.tell()
+            f.write(header)
+            f.seek(0)
+            f.write(_PREFIX.pack(MAGIC, offset, len(header)))
+        self._unmap()
+        os.replace(tmp, self.path)
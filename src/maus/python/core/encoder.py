@@ -0,0 +1,102 @@
+"""
+Deterministic hashing text encoder.
+
+A text's embedding counts its tokens into `dim` slots: token i of the text
+lands in slot (crc32(token, ENCODER_SEED) ^ i) % dim, or, with
+positional=False, crc32(token, ENCODER_SEED) % dim (a hashed bag of words,
+which is what cosine similarity between texts needs). crc32 is stable across
+processes and machines (unlike the builtin hash(), which is salted per
+process), so embeddings can be cached, persisted and compared between
+workers.
+
+With NumPy, embeddings are float32 arrays and encode_batch() builds an
+(N, dim) matrix with a single bincount scatter-add per block of texts;
+without it they are lists of floats built by the same formula.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from collections.abc import Sequence
+from itertools import chain, repeat
+from typing import TYPE_CHECKING
+
+try:
+    import numpy as _np  # type: ignore
+except Exception:  # pragma: no cover
+    _np = None
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    Embedding = np.ndarray | list[float]
+    EmbeddingMatrix = np.ndarray | list[list[float]]
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_]+")
+ENCODER_SEED = 0x2545F491
+# Rows per bincount call in encode_batch; bounds the int64 scratch buffer
+BATCH_BLOCK = 4096
+
+
+def token_hashes(tokens: Sequence[str]) -> list[int]:
+    """Seeded crc32 of each token (stable across processes)."""
+    return list(map(zlib.crc32, map(str.encode, tokens), repeat(ENCODER_SEED)))
+
+
+class TransformerEncoder:
+    """
+    Encodes text into embeddings using a lightweight hashing encoder
+    """
+
+    def __init__(self, dim: int, positional: bool = True) -> None:
+        self.dim = dim
+        self.positional = positional
+
+    def tokenize(self, text: str) -> list[str]:
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def encode(self, text: str) -> Embedding:
+        dim = self.dim
+        hashes = token_hashes(self.tokenize(text))
+        if self.positional:
+            slots = [(h ^ i) % dim for i, h in enumerate(hashes)]
+        else:
+            slots = [h % dim for h in hashes]
+        if _np is not None:
+            # Cheapest way to a float32 vector even for a few slots: counting
+            # into a list and converting it costs a pass over all `dim` floats
+            counts = _np.bincount(_np.asarray(slots, dtype=_np.int64), minlength=dim)
+            return counts.astype(_np.float32)
+        vec = [0.0] * dim
+        for slot in slots:
+            vec[slot] += 1.0
+        return vec
+
+    def encode_batch(self, texts: Sequence[str]) -> EmbeddingMatrix:
+        """(len(texts), dim) float32 matrix; row k equals encode(texts[k])."""
+        if _np is None:
+            return [self.encode(text) for text in texts]
+        out = _np.empty((len(texts), self.dim), dtype=_np.float32)
+        for start in range(0, len(texts), BATCH_BLOCK):
+            block = texts[start : start + BATCH_BLOCK]
+            out[start : start + len(block)] = self._encode_block(block)
+        return out
+
+    def _encode_block(self, texts: Sequence[str]) -> np.ndarray:
+        dim = self.dim
+        token_lists = [self.tokenize(text) for text in texts]
+        lengths = _np.fromiter(map(len, token_lists), dtype=_np.int64, count=len(texts))
+        total = int(lengths.sum())
+        hashes = _np.fromiter(
+            chain.from_iterable(map(token_hashes, token_lists)),
+            dtype=_np.int64,
+            count=total,
+        )
+        if self.positional:
+            starts = _np.cumsum(lengths) - lengths
+            hashes ^= _np.arange(total, dtype=_np.int64) - _np.repeat(starts, lengths)
+        rows = _np.repeat(_np.arange(len(texts), dtype=_np.int64), lengths)
+        slots = rows * dim + hashes % dim
+        counts = _np.bincount(slots, minlength=len(texts) * dim)
+        return counts.astype(_np.float32).reshape(len(texts), dim)
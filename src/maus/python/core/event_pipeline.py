@@ -2,13 +2,15 @@ from __future__ import annotations
 
 import time
 import uuid
+from collections.abc import Sequence
 from dataclasses import dataclass
 
+from .drag_simplify import StreamingDragSimplifier
 from .mathematic_grid import (
+    ScreenLayout,
     ScreenSpec,
     map_timestamp_to_timeline,
     normalized_to_grid,
-    pixel_to_normalized,
 )
 from .maus_data_map import Action, Event, Grid, Header, MausDataMap, Metadata
 
@@ -24,26 +26,53 @@ class RawMouseEvent:
 
 
 class EventPipeline:
-    def __init__(self, screen: ScreenSpec, grid_size: int, time_scale: float) -> None:
+    def __init__(
+        self,
+        screen: ScreenSpec,
+        grid_size: int,
+        time_scale: float,
+        layout: ScreenLayout | None = None,
+        simplifier: StreamingDragSimplifier | None = None,
+    ) -> None:
         self.screen = screen
+        self.layout = layout or ScreenLayout.single(screen)
         self.grid_size = grid_size
         self.time_scale = time_scale
         self.start_ms = int(time.time() * 1000)
         self.events: list[Event] = []
+        self.simplifier = simplifier
 
     def process(self, raw: RawMouseEvent) -> None:
-        xn, yn = pixel_to_normalized(raw.x, raw.y, self.screen)
+        _, xn, yn = self.layout.to_normalized(raw.x, raw.y)
         gx, gy = normalized_to_grid(xn, yn, self.grid_size)
+        self._emit(self._make_event(raw, gx, gy))
+
+    def process_batch(self, raws: Sequence[RawMouseEvent]) -> None:
+        """Process many raw events with one vectorized coordinate transform."""
+        if not raws:
+            return
+        mapping = self.layout.map_pixels(
+            [r.x for r in raws], [r.y for r in raws], self.grid_size
+        )
+        for raw, gx, gy in zip(raws, mapping.gx, mapping.gy, strict=True):
+            self._emit(self._make_event(raw, int(gx), int(gy)))
+
+    def _emit(self, evt: Event) -> None:
+        if self.simplifier is None:
+            self.events.append(evt)
+        else:
+            self.events.extend(self.simplifier.push(evt))
+
+    def _make_event(self, raw: RawMouseEvent, gx: int, gy: int) -> Event:
         tpos = map_timestamp_to_timeline(
             raw.timestamp_ms, self.start_ms, self.time_scale
         )
-        evt = Event(
+        return Event(
             id=str(uuid.uuid4()),
             time=int(tpos),
             grid=Grid(x=float(gx), y=float(gy)),
             action=Action(type=raw.type, button=raw.button, modifiers=raw.modifiers),
         )
-        self.events.append(evt)
 
     def snapshot(self) -> MausDataMap:
         now = int(time.time() * 1000)
@@ -54,4 +83,7 @@ class EventPipeline:
             resolution=(self.screen.width, self.screen.height),
         )
         meta = Metadata(tags=[], description="", author="system_user")
-        return MausDataMap(header=header, events=self.events[:], metadata=meta)
+        events = self.events[:]
+        if self.simplifier is not None:
+            events.extend(self.simplifier.peek())
+        return MausDataMap(header=header, events=events, metadata=meta)
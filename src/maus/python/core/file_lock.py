@@ -0,0 +1,96 @@
+"""
+Advisory inter-process file lock for single-flight work on shared files.
+
+    with FileLock(models_dir / "bayes_tags.lock", timeout=300):
+        ...  # at most one holder at a time, across processes and threads
+
+Uses flock() on POSIX and msvcrt.locking() on Windows. Every acquire opens
+the lock file afresh, so threads of one process exclude each other too. The
+OS drops the lock when its holder exits, so a crashed process never leaves
+it stale; the (empty) lock file itself is left in place.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from types import TracebackType
+
+try:
+    import fcntl as _fcntl
+except ImportError:  # pragma: no cover - Windows
+    _fcntl = None
+    import msvcrt as _msvcrt
+
+# Seconds between attempts while another holder has the lock
+POLL_INTERVAL = 0.05
+
+
+class FileLock:
+    """Exclusive lock on `path`; TimeoutError after `timeout` seconds."""
+
+    def __init__(self, path: str | Path, timeout: float | None = None) -> None:
+        self.path = Path(path)
+        self.timeout = timeout
+        self.waited = 0.0  # seconds the last acquire() spent blocked
+        self._fd: int | None = None
+
+    @property
+    def locked(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> None:
+        if self._fd is not None:
+            raise RuntimeError(f"lock already held: {self.path}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        t0 = time.perf_counter()
+        deadline = None if self.timeout is None else t0 + self.timeout
+        try:
+            while not _try_lock(fd):
+                if deadline is not None and time.perf_counter() >= deadline:
+                    raise TimeoutError(f"timed out waiting for {self.path}")
+                time.sleep(POLL_INTERVAL)
+        except BaseException:
+            os.close(fd)
+            raise
+        self.waited = time.perf_counter() - t0
+        self._fd = fd
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            _unlock(fd)
+            os.close(fd)
+
+    def __enter__(self) -> FileLock:
+        self.acquire()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.release()
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if _fcntl is not None:
+            _fcntl.flock(fd, _fcntl.LOCK_EX | _fcntl.LOCK_NB)
+        else:  # pragma: no cover
+            _msvcrt.locking(fd, _msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd: int) -> None:
+    if _fcntl is not None:
+        _fcntl.flock(fd, _fcntl.LOCK_UN)
+    else:  # pragma: no cover
+        os.lseek(fd, 0, os.SEEK_SET)
+        _msvcrt.locking(fd, _msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,220 @@
+"""
+Streaming JSON leaf walker for SemanticConfigAnalyzer.
+
+Tokenizes JSON from a text file (read in fixed-size chunks) or an in-memory
+string and yields the same leaves, in the same order, as walking the
+`json.loads` tree, without ever building that tree. Memory is bounded by
+the chunk size, the nesting depth and the longest object key: string
+values are skipped in place, never decoded.
+
+Arrays can be sampled: only their first `sample_arrays` items are reported
+as in-sample; later items are still tokenized and yielded, flagged as out
+of sample, so constraint rules can see them. Known divergence from the full
+parse: an object with duplicate keys yields every occurrence, where
+`json.loads` keeps only the last.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+from json.decoder import JSONDecodeError, scanstring
+from typing import TextIO
+
+from .semantic_config import PathTrail, _key_name
+
+CHUNK_CHARS = 1 << 16
+MAX_KEY_CHARS = 1 << 20
+
+_WS = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?")
+# What a chunk may end on right after the digits matched so far
+_NUMBER_CUT = re.compile(r"(?:\.|[eE][-+]?)?")
+# Unrolled-loop string body: plain runs separated by valid escapes
+_STRING_BODY = re.compile(
+    r'[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*'
+)
+_LITERALS = (
+    ("true", "bool"),
+    ("false", "bool"),
+    ("null", "NoneType"),
+    ("NaN", "float"),
+    ("Infinity", "float"),
+    ("-Infinity", "float"),
+)
+_NAME_CACHE_MAX = 4096
+
+# (leaf name, value type name, trail, depth, in sample)
+Leaf = tuple[str, str, PathTrail | None, int, bool]
+
+
+class _Frame:
+    __slots__ = ("is_dict", "trail", "sampled", "count")
+
+    def __init__(self, is_dict: bool, trail: PathTrail | None, sampled: bool) -> None:
+        self.is_dict = is_dict
+        self.trail = trail
+        self.sampled = sampled
+        self.count = 0
+
+
+class JsonLeafStream:
+    """
+    Iterate the leaves of one JSON document as `Leaf` tuples.
+
+    Raises ValueError on malformed input, at the point it is reached. After
+    iteration, `skipped` is the number of leaves outside the array sample.
+    """
+
+    def __init__(
+        self,
+        source: str | TextIO,
+        sample_arrays: int | None = None,
+        with_trail: bool = True,
+        chunk_size: int = CHUNK_CHARS,
+    ) -> None:
+        if isinstance(source, str):
+            self._buf, self._read = source, None
+        else:
+            self._buf, self._read = "", source.read
+        self._pos = 0
+        self.sample_arrays = sample_arrays
+        self.with_trail = with_trail
+        self.chunk_size = max(16, chunk_size)
+        self.skipped = 0
+
+    def __iter__(self) -> Iterator[Leaf]:
+        c = self._peek()
+        if c not in ("{", "["):
+            yield "$", self._scalar(c), None, 0, True
+            self._expect_end()
+            return
+
+        names: dict[str, str] = {}
+        limit = self.sample_arrays
+        self._pos += 1
+        stack = [_Frame(c == "{", None, True)]
+        while stack:
+            frame = stack[-1]
+            c = self._peek()
+            if c == ("}" if frame.is_dict else "]"):
+                self._pos += 1
+                stack.pop()
+                continue
+            if frame.count:
+                self._consume(",")
+                c = self._peek()
+            key: str | int
+            if frame.is_dict:
+                key = self._key(c)
+                self._consume(":")
+                c = self._peek()
+            else:
+                key = frame.count
+            frame.count += 1
+
+            sampled = frame.sampled and (
+                frame.is_dict or limit is None or key < limit  # type: ignore[operator]
+            )
+            trail = PathTrail(frame.trail, key) if self.with_trail else None
+            if c in ("{", "["):
+                self._pos += 1
+                stack.append(_Frame(c == "{", trail, sampled))
+                continue
+
+            value_type = self._scalar(c)
+            if isinstance(key, str):
+                name = names.get(key)
+                if name is None:
+                    name = _key_name(key)
+                    if len(names) < _NAME_CACHE_MAX:
+                        names[key] = name
+            else:
+                name = str(key)
+            if not sampled:
+                self.skipped += 1
+            yield name, value_type, trail, len(stack), sampled
+        self._expect_end()
+
+    # ---------------------------- tokenizer ----------------------------
+    def _fill(self) -> bool:
+        """Drop consumed text and append the next chunk; False at EOF."""
+        chunk = self._read(self.chunk_size) if self._read is not None else ""
+        if not chunk:
+            self._read = None
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _ensure(self, n: int) -> None:
+        while len(self._buf) - self._pos < n and self._fill():
+            pass
+
+    def _peek(self) -> str:
+        """Skip whitespace; the next character, or "" at EOF."""
+        while True:
+            self._pos = _WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _error(self, what: str) -> ValueError:
+        return ValueError(f"malformed JSON: {what}")
+
+    def _consume(self, char: str) -> None:
+        if self._peek() != char:
+            raise self._error(f"expected {char!r}")
+        self._pos += 1
+
+    def _expect_end(self) -> None:
+        if self._peek():
+            raise self._error("extra data after document")
+
+    def _key(self, c: str) -> str:
+        if c != '"':
+            raise self._error("expected object key")
+        while True:
+            try:
+                key, end = scanstring(self._buf, self._pos + 1)
+            except JSONDecodeError:
+                if len(self._buf) - self._pos > MAX_KEY_CHARS or not self._fill():
+                    raise self._error("unterminated or invalid key") from None
+                continue
+            self._pos = end
+            return key
+
+    def _skip_string(self) -> None:
+        self._pos += 1
+        while True:
+            end = _STRING_BODY.match(self._buf, self._pos).end()
+            if end < len(self._buf) and self._buf[end] == '"':
+                self._pos = end + 1
+                return
+            # Keep only an escape that may continue in the next chunk
+            self._pos = end
+            if len(self._buf) - end >= 6 or not self._fill():
+                raise self._error("unterminated or invalid string")
+
+    def _scalar(self, c: str) -> str:
+        if c == '"':
+            self._skip_string()
+            return "str"
+        self._ensure(len("-Infinity"))
+        for literal, type_name in _LITERALS:
+            if self._buf.startswith(literal, self._pos):
+                self._pos += len(literal)
+                return type_name
+        while True:
+            m = _NUMBER.match(self._buf, self._pos)
+            if m is None:
+                raise self._error("unexpected value")
+            # Refill while the number may go on: the buffer ends inside it,
+            # e.g. right after "1", "1." or "1e-"
+            cut = _NUMBER_CUT.match(self._buf, m.end()).end()
+            if cut < len(self._buf) or not self._fill():
+                break
+        self._pos = m.end()
+        return "float" if m.group(1) or m.group(2) else "int"
+
@@ -4,7 +4,14 @@ MATHEMATICAL_GRID and Grid-based navigation system
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+try:
+    import numpy as _np  # type: ignore
+except Exception:  # pragma: no cover
+    _np = None
 
 GRID = {
     "origin": (2, 1, 0),  # user/ directory position
@@ -52,6 +59,158 @@ def normalized_to_grid(xn: float, yn: float, grid_size: int) -> tuple[int, int]:
     return int(xn * grid_size), int(yn * grid_size)
 
 
+@dataclass
+class Display:
+    """
+    One physical display inside a ScreenLayout.
+
+    `origin` is the display's top-left corner in global desktop coordinates,
+    `width`/`height` are its size in device pixels and `scale` is the number
+    of device pixels per global unit (2.0 on a typical HiDPI panel).
+    """
+
+    width: int
+    height: int
+    origin: tuple[int, int] = (0, 0)
+    scale: float = 1.0
+
+    def contains(self, x: float, y: float) -> bool:
+        ox, oy = self.origin
+        return (
+            ox <= x < ox + self.width / self.scale
+            and oy <= y < oy + self.height / self.scale
+        )
+
+
+@dataclass
+class LayoutMapping:
+    """Result of ScreenLayout.map_pixels; one entry per input sample."""
+
+    display: Any
+    xn: Any
+    yn: Any
+    gx: Any
+    gy: Any
+
+
+@dataclass
+class ScreenLayout:
+    """
+    Multi-display screen description with precomputed per-display transforms.
+
+    Each display maps a global point to normalized coordinates with
+    `(x - ox) / (width / scale)`. The divisor form (rather than multiplying by
+    a reciprocal) keeps a single unscaled display at the origin bit-identical
+    to `pixel_to_normalized`. Points outside every display are assigned to the
+    nearest one and may normalize outside [0, 1], as the single-screen
+    functions do.
+    """
+
+    displays: list[Display]
+    _origin_x: list[float] = field(init=False, repr=False)
+    _origin_y: list[float] = field(init=False, repr=False)
+    _div_x: list[float] = field(init=False, repr=False)
+    _div_y: list[float] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.displays:
+            raise ValueError("ScreenLayout requires at least one display")
+        self._origin_x = [float(d.origin[0]) for d in self.displays]
+        self._origin_y = [float(d.origin[1]) for d in self.displays]
+        self._div_x = [max(1, d.width) / d.scale for d in self.displays]
+        self._div_y = [max(1, d.height) / d.scale for d in self.displays]
+
+    @classmethod
+    def single(cls, spec: ScreenSpec) -> ScreenLayout:
+        return cls([Display(spec.width, spec.height)])
+
+    def locate(self, x: float, y: float) -> int:
+        """Index of the display containing (x, y), else the nearest one."""
+        best, best_dist = 0, float("inf")
+        for i, d in enumerate(self.displays):
+            if d.contains(x, y):
+                return i
+            ox, oy = d.origin
+            dx = max(ox - x, 0.0, x - (ox + d.width / d.scale))
+            dy = max(oy - y, 0.0, y - (oy + d.height / d.scale))
+            dist = dx * dx + dy * dy
+            if dist < best_dist:
+                best, best_dist = i, dist
+        return best
+
+    def to_normalized(self, x: float, y: float) -> tuple[int, float, float]:
+        i = self.locate(x, y)
+        return (
+            i,
+            (x - self._origin_x[i]) / self._div_x[i],
+            (y - self._origin_y[i]) / self._div_y[i],
+        )
+
+    def map_pixels(
+        self,
+        xs: Sequence[float],
+        ys: Sequence[float],
+        grid_size: int,
+    ) -> LayoutMapping:
+        """
+        Map arrays of global pixel coordinates to (display, normalized, grid).
+
+        Uses NumPy when available and returns arrays; otherwise falls back to
+        a per-sample loop returning lists with identical values.
+        """
+        if _np is None:
+            return self._map_pixels_loop(xs, ys, grid_size)
+
+        x = _np.asarray(xs, dtype=_np.float64)
+        y = _np.asarray(ys, dtype=_np.float64)
+        if len(self.displays) == 1:
+            display = _np.zeros(x.shape, dtype=_np.intp)
+        else:
+            display = self._locate_many(x, y)
+        xn = (x - _np.asarray(self._origin_x)[display]) / _np.asarray(self._div_x)[
+            display
+        ]
+        yn = (y - _np.asarray(self._origin_y)[display]) / _np.asarray(self._div_y)[
+            display
+        ]
+        # astype truncates toward zero, matching int() in normalized_to_grid
+        gx = (xn * grid_size).astype(_np.int64)
+        gy = (yn * grid_size).astype(_np.int64)
+        return LayoutMapping(display=display, xn=xn, yn=yn, gx=gx, gy=gy)
+
+    # ---------------------------- internals ----------------------------
+    def _locate_many(self, x: _np.ndarray, y: _np.ndarray) -> _np.ndarray:
+        ox = _np.asarray(self._origin_x)[:, None]
+        oy = _np.asarray(self._origin_y)[:, None]
+        extent_x = _np.asarray([d.width / d.scale for d in self.displays])[:, None]
+        extent_y = _np.asarray([d.height / d.scale for d in self.displays])[:, None]
+        right = ox + extent_x
+        bottom = oy + extent_y
+        dx = _np.maximum(_np.maximum(ox - x, 0.0), x - right)
+        dy = _np.maximum(_np.maximum(oy - y, 0.0), y - bottom)
+        inside = (x >= ox) & (x < right) & (y >= oy) & (y < bottom)
+        dist = _np.where(inside, -1.0, dx * dx + dy * dy)
+        # argmin picks the first containing display, else the nearest one
+        return _np.argmin(dist, axis=0)
+
+    def _map_pixels_loop(
+        self,
+        xs: Sequence[float],
+        ys: Sequence[float],
+        grid_size: int,
+    ) -> LayoutMapping:
+        out = LayoutMapping(display=[], xn=[], yn=[], gx=[], gy=[])
+        for x, y in zip(xs, ys, strict=True):
+            i, xn, yn = self.to_normalized(x, y)
+            gx, gy = normalized_to_grid(xn, yn, grid_size)
+            out.display.append(i)
+            out.xn.append(xn)
+            out.yn.append(yn)
+            out.gx.append(gx)
+            out.gy.append(gy)
+        return out
+
+
 def map_timestamp_to_timeline(
     timestamp_ms: int,
     start_ms: int,
@@ -1,11 +1,40 @@
 from __future__ import annotations
 
+import hashlib
 import re
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
 
-from ..analysis.bayesian_extractor import BayesianRuleExtractor
-from .semantic_config import SemanticConfigAnalyzer
+from .file_lock import FileLock
+
+# The analyzers, encoder and Bayes model (and NumPy/PyYAML behind them) are
+# imported on first use, so importing this module and constructing the
+# reasoner stay cheap
+if TYPE_CHECKING:
+    from ..analysis.bayesian_extractor import BayesianRuleExtractor
+    from .constraint_rules import ConstraintRules
+    from .embedding_store import EmbeddingStore
+    from .encoder import Embedding, TransformerEncoder
+    from .semantic_config import ConfigAnalysisCache, SemanticConfigAnalyzer
+
+T = TypeVar("T")
+
+
+# synthesize_path: sections returned, candidates reranked, and the score bonus
+# per inferred constraint tag a section carries
+PATH_LENGTH = 5
+PATH_CANDIDATES = 20
+CONSTRAINT_BOOST = 0.05
+# Longest a process waits for another one to finish training and saving the
+# model (or refreshing the doc index) before carrying on without it
+ARTIFACT_LOCK_TIMEOUT = 300.0
+# Word tokens, as both the encoder and the Bayes model read a query
+_QUERY_TOKEN = re.compile(r"[A-Za-z0-9_]+")
 
 
 @dataclass
@@ -17,6 +46,8 @@ class Intent:
     logical_constraints: list[str]
     temporal_relevance: float
     user_profile: UserProfile
+    # Answered during background warm-up: no Bayes constraints, no path
+    degraded: bool = False
 
 
 @dataclass
@@ -64,22 +95,6 @@ class FirstOrderLogicKB:
         return []
 
 
-class TransformerEncoder:
-    """
-    Encodes text into embeddings using a lightweight hashing encoder
-    """
-
-    def __init__(self, dim: int) -> None:
-        self.dim = dim
-
-    def encode(self, text: str) -> list[float]:
-        vec = [0.0] * self.dim
-        for i, tok in enumerate(re.findall(r"[A-Za-z0-9_]+", text.lower())):
-            idx = (hash(tok) ^ i) % self.dim
-            vec[idx] += 1.0
-        return vec
-
-
 @dataclass
 class CausalChain:
     from_state: str
@@ -100,50 +115,356 @@ class CausalInferenceEngine:
         )
 
 
+@dataclass
+class StartupStats:
+    """Where the reasoner's start-up time went (seconds, from construction)."""
+
+    background: bool = False
+    init_seconds: float = 0.0  # __init__ itself
+    import_seconds: float = 0.0  # lazy imports + component construction
+    model_seconds: float = 0.0  # load, or train and save, the Bayes model
+    doc_index_seconds: float = 0.0
+    ready_seconds: float | None = None  # construction -> warm-up finished
+    first_answer_seconds: float | None = None  # construction -> first Intent
+    lock_wait_seconds: float = 0.0  # blocked on another process's training
+    # "loaded"; "waited" (another process trained it); "trained"; "unavailable"
+    model_source: str = ""
+    model_version: str | None = None
+    error: str | None = None  # what made warm-up stop early, if anything
+    degraded_answers: int = 0  # answered before warm-up finished
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            k: round(v, 4) if isinstance(v, float) else v
+            for k, v in asdict(self).items()
+        }
+
+
+def normalize_query(query: str) -> str:
+    """
+    A query as the encoder and Bayes model see it: its lowercase word
+    tokens. Non-ASCII queries are kept verbatim, since case folding there
+    can create or merge tokens.
+    """
+    if not query.isascii():
+        return query
+    return " ".join(_QUERY_TOKEN.findall(query.lower()))
+
+
+@dataclass
+class IntentCacheStats:
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0  # misses on an entry older than the TTL
+    evictions: int = 0
+    invalidations: int = 0  # entries dropped by a model or rules change
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        out = asdict(self)
+        out["hit_rate"] = round(self.hit_rate, 4)
+        return out
+
+
+class IntentCache:
+    """
+    Bounded LRU of understood intents with a TTL.
+
+    Keys are the normalized query, a hash of the config text, the current
+    state and the PROFILE_FIELDS of the user profile. Every entry belongs to
+    one (Bayes model version, rules version); the first lookup under a new
+    version drops them all.
+    """
+
+    # Profile fields the computed part of an Intent depends on. None yet:
+    # the profile is only echoed back, and a hit returns the caller's own
+    PROFILE_FIELDS: tuple[str, ...] = ()
+
+    def __init__(self, max_entries: int = 1024, ttl: float | None = 300.0) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.stats = IntentCacheStats()
+        self._entries: OrderedDict[tuple[str, ...], tuple[float, Intent]] = (
+            OrderedDict()
+        )
+        self._version: tuple[str, str] | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, query: str, context: Context) -> tuple[str, ...]:
+        config = context.config_text or ""
+        digest = hashlib.blake2b(config.encode("utf-8"), digest_size=16).hexdigest()
+        profile = context.user_profile
+        return (
+            normalize_query(query),
+            digest if config else "",
+            context.current_state,
+            *(str(getattr(profile, f)) for f in self.PROFILE_FIELDS),
+        )
+
+    def get(self, key: tuple[str, ...], version: tuple[str, str]) -> Intent | None:
+        now = time.monotonic()
+        with self._lock:
+            if version != self._version:
+                self.stats.invalidations += len(self._entries)
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                self.stats.expired += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def put(
+        self, key: tuple[str, ...], version: tuple[str, str], intent: Intent
+    ) -> None:
+        with self._lock:
+            if version != self._version:
+                return  # computed under a model or rules set since replaced
+            self._entries[key] = (time.monotonic(), intent)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> int:
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            return dropped
+
+
 class NeuralSymbolicReasoner:
     """
     Combines neural networks with symbolic logic for documentation understanding
+
+    Construction only records paths. The Bayes model and doc embeddings are
+    loaded (or trained) by warm_up(): inline on the first understand_intent()
+    call by default, or with `background=True` on a daemon thread started
+    at once, in which case queries arriving before it finishes are answered
+    without Bayes constraints or a doc path (Intent.degraded). See `ready`,
+    wait_until_ready() and `startup`.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        background: bool = False,
+        *,
+        docs_root: str | Path | None = None,
+        model_dir: str | Path | None = None,
+    ) -> None:
+        """
+        `docs_root` (default: the repo's Docs/) is what the model and doc
+        index are built from; `model_dir` (default: build/models/) is where
+        they are stored.
+        """
+        self._t0 = time.perf_counter()
         self.symbolic_kb = FirstOrderLogicKB()
-        self.neural_encoder = TransformerEncoder(dim=768)
         self.causal_graph = CausalInferenceEngine()
-        self.bayesian = BayesianRuleExtractor()
-        self.semantic = SemanticConfigAnalyzer()
-        # Attempt to load pre-trained model; otherwise lazy-train on Docs/
-        repo_root = Path(__file__).resolve().parents[3]
-        self._model_path = repo_root / "build" / "models" / "bayes_tags.json"
-        if not self.bayesian.load_model(self._model_path):
-            self._docs_root = repo_root / "Docs"
-        else:
-            self._docs_root = None
+        # Rules ship with the package (maus/config); the rest lives in a checkout
+        package_root = Path(__file__).resolve().parents[2]
+        self._rules_path = package_root / "config" / "constraint_rules.json"
+        repo_root = package_root.parents[1]
+        # Pre-trained model if present, otherwise trained on Docs/ by warm_up()
+        # Binary model is memory-mapped, so loading does not parse counts
+        models = Path(model_dir) if model_dir else repo_root / "build" / "models"
+        self._model_path = models / "bayes_tags.nbin"
+        self._manifest_path = self._model_path.with_suffix(".manifest.json")
+        self._docs_root = Path(docs_root) if docs_root else repo_root / "Docs"
+        self.startup = StartupStats(background=background)
+        self._ready = threading.Event()
+        self._warm_lock = threading.Lock()
+        self._lazy_lock = threading.Lock()
+        self._component_locks: dict[str, threading.Lock] = {}
+        self._warm_thread: threading.Thread | None = None
+        # Repeated queries skip encoding, Bayes scoring and config analysis
+        self.intent_cache = IntentCache()
+        if background:
+            self.start_warm_up()
+        self.startup.init_seconds = time.perf_counter() - self._t0
+
+    # --------------------------- components ---------------------------
+    @property
+    def neural_encoder(self) -> TransformerEncoder:
+        def build() -> TransformerEncoder:
+            from .encoder import TransformerEncoder
+
+            # Bag-of-words slots, so queries are comparable with doc sections
+            return TransformerEncoder(dim=768, positional=False)
+
+        return self._lazy("_neural_encoder", build)
+
+    @property
+    def semantic(self) -> SemanticConfigAnalyzer:
+        def build() -> SemanticConfigAnalyzer:
+            from .semantic_config import SemanticConfigAnalyzer
+
+            return SemanticConfigAnalyzer(self._load_rules(self._rules_path))
+
+        return self._lazy("_semantic", build)
+
+    @property
+    def config_cache(self) -> ConfigAnalysisCache:
+        def build() -> ConfigAnalysisCache:
+            from .semantic_config import ConfigAnalysisCache
+
+            # The same few configs arrive with most queries; see .stats
+            return ConfigAnalysisCache(self.semantic, max_entries=256)
+
+        return self._lazy("_config_cache", build)
+
+    @property
+    def bayesian(self) -> BayesianRuleExtractor:
+        def build() -> BayesianRuleExtractor:
+            from ..analysis.bayesian_extractor import BayesianRuleExtractor
+
+            return BayesianRuleExtractor()
+
+        return self._lazy("_bayesian", build)
+
+    @property
+    def doc_index(self) -> EmbeddingStore:
+        def build() -> EmbeddingStore:
+            from .embedding_store import EmbeddingStore
+
+            # Section vectors are mapped from disk; refreshed by warm_up()
+            return EmbeddingStore(
+                self._model_path.with_name("doc_embeddings.emb"), self.neural_encoder
+            )
+
+        return self._lazy("_doc_index", build)
+
+    def _lazy(self, name: str, build: Callable[[], T]) -> T:
+        """self.<name>, built once; one lock per component, so a query does
+        not wait for the warm-up thread to build an unrelated one."""
+        value = self.__dict__.get(name)
+        if value is None:
+            with self._lazy_lock:
+                lock = self._component_locks.setdefault(name, threading.Lock())
+            with lock:
+                value = self.__dict__.get(name)
+                if value is None:
+                    value = self.__dict__[name] = build()
+        return value
+
+    # ---------------------------- readiness ----------------------------
+    @property
+    def ready(self) -> bool:
+        """True once the Bayes model and doc embeddings are in place."""
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def start_warm_up(self) -> None:
+        """Run warm_up() on a daemon thread (once)."""
+        with self._lazy_lock:
+            if self._warm_thread is None and not self.ready:
+                self._warm_thread = threading.Thread(
+                    target=self.warm_up, name="reasoner-warm-up", daemon=True
+                )
+                self._warm_thread.start()
+
+    def warm_up(self) -> None:
+        """Build the components and load or train the Bayes model; idempotent."""
+        with self._warm_lock:
+            if self.ready:
+                return
+            stats = self.startup
+            try:
+                t = time.perf_counter()
+                for name in ("neural_encoder", "config_cache", "bayesian", "doc_index"):
+                    getattr(self, name)  # import and construct
+                stats.import_seconds = time.perf_counter() - t
+                t = time.perf_counter()
+                stats.model_source = self._ensure_bayes_trained()
+                stats.model_seconds = time.perf_counter() - t
+                if stats.model_source != "unavailable":
+                    stats.model_version = self.bayesian.model_version
+                t = time.perf_counter()
+                self._ensure_doc_index()
+                stats.doc_index_seconds = time.perf_counter() - t
+            except Exception as exc:
+                # Non-fatal: answers go without whatever did not come up, and
+                # a background warm-up must not leave them degraded for good
+                stats.model_source = stats.model_source or "unavailable"
+                stats.error = f"{type(exc).__name__}: {exc}"
+            finally:
+                stats.ready_seconds = time.perf_counter() - self._t0
+                self._ready.set()
 
     def understand_intent(self, query: str, context: Context) -> Intent:
         """
         Doesn't just search - UNDERSTANDS what you're trying to accomplish
         """
-        # Ensure Bayesian model ready
-        self._ensure_bayes_trained()
+        # Ensure Bayesian model and doc embeddings ready, unless they are
+        # being prepared in the background
+        degraded = False
+        if not self.ready:
+            if self._warm_thread is None:
+                self.warm_up()
+            else:
+                degraded = True
+
+        # Degraded answers are not cached: they would outlive the warm-up
+        if degraded:
+            intent = self._understand_intent(query, context, degraded=True)
+        else:
+            key = self.intent_cache.key(query, context)
+            version = (self.bayesian.model_version, self.semantic.rules.version)
+            cached = self.intent_cache.get(key, version)
+            if cached is None:
+                intent = self._understand_intent(query, context, degraded=False)
+                self.intent_cache.put(key, version, intent)
+            else:
+                intent = cached
+            # Callers own their copy; the cached entry stays as computed
+            intent = replace(
+                intent,
+                explicit_goal=query,
+                implicit_needs=list(intent.implicit_needs),
+                future_needs=list(intent.future_needs),
+                optimal_path=list(intent.optimal_path),
+                logical_constraints=list(intent.logical_constraints),
+                user_profile=context.user_profile,
+            )
+
+        stats = self.startup
+        if degraded:
+            stats.degraded_answers += 1
+        if stats.first_answer_seconds is None:
+            stats.first_answer_seconds = time.perf_counter() - self._t0
+        return intent
 
-        # Neural understanding
-        embeddings = self.neural_encoder.encode(query)
+    def _understand_intent(
+        self, query: str, context: Context, degraded: bool
+    ) -> Intent:
+        # Neural understanding (only the doc path uses it, so a degraded
+        # answer does not wait for the encoder's imports)
+        embeddings = [] if degraded else self.neural_encoder.encode(query)
 
         # Symbolic reasoning
         logical_constraints = self.symbolic_kb.extract_constraints(query)
 
         # Semantic config constraints (if provided)
         if getattr(context, "config_text", None):
-            sdoc = self.semantic.analyze_text(context.config_text or "")
-            logical_constraints = list(
-                {
-                    *logical_constraints,
-                    *self.semantic.infer_constraints(sdoc),
-                }
-            )
+            config_tags = self.config_cache.constraints(context.config_text or "")
+            logical_constraints = list({*logical_constraints, *config_tags})
 
         # Bayesian evidence from docs tags
-        distribution = self.bayesian.predict_distribution(query)
+        distribution = {} if degraded else self.bayesian.predict_distribution(query)
         if distribution:
             top_sorted = sorted(distribution.items(), key=lambda x: x[1], reverse=True)[
                 :3
@@ -159,7 +480,9 @@ class NeuralSymbolicReasoner:
         )
 
         # Synthesize optimal path
-        optimal_path = self.synthesize_path(embeddings, logical_constraints)
+        optimal_path = (
+            [] if degraded else self.synthesize_path(embeddings, logical_constraints)
+        )
 
         return Intent(
             explicit_goal=query,
@@ -169,19 +492,61 @@ class NeuralSymbolicReasoner:
             logical_constraints=logical_constraints,
             temporal_relevance=causal_chain.temporal_relevance,
             user_profile=context.user_profile,
+            degraded=degraded,
         )
 
-    def _ensure_bayes_trained(self) -> None:
-        """Train Bayes model from Docs/ if not already loaded."""
-        if getattr(self, "_docs_root", None):
-            try:
-                self.bayesian.train_from_docs(str(self._docs_root))
-                self._model_path.parent.mkdir(parents=True, exist_ok=True)
+    @staticmethod
+    def _load_rules(path: Path) -> ConstraintRules:
+        """Rules from `path`, falling back to the built-in set."""
+        from .constraint_rules import ConstraintRules
+
+        try:
+            return ConstraintRules.from_file(path)
+        except (OSError, ValueError):
+            # Non-fatal: a missing or broken rules file keeps the defaults
+            return ConstraintRules.default()
+
+    def _ensure_bayes_trained(self) -> str:
+        """
+        Load the Bayes model, or train it from Docs/; returns the source.
+
+        Training is single-flight across processes: whoever takes the lock
+        next to the model trains and saves it (atomically), and processes
+        that waited on the lock load that model instead of training again.
+        """
+        if self._load_model():
+            return "loaded"
+        lock = FileLock(self._model_path.with_suffix(".lock"), ARTIFACT_LOCK_TIMEOUT)
+        try:
+            with lock:
+                self.startup.lock_wait_seconds += lock.waited
+                if self._load_model():
+                    return "waited"
+                # Reuses per-file counts from the manifest when one exists
+                self.bayesian.train_incremental(self._docs_root, self._manifest_path)
                 self.bayesian.save_model(self._model_path)
-                self._docs_root = None
-            except Exception:
-                # Non-fatal: proceed without Bayes augmentation
-                self._docs_root = None
+                return "trained"
+        except Exception:
+            # Non-fatal: proceed without Bayes augmentation
+            return "unavailable"
+
+    def _load_model(self) -> bool:
+        try:
+            return self.bayesian.load_model(self._model_path)
+        except (OSError, ValueError):
+            # Unreadable model: retrained (and replaced) under the lock
+            return False
+
+    def _ensure_doc_index(self) -> None:
+        """Encode new or changed Docs/ sections into the embedding store."""
+        path = self.doc_index.path
+        try:
+            with FileLock(path.with_suffix(".lock"), ARTIFACT_LOCK_TIMEOUT) as lock:
+                self.startup.lock_wait_seconds += lock.waited
+                self.doc_index.update(self._docs_root)
+        except Exception:
+            # Non-fatal: synthesize_path just returns no sections
+            pass
 
     def generate_custom_doc(self, intent: Intent) -> Document:
         """
@@ -213,15 +578,25 @@ class NeuralSymbolicReasoner:
         return f"Ideal document for {intent.explicit_goal}"
 
     def synthesize_path(
-        self, embeddings: list[float], logical_constraints: list[str]
+        self, embeddings: Embedding, logical_constraints: list[str]
     ) -> list[str]:
         """
         Synthesizes an optimal path through documentation
 
+        Doc sections nearest to the query embedding (cosine), with sections
+        tagged by one of the inferred constraints moved up.
         """
-        return []
+        wanted = set(logical_constraints)
+        ranked = [
+            (score + CONSTRAINT_BOOST * len(wanted.intersection(tags)), sid)
+            for sid, score, tags in self.doc_index.search_tagged(
+                embeddings, PATH_CANDIDATES
+            )
+        ]
+        ranked.sort(key=lambda x: -x[0])  # stable: ties keep similarity order
+        return [sid for _, sid in ranked[:PATH_LENGTH]]
 
-    def infer_goal(self, embeddings: list[float]) -> str:
+    def infer_goal(self, embeddings: Embedding) -> str:
         """
         Infers the goal from embeddings
         """
@@ -1,10 +1,24 @@
 from __future__ import annotations
 
 import configparser
+import hashlib
 import json
 import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass
-from typing import Any
+from itertools import islice
+from operator import attrgetter, itemgetter
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO
+
+from .constraint_rules import ConstraintRules
+
+if TYPE_CHECKING:
+    from .config_tree import FileAnalysis, TreeStats
+    from .json_stream import JsonLeafStream
+
 
 try:  # Python 3.11+
     import tomllib as _toml  # type: ignore
@@ -17,12 +31,85 @@ except Exception:  # pragma: no cover
     _yaml = None
 
 
-@dataclass
+# Keys that already are their own leaf name (no regex needed)
+_PLAIN_NAME = re.compile(r"[A-Za-z0-9_\-]+")
+_TAIL_NAME = re.compile(r"([A-Za-z0-9_\-]+)$")
+_JSON_START = re.compile(r"\s*[\[{]")
+
+# JSON texts at least this long are tokenized instead of json.loads'd
+STREAM_MIN_CHARS = 1 << 20
+
+
+class PathTrail:
+    """Parent-linked path segment; the `$.a[0].b` string is built on demand."""
+
+    __slots__ = ("parent", "key")
+
+    def __init__(self, parent: PathTrail | None, key: str | int) -> None:
+        self.parent = parent
+        self.key = key
+
+    def render(self) -> str:
+        keys: list[str | int] = []
+        trail: PathTrail | None = self
+        while trail is not None:
+            keys.append(trail.key)
+            trail = trail.parent
+        return "$" + "".join(
+            f"[{k}]" if isinstance(k, int) else f".{k}" for k in reversed(keys)
+        )
+
+
 class SemanticNode:
-    name: str
-    value_type: str
-    path: str
-    importance: float
+    """
+    One config leaf. The walker passes `path=None` with a `trail`, and the
+    `$.a[0].b` string is rendered from the trail on first read.
+    """
+
+    __slots__ = ("name", "value_type", "_path", "importance", "depth", "trail")
+
+    def __init__(
+        self,
+        name: str,
+        value_type: str,
+        path: str | None,
+        importance: float,
+        depth: int = 0,
+        trail: PathTrail | None = None,
+    ) -> None:
+        self.name = name
+        self.value_type = value_type
+        self._path = path
+        self.importance = importance
+        self.depth = depth
+        self.trail = trail
+
+    @property
+    def path(self) -> str:
+        path = self._path
+        if path is None:
+            path = self.trail.render() if self.trail is not None else "$"
+            self._path = path
+        return path
+
+    @path.setter
+    def path(self, value: str) -> None:
+        self._path = value
+
+    def _fields(self) -> tuple[str, str, str, float, int]:
+        return self.name, self.value_type, self.path, self.importance, self.depth
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SemanticNode):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        return (
+            f"SemanticNode(name={self.name!r}, value_type={self.value_type!r}, "
+            f"path={self.path!r}, importance={self.importance!r}, "
+            f"depth={self.depth!r})"
+        )
 
 
 @dataclass
@@ -35,45 +122,238 @@ class SemanticConfigAnalyzer:
     """
     Parses configuration-like text (JSON/YAML/TOML/INI) into semantic nodes,
     then infers coarse-grained constraints/tags to guide reasoning.
+
+    Tags come from a ConstraintRules set (the built-in CONSTRAINT_KEYS
+    rules unless one is passed in).
     """
 
-    def analyze_text(self, text: str, filename: str = "config") -> SemanticDocument:
+    def __init__(self, rules: ConstraintRules | None = None) -> None:
+        self.rules = rules or ConstraintRules.default()
+
+    def analyze_text(
+        self,
+        text: str,
+        filename: str = "config",
+        max_nodes: int | None = None,
+        sample_arrays: int | None = None,
+    ) -> SemanticDocument:
+        """
+        Parse and walk `text`. Large JSON (or any JSON when `sample_arrays`
+        is set) goes through the streaming tokenizer; see analyze_file.
+        """
         file_type = self._infer_type(text, filename)
+        if file_type == "json" and (
+            sample_arrays is not None or len(text) >= STREAM_MIN_CHARS
+        ):
+            return self._analyze_json_stream(text, max_nodes, sample_arrays)
         data = self._parse(text, file_type)
-        nodes = []
-        self._walk(data, nodes, path="$")
-        return SemanticDocument(nodes=nodes, metadata={"file_type": file_type})
+        limit = None if max_nodes is None else max_nodes + 1
+        nodes = list(self.iter_nodes(data, limit))
+        metadata: dict[str, Any] = {"file_type": file_type}
+        if max_nodes is not None and len(nodes) > max_nodes:
+            del nodes[max_nodes:]
+            metadata["truncated"] = True
+        return SemanticDocument(nodes=nodes, metadata=metadata)
 
-    def infer_constraints(self, doc: SemanticDocument) -> list[str]:
-        tags: set[str] = set()
-        keybag = {n.name.lower() for n in doc.nodes}
+    def analyze_file(
+        self,
+        path: str | Path,
+        max_nodes: int | None = None,
+        sample_arrays: int | None = None,
+    ) -> SemanticDocument:
+        """
+        Analyze a config file. JSON (including .maus recordings) is streamed
+        in chunks straight into SemanticNodes, never held as text or as an
+        object tree. With `sample_arrays`, only the first N items of each
+        array become nodes; the rest are still scanned so that
+        infer_constraints() gives the same tags as the full parse.
+        """
+        file_type = self._infer_file_type(path)
+        with open(path, encoding="utf-8") as f:
+            if file_type == "json":
+                return self._analyze_json_stream(f, max_nodes, sample_arrays)
+            return self.analyze_text(f.read(), Path(path).name, max_nodes)
 
-        # Permissions/UX
-        if {"accessibility", "screen_recording"} & keybag:
-            tags.add("#Permissions")
+    def analyze_tree(
+        self,
+        root: str | Path,
+        globs: Sequence[str] | None = None,
+        manifest_path: str | Path | None = None,
+        workers: int | None = None,
+        documents: bool = False,
+        max_nodes: int | None = None,
+        sample_arrays: int | None = None,
+        stats: TreeStats | None = None,
+    ) -> Iterator[FileAnalysis]:
+        """
+        Every config file under `root`, analyzed on a process pool with this
+        analyzer's rules; see config_tree.analyze_tree.
+        """
+        from .config_tree import CONFIG_GLOBS, analyze_tree
 
-        # Performance
-        if {"fps", "latency", "buffer", "batch", "grid"} & keybag:
-            tags.add("#Performance")
+        return analyze_tree(
+            root,
+            globs or CONFIG_GLOBS,
+            analyzer=self,
+            manifest_path=manifest_path,
+            workers=workers,
+            documents=documents,
+            max_nodes=max_nodes,
+            sample_arrays=sample_arrays,
+            stats=stats,
+        )
 
-        # Timeline
-        if {"timeline", "playback", "zoom", "selection"} & keybag:
-            tags.add("#BerryTimeline")
+    def iter_nodes(
+        self, value: object, max_nodes: int | None = None
+    ) -> Iterator[SemanticNode]:
+        """
+        Depth-first leaves of a parsed config, in document order.
 
-        # Overlay window
-        if {"overlay", "opacity", "clickthrough", "grid"} & keybag:
-            tags.add("#BerryWindow")
+        Iterative (no recursion limit on deep configs). Each node carries its
+        leaf name and depth from the walk; its `path` string is only built
+        when read. Stops after `max_nodes` leaves.
+        """
+        importance: dict[int, float] = {}
+        for name, leaf, trail, depth in self._walk(value, max_nodes):
+            weight = importance.get(depth)
+            if weight is None:
+                weight = importance[depth] = self._depth_importance(depth)
+            yield SemanticNode(name, type(leaf).__name__, None, weight, depth, trail)
 
-        # Data / schema
-        if {"events", "header", "metadata", "version"} & keybag:
-            tags.add("#MausDataMap")
+    def infer_constraints(self, doc: SemanticDocument) -> list[str]:
+        fired = self.rules.ids_of(doc.metadata.get("skipped_rules", ()))
+        fired = self.rules.fire(doc.nodes, _node_name, _node_path, fired)
+        return self.rules.tags_for(fired)
+
+    def constraints_for_text(
+        self,
+        text: str,
+        filename: str = "config",
+        max_nodes: int | None = None,
+    ) -> list[str]:
+        """
+        infer_constraints(analyze_text(...)) without building a document:
+        the walk stops once no further leaf can change the tags, or after
+        `max_nodes` leaves. Paths are only tracked when a rule needs them.
+        """
+        file_type = self._infer_type(text, filename)
+        if file_type == "json" and len(text) >= STREAM_MIN_CHARS:
+            return self._json_stream_constraints(text, max_nodes)
+        data = self._parse(text, file_type)
+        leaves = self._walk(data, max_nodes, with_trail=self.rules.needs_paths)
+        return self._constraints(leaves)
 
-        return sorted(tags)
+    def constraints_for_file(
+        self, path: str | Path, max_nodes: int | None = None
+    ) -> list[str]:
+        """constraints_for_text() for a file; JSON is streamed, see analyze_file."""
+        file_type = self._infer_file_type(path)
+        with open(path, encoding="utf-8") as f:
+            if file_type == "json":
+                return self._json_stream_constraints(f, max_nodes)
+            return self.constraints_for_text(f.read(), Path(path).name, max_nodes)
 
     # ---------------------------- internals ----------------------------
+    def _constraints(self, leaves: Iterable[tuple[Any, ...]]) -> list[str]:
+        """Tags for (name, value, trail, ...) leaves, stopping early if possible."""
+        fired = self.rules.fire(leaves, _leaf_name, _leaf_path, early_stop=True)
+        return self.rules.tags_for(fired)
+
+    def _analyze_json_stream(
+        self,
+        source: str | TextIO,
+        max_nodes: int | None,
+        sample_arrays: int | None,
+    ) -> SemanticDocument:
+        stream = self._leaf_stream(source, sample_arrays)
+        metadata: dict[str, Any] = {"file_type": "json", "streamed": True}
+        nodes: list[SemanticNode] = []
+        keywords = self.rules.keywords
+        skipped: set[int] = set()  # rules fired by leaves outside the sample
+        importance: dict[int, float] = {}
+        try:
+            for leaf in stream:
+                name, value_type, trail, depth, sampled = leaf
+                if not sampled:
+                    if name.lower() in keywords:
+                        self.rules.fire((leaf,), _leaf_name, _leaf_path, skipped)
+                    continue
+                if max_nodes is not None and len(nodes) >= max_nodes:
+                    metadata["truncated"] = True
+                    break
+                weight = importance.get(depth)
+                if weight is None:
+                    weight = importance[depth] = self._depth_importance(depth)
+                nodes.append(SemanticNode(name, value_type, None, weight, depth, trail))
+        except ValueError:
+            # Same outcome as a failed json.loads in _parse
+            return SemanticDocument(nodes=[], metadata={"file_type": "json"})
+        if sample_arrays is not None:
+            metadata["sample_arrays"] = sample_arrays
+            metadata["skipped_leaves"] = stream.skipped
+        if skipped:
+            metadata["skipped_rules"] = self.rules.names_of(skipped)
+        return SemanticDocument(nodes=nodes, metadata=metadata)
+
+    def _json_stream_constraints(
+        self, source: str | TextIO, max_nodes: int | None
+    ) -> list[str]:
+        stream = self._leaf_stream(source, with_trail=self.rules.needs_paths)
+        try:
+            return self._constraints(islice(stream, max_nodes))
+        except ValueError:
+            return []
+
+    def _leaf_stream(
+        self,
+        source: str | TextIO,
+        sample_arrays: int | None = None,
+        with_trail: bool = True,
+    ) -> JsonLeafStream:
+        from .json_stream import JsonLeafStream
+
+        return JsonLeafStream(source, sample_arrays, with_trail)
+
+    def _walk(
+        self,
+        value: object,
+        max_nodes: int | None = None,
+        with_trail: bool = True,
+    ) -> Iterator[tuple[str, object, PathTrail | None, int]]:
+        """Yield (leaf name, leaf value, trail, depth) using an explicit stack."""
+        if max_nodes is not None and max_nodes <= 0:
+            return
+        if not isinstance(value, (dict, list)):
+            yield "$", value, None, 0
+            return
+        names: dict[str, str] = {}  # sibling dicts usually share their keys
+        emitted = 0
+        stack: list[tuple[Iterator[tuple[Any, Any]], PathTrail | None]] = [
+            (_items(value), None)
+        ]
+        while stack:
+            it, parent = stack[-1]
+            for key, child in it:
+                trail = PathTrail(parent, key) if with_trail else None
+                if isinstance(child, (dict, list)):
+                    stack.append((_items(child), trail))
+                    break
+                if isinstance(key, str):
+                    name = names.get(key)
+                    if name is None:
+                        name = names[key] = _key_name(key)
+                else:
+                    name = _key_name(key)
+                yield name, child, trail, len(stack)
+                emitted += 1
+                if max_nodes is not None and emitted >= max_nodes:
+                    return
+            else:
+                stack.pop()
+
     def _infer_type(self, text: str, filename: str) -> str:
         name = filename.lower()
-        if name.endswith(".json") or self._looks_like_json(text):
+        if name.endswith(".json"):
             return "json"
         if name.endswith((".yaml", ".yml")):
             return "yaml"
@@ -82,10 +362,18 @@ class SemanticConfigAnalyzer:
         if name.endswith((".ini", ".cfg")):
             return "ini"
         # Fall back by heuristics
+        if self._looks_like_json(text):
+            return "json"
         if self._looks_like_ini(text):
             return "ini"
         return "yaml"  # permissive default
 
+    def _infer_file_type(self, path: str | Path) -> str:
+        # The head is enough for the JSON/INI sniffing in _infer_type
+        with open(path, encoding="utf-8", errors="replace") as f:
+            head = f.read(4096)
+        return self._infer_type(head, Path(path).name)
+
     def _parse(self, text: str, file_type: str) -> object:
         try:
             if file_type == "json":
@@ -104,30 +392,8 @@ class SemanticConfigAnalyzer:
             return {}
         return {}
 
-    def _walk(self, value: object, out: list[SemanticNode], path: str) -> None:
-        if isinstance(value, dict):
-            for k, v in value.items():
-                self._walk(v, out, f"{path}.{k}")
-        elif isinstance(value, list):
-            for i, v in enumerate(value):
-                self._walk(v, out, f"{path}[{i}]")
-        else:
-            out.append(
-                SemanticNode(
-                    name=self._leaf_name(path),
-                    value_type=type(value).__name__,
-                    path=path,
-                    importance=self._importance(path),
-                )
-            )
-
-    def _leaf_name(self, path: str) -> str:
-        m = re.search(r"([A-Za-z0-9_\-]+)(?:\]|$)", path)
-        return m.group(1) if m else path
-
-    def _importance(self, path: str) -> float:
+    def _depth_importance(self, depth: int) -> float:
         # Simple heuristic: deeper keys slightly less important
-        depth = path.count(".") + path.count("[")
         return max(0.1, 1.5 - 0.1 * depth)
 
     def _parse_ini(self, text: str) -> dict:
@@ -151,8 +417,113 @@ class SemanticConfigAnalyzer:
         return data
 
     def _looks_like_json(self, text: str) -> bool:
-        s = text.lstrip()
-        return s.startswith("{") or s.startswith("[")
+        # match() instead of lstrip() avoids copying very large texts
+        return _JSON_START.match(text) is not None
 
     def _looks_like_ini(self, text: str) -> bool:
         return bool(re.search(r"^\[[^\]]+\]$", text, flags=re.MULTILINE))
+
+
+_node_name = attrgetter("name")
+_node_path = attrgetter("path")
+_leaf_name = itemgetter(0)
+
+
+def _leaf_path(leaf: tuple[Any, ...]) -> str:
+    trail = leaf[2]
+    return trail.render() if trail is not None else "$"
+
+
+def _items(value: dict | list) -> Iterator[tuple[Any, Any]]:
+    return iter(value.items()) if isinstance(value, dict) else enumerate(value)
+
+
+def _key_name(key: object) -> str:
+    name = str(key)
+    if isinstance(key, int) or _PLAIN_NAME.fullmatch(name):
+        return name
+    m = _TAIL_NAME.search(name)
+    return m.group(1) if m else name
+
+
+_CacheEntry = tuple[SemanticDocument, list[str]]
+
+
+@dataclass
+class ConfigCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ConfigAnalysisCache:
+    """
+    Bounded LRU of analyzed configs, keyed by a content hash of the text plus
+    its inferred file type.
+
+    A hit returns the stored SemanticDocument and constraint tags without
+    parsing or walking; treat the returned document as read-only, since it
+    is shared by every later hit.
+    """
+
+    def __init__(
+        self,
+        analyzer: SemanticConfigAnalyzer | None = None,
+        max_entries: int = 128,
+    ) -> None:
+        self.analyzer = analyzer or SemanticConfigAnalyzer()
+        self.max_entries = max(1, max_entries)
+        self.stats = ConfigCacheStats()
+        self._entries: OrderedDict[tuple[str, str, str], _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, text: str, filename: str = "config") -> tuple[str, str, str]:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        file_type = self.analyzer._infer_type(text, filename)
+        # Entries hold tags, so a changed rule set must not hit old ones
+        return digest, file_type, self.analyzer.rules.version
+
+    def analyze(self, text: str, filename: str = "config") -> _CacheEntry:
+        """(document, constraint tags) for `text`, analyzing it on a miss."""
+        key = self.key(text, filename)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry
+            self.stats.misses += 1
+
+        doc = self.analyzer.analyze_text(text, filename)
+        entry = (doc, self.analyzer.infer_constraints(doc))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+        return entry
+
+    def constraints(self, text: str, filename: str = "config") -> list[str]:
+        return list(self.analyze(text, filename)[1])
+
+    def invalidate(self, text: str | None = None, filename: str = "config") -> int:
+        """Drop one config's entry, or everything when `text` is None."""
+        key = None if text is None else self.key(text, filename)
+        with self._lock:
+            if key is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                dropped = int(self._entries.pop(key, None) is not None)
+            self.stats.invalidations += dropped
+            return dropped
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from maus.python.analysis.ast_diff import (
+    ASTNode,
+    MerkleSnapshot,
+    collect_delta,
+    compute_delta,
+    compute_delta_merkle,
+    iter_delta_sorted,
+    iter_jsonl_nodes,
+    node_from_dict,
+    sketch_similarity,
+)
+
+
+def _snapshot(rng: random.Random, n: int, version: int) -> list[ASTNode]:
+    nodes = []
+    for i in range(n):
+        if rng.random() < 0.1:
+            continue
+        h = f"h{i}" if rng.random() > 0.1 * version else f"h{i}v{version}"
+        path = f"Docs/{i % 7}/{i % 5}.md"
+        nodes.append(ASTNode(id=f"n{i:04d}", type="DATA", content_hash=h, path=path))
+    return nodes
+
+
+def test_sorted_merge_matches_compute_delta() -> None:
+    rng = random.Random(7)
+    old = _snapshot(rng, 500, 0)
+    new = _snapshot(rng, 500, 1)
+    # duplicate ids keep the last occurrence in both implementations
+    old.insert(3, ASTNode(id=old[3].id, type="DATA", content_hash="dup", path="p"))
+    expected = compute_delta(old, new)
+    got = collect_delta(iter_delta_sorted(iter(old), iter(new)))
+    assert got == expected
+    assert expected.added and expected.removed and expected.modified
+
+
+def test_sorted_merge_rejects_unsorted_input() -> None:
+    a = ASTNode(id="b", type="DATA", content_hash="1", path="p")
+    b = ASTNode(id="a", type="DATA", content_hash="1", path="p")
+    with pytest.raises(ValueError):
+        list(iter_delta_sorted([a, b], []))
+
+
+def test_iter_jsonl_nodes(tmp_path: Path) -> None:
+    snap = tmp_path / "snap.jsonl"
+    snap.write_text(
+        "\n".join(
+            json.dumps(d)
+            for d in [
+                {"id": "a", "type": "DOCUMENT", "path": "x.md", "content": "x"},
+                {"id": "b", "type": "DATA", "path": "y.md", "content_hash": "h"},
+            ]
+        )
+        + "\n\n",
+        encoding="utf-8",
+    )
+    nodes = list(iter_jsonl_nodes(snap))
+    assert [n.id for n in nodes] == ["a", "b"]
+    assert nodes[1].content_hash == "h" and len(nodes[0].content_hash) == 64
+
+
+def test_merkle_delta_matches_compute_delta() -> None:
+    rng = random.Random(11)
+    old = _snapshot(rng, 400, 0)
+    new = _snapshot(rng, 400, 1)
+    # move one unchanged node and one changed node to new paths
+    new[0] = ASTNode(
+        id=new[0].id, type="DATA", content_hash=new[0].content_hash, path="Moved/a.md"
+    )
+    new[1] = ASTNode(id=new[1].id, type="FUNCTION", content_hash="x", path="b.md")
+    expected = compute_delta(old, new)
+    got = compute_delta_merkle(MerkleSnapshot.build(old), MerkleSnapshot.build(new))
+    assert got == expected
+
+
+def test_merkle_skips_identical_trees() -> None:
+    rng = random.Random(3)
+    nodes = _snapshot(rng, 100, 0)
+    a, b = MerkleSnapshot.build(nodes), MerkleSnapshot.build(list(reversed(nodes)))
+    assert a.root.hash == b.root.hash
+    assert compute_delta_merkle(a, b) == compute_delta(nodes, nodes)
+
+
+def test_compute_delta_reports_moves() -> None:
+    old = [
+        ASTNode(id="a", type="DATA", content_hash="h1", path="x.md"),
+        ASTNode(id="b", type="DATA", content_hash="h2", path="x.md"),
+    ]
+    new = [
+        ASTNode(id="a2", type="DATA", content_hash="h1", path="y.md"),
+        ASTNode(id="c", type="DATA", content_hash="h3", path="x.md"),
+    ]
+    delta = compute_delta(old, new)
+    assert [(o.id, n.id) for o, n in delta.moved] == [("a", "a2")]
+    assert [n.id for n in delta.added] == ["c"]
+    assert [n.id for n in delta.removed] == ["b"]
+    assert not compute_delta(old, new, detect_moves=False).moved
+
+
+def test_compute_delta_near_duplicate_moves() -> None:
+    text = " ".join(f"word{i}" for i in range(200))
+    old = [node_from_dict({"id": "a", "content": text}, with_sketch=True)]
+    new = [
+        node_from_dict({"id": "b", "content": text + " tail"}, with_sketch=True),
+        node_from_dict({"id": "c", "content": "unrelated"}, with_sketch=True),
+    ]
+    assert not compute_delta(old, new).moved
+    delta = compute_delta(old, new, near_threshold=0.8)
+    assert [(o.id, n.id) for o, n in delta.moved] == [("a", "b")]
+    assert [n.id for n in delta.added] == ["c"] and not delta.removed
+    assert 0.9 < sketch_similarity(old[0].sketch or (), new[0].sketch or ()) <= 1.0
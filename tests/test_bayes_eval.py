@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from maus.python.analysis.bayes_eval import (
+    EvalConfig,
+    cross_validate,
+    fold_indices,
+    format_table,
+    load_examples,
+)
+
+
+def _corpus(root: Path) -> None:
+    root.mkdir()
+    for i in range(4):
+        (root / f"t{i}.md").write_text(
+            f"[#Timeline] timeline zoom scrub frames {i}", encoding="utf-8"
+        )
+        (root / f"w{i}.md").write_text(
+            f"[#Window] window overlay opacity clickthrough {i}", encoding="utf-8"
+        )
+    (root / "untagged.md").write_text("no tags at all", encoding="utf-8")
+
+
+def test_fold_indices_partition() -> None:
+    folds = fold_indices(10, 3, seed=1)
+    assert sorted(i for f in folds for i in f) == list(range(10))
+    assert folds == fold_indices(10, 3, seed=1)
+
+
+def test_cross_validate_reports_metrics(tmp_path: Path) -> None:
+    _corpus(tmp_path / "Docs")
+    examples = load_examples(tmp_path / "Docs")
+    assert len(examples) == 8
+
+    configs = [EvalConfig(), EvalConfig(features="uni", hash_buckets=256, prune=2)]
+    results = cross_validate(examples, configs, folds=4, workers=1)
+    assert [r.config for r in results] == configs
+    for r in results:
+        assert r.docs == 8
+        # Tag markers are stripped from test texts, so this is earned
+        assert r.precision == r.recall == r.f1 == 1.0
+        assert r.predict_ms_p50 <= r.predict_ms_p95 <= r.predict_ms_p99
+        assert r.features > 0 and r.model_bytes > 0
+    assert results[1].features <= 256
+    assert results[1].to_dict()["config"]["name"] == "a=1 uni hash=256 prune<2 top1"
+    assert "hash=256" in format_table(results)
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import math
 from pathlib import Path
 
+import pytest
+
+from maus.python.analysis import bayesian_extractor
 from maus.python.analysis.bayesian_extractor import BayesianRuleExtractor
 
+DOCS_ROOT = Path(__file__).resolve().parents[1] / "Docs"
+
 
 def test_bayes_train_and_predict(tmp_path: Path) -> None:
     docs = tmp_path / "Docs"
@@ -22,3 +28,251 @@ def test_bayes_train_and_predict(tmp_path: Path) -> None:
     # top label likely BerryTimeline
     top = sorted(dist.items(), key=lambda x: x[1], reverse=True)[0][0]
     assert top in {"BerryTimeline", "BerryWindow"}
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_compiled_matches_reference(
+    use_numpy: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if not use_numpy:
+        monkeypatch.setattr(bayesian_extractor, "_np", None)
+    br = BayesianRuleExtractor(alpha=0.5)
+    br.train_from_docs(DOCS_ROOT)
+    assert br.label_to_count
+    for text in ["timeline zoom levels", "overlay opacity grid", "", "zzz unseen"]:
+        for ft in ["text", ".md"]:
+            fast = br.predict_distribution(text, file_type=ft)
+            ref = br._predict_distribution_reference(text, file_type=ft)
+            assert fast.keys() == ref.keys()
+            assert all(math.isclose(fast[k], ref[k], abs_tol=1e-9) for k in ref)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_predict_many_matches_single(
+    use_numpy: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if not use_numpy:
+        monkeypatch.setattr(bayesian_extractor, "_np", None)
+    br = BayesianRuleExtractor()
+    br.train_from_docs(DOCS_ROOT)
+    texts = ["timeline zoom levels", "overlay opacity", "", "unseen tokens only"]
+    fts = ["text", ".md", "text", ".json"]
+    many = br.predict_many(texts, fts)
+    for text, ft, dist in zip(texts, fts, many, strict=True):
+        single = br.predict_distribution(text, file_type=ft)
+        assert all(math.isclose(dist[k], single[k], abs_tol=1e-9) for k in single)
+    top = br.predict_many(texts, fts, top_k=3)
+    assert [t[0] for t in top] == [max(d, key=d.get) for d in many]
+    streamed = list(br.predict_stream(iter(texts), iter(fts), top_k=3, chunk_size=3))
+    assert streamed == top
+    with pytest.raises(ValueError):
+        list(br.predict_stream(iter(texts), iter(fts[:2]), chunk_size=3))
+
+
+def _model_state(br: BayesianRuleExtractor) -> tuple:
+    return br.label_to_count, br.label_feature_counts, br.vocabulary, br.total_docs
+
+
+def test_incremental_training_matches_full(tmp_path: Path) -> None:
+    docs = tmp_path / "Docs"
+    docs.mkdir()
+    (docs / "a.md").write_text("[#Timeline] zoom zoom levels", encoding="utf-8")
+    (docs / "b.md").write_text("[#Window] overlay opacity", encoding="utf-8")
+    (docs / "c.md").write_text("no tags here", encoding="utf-8")
+    manifest = tmp_path / "manifest.json"
+
+    inc = BayesianRuleExtractor()
+    first = inc.train_incremental(docs, manifest)
+    assert first.added == 3
+
+    (docs / "a.md").write_text("[#Timeline] [#Grid] zoom grid", encoding="utf-8")
+    (docs / "b.md").unlink()
+    (docs / "d.md").write_text("[#Window] clickthrough", encoding="utf-8")
+    second = inc.train_incremental(docs, manifest)
+    assert (second.changed, second.deleted, second.added) == (1, 1, 1)
+    assert second.unchanged == 1
+
+    full = BayesianRuleExtractor()
+    full.train_from_docs(docs)
+    assert _model_state(inc) == _model_state(full)
+    assert "uni::opacity" not in inc.vocabulary
+
+    # A fresh extractor rebuilds its counts from the manifest alone
+    fresh = BayesianRuleExtractor()
+    third = fresh.train_incremental(docs, manifest)
+    assert third.rebuilt and third.unchanged == 3
+    assert _model_state(fresh) == _model_state(full)
+
+
+def _swapped_pair(docs: Path) -> tuple[BayesianRuleExtractor, BayesianRuleExtractor]:
+    """Two models with equal per-label totals but different feature counts."""
+    (docs / "a.md").write_text("[#zoom] scroll wheel fast", encoding="utf-8")
+    (docs / "b.md").write_text("[#pan] drag mouse slow", encoding="utf-8")
+    first = BayesianRuleExtractor()
+    first.train_from_docs(docs)
+    (docs / "a.md").write_text("[#zoom] drag mouse slow", encoding="utf-8")
+    (docs / "b.md").write_text("[#pan] scroll wheel fast", encoding="utf-8")
+    second = BayesianRuleExtractor()
+    second.train_from_docs(docs)
+    return first, second
+
+
+def test_incremental_training_rebuilds_other_models_with_equal_totals(
+    tmp_path: Path,
+) -> None:
+    docs = tmp_path / "Docs"
+    docs.mkdir()
+    manifest = tmp_path / "manifest.json"
+    first, second = _swapped_pair(docs)
+    BayesianRuleExtractor().train_incremental(docs, manifest)  # second's content
+
+    first.train_incremental(docs, manifest)
+    assert _model_state(first) == _model_state(second)
+    assert all(c > 0 for lf in first.label_feature_counts.values() for c in lf.values())
+
+
+def test_parallel_training_matches_serial(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(bayesian_extractor, "PARALLEL_MIN_FILES", 0)
+    serial = BayesianRuleExtractor()
+    serial.train_from_docs(DOCS_ROOT)
+    parallel = BayesianRuleExtractor()
+    parallel.train_parallel(DOCS_ROOT, workers=2)
+
+    assert _model_state(parallel) == _model_state(serial)
+    # Insertion order matters for the compiled label order
+    assert list(parallel.label_to_count) == list(serial.label_to_count)
+    for label, lf in serial.label_feature_counts.items():
+        assert list(parallel.label_feature_counts[label]) == list(lf)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_binary_model_matches_json(
+    tmp_path: Path, use_numpy: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if not use_numpy:
+        monkeypatch.setattr(bayesian_extractor, "_np", None)
+    trained = BayesianRuleExtractor(alpha=0.5)
+    trained.train_from_docs(DOCS_ROOT)
+    trained.save_model(tmp_path / "model.json")
+    trained.save_model(tmp_path / "model.nbin")
+
+    from_json = BayesianRuleExtractor()
+    assert from_json.load_model(tmp_path / "model.json")
+    mapped = BayesianRuleExtractor()
+    assert mapped.load_model(tmp_path / "model.nbin")
+    assert mapped.alpha == 0.5
+
+    texts = ["timeline zoom levels", "overlay opacity window", "unrelated words"]
+    for text in texts:
+        expected = from_json.predict_distribution(text, file_type=".md")
+        got = mapped.predict_distribution(text, file_type=".md")
+        assert list(got) == list(expected)
+        assert got == pytest.approx(expected, abs=1e-12)
+    assert mapped.predict_many(texts, [".md"] * 3, top_k=2) == from_json.predict_many(
+        texts, [".md"] * 3, top_k=2
+    )
+
+    # Counts are read lazily and round-trip exactly; retraining still works
+    assert _model_state(mapped) == _model_state(trained)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "x.md").write_text("[#Extra] extra words", encoding="utf-8")
+    mapped.train_from_docs(tmp_path / "docs")
+    assert mapped.label_to_count["Extra"] == 1
+
+
+def test_truncated_binary_model_raises_value_error(tmp_path: Path) -> None:
+    trained = BayesianRuleExtractor()
+    trained.train_from_docs(DOCS_ROOT)
+    trained.save_model(tmp_path / "model.nbin")
+    data = (tmp_path / "model.nbin").read_bytes()
+    for size in (0, 12, len(data) - 1):
+        (tmp_path / "cut.nbin").write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            BayesianRuleExtractor().load_model(tmp_path / "cut.nbin")
+
+
+def test_model_version_stamp_round_trips(tmp_path: Path) -> None:
+    trained = BayesianRuleExtractor()
+    trained.train_from_docs(DOCS_ROOT)
+    stamp = trained.model_version
+    for name in ("model.json", "model.nbin"):
+        trained.save_model(tmp_path / name)
+        assert not (tmp_path / f"{name}.tmp").exists()
+        loaded = BayesianRuleExtractor()
+        assert loaded.load_model(tmp_path / name)
+        assert loaded.model_version == stamp
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "x.md").write_text("[#Extra] extra words", encoding="utf-8")
+    loaded.train_from_docs(tmp_path / "docs")
+    assert loaded.model_version != stamp
+
+
+def test_model_version_tells_apart_models_with_equal_totals(tmp_path: Path) -> None:
+    docs = tmp_path / "Docs"
+    docs.mkdir()
+    first, second = _swapped_pair(docs)
+    assert first.label_to_count == second.label_to_count
+    assert first.model_version != second.model_version
+    assert first.predict_many(["scroll wheel"], top_k=1) == [["zoom"]]
+    assert second.predict_many(["scroll wheel"], top_k=1) == [["pan"]]
+
+    for model in (first, second):
+        for name in ("model.json", "model.nbin"):
+            model.save_model(tmp_path / name)
+            loaded = BayesianRuleExtractor()
+            assert loaded.load_model(tmp_path / name)
+            assert loaded.model_version == model.model_version
+
+    # A binary model without a stamp is stamped from its counts
+    first.save_model(tmp_path / "model.nbin")
+    legacy = BayesianRuleExtractor()
+    legacy.load_model(tmp_path / "model.nbin")
+    legacy._model_version = None
+    assert legacy.model_version == first.model_version
+
+
+def test_hashed_buckets_are_stable() -> None:
+    # crc32-based, so fixed across processes and PYTHONHASHSEED values
+    assert bayesian_extractor.hashed_buckets(["zoom", "levels"], ".md", 1024) == [
+        372,
+        25,
+        301,
+        787,
+    ]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_hashed_features_train_and_predict(
+    tmp_path: Path, use_numpy: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if not use_numpy:
+        monkeypatch.setattr(bayesian_extractor, "_np", None)
+    br = BayesianRuleExtractor(hash_buckets=4096)
+    br.train_from_docs(DOCS_ROOT)
+    assert br.vocabulary and all(0 <= f < 4096 for f in br.vocabulary)
+
+    texts = ["timeline zoom levels", "overlay opacity window", ""]
+    batch = br.predict_many(texts, ".md")
+    for text, dist in zip(texts, batch, strict=True):
+        expected = br._predict_distribution_reference(text, file_type=".md")
+        assert br.predict_distribution(text, file_type=".md") == pytest.approx(
+            expected, abs=1e-9
+        )
+        assert dist == pytest.approx(expected, abs=1e-9)
+
+    for name in ("model.json", "model.nbin"):
+        br.save_model(tmp_path / name)
+        loaded = BayesianRuleExtractor()
+        assert loaded.load_model(tmp_path / name)
+        assert loaded.hash_buckets == 4096
+        assert loaded.predict_many(texts, ".md", top_k=3) == br.predict_many(
+            texts, ".md", top_k=3
+        )
+        assert _model_state(loaded) == _model_state(br)
+
+    # Manifest round-trip keeps integer bucket keys
+    manifest = tmp_path / "manifest.json"
+    BayesianRuleExtractor(hash_buckets=4096).train_incremental(DOCS_ROOT, manifest)
+    rebuilt = BayesianRuleExtractor(hash_buckets=4096)
+    assert rebuilt.train_incremental(DOCS_ROOT, manifest).rebuilt
+    assert _model_state(rebuilt) == _model_state(br)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import subprocess
 import sys
 from pathlib import Path
@@ -31,3 +32,90 @@ def test_capture_validate_playback_stub(tmp_path: Path) -> None:
         env=env,
     )
     assert rc == 0
+
+
+def test_ast_diff_cli_json(tmp_path: Path) -> None:
+    env = {**dict(PATH=str(Path(sys.executable).parent)), **dict(PYTHONPATH="src")}
+    out = subprocess.run(
+        [
+            sys.executable,
+            "scripts/ast_diff_cli.py",
+            "old.json",
+            "new.json",
+            "--json",
+            "--hash-cache",
+            str(tmp_path / "hashes.json"),
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    data = json.loads(out.stdout)
+    assert data["counts"] == {"added": 1, "removed": 1, "modified": 1, "moved": 0}
+    assert data["hashing"]["hashed"] == 4
+
+
+def test_ast_diff_cli_stream_jsonl(tmp_path: Path) -> None:
+    env = {**dict(PATH=str(Path(sys.executable).parent)), **dict(PYTHONPATH="src")}
+    old = tmp_path / "old.jsonl"
+    new = tmp_path / "new.jsonl"
+    old.write_text(
+        '{"id": "a", "content_hash": "1"}\n{"id": "b", "content_hash": "2"}\n'
+        '{"id": "c", "content_hash": "3"}\n',
+        encoding="utf-8",
+    )
+    new.write_text(
+        '{"id": "a", "content_hash": "9"}\n{"id": "c2", "content_hash": "3"}\n'
+        '{"id": "d", "content_hash": "4"}\n',
+        encoding="utf-8",
+    )
+    out = subprocess.run(
+        [
+            sys.executable,
+            "scripts/ast_diff_cli.py",
+            str(old),
+            str(new),
+            "--stream",
+            "--moves",
+            "--no-hash-cache",
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    records = [json.loads(line) for line in out.stdout.splitlines()]
+    assert [r["kind"] for r in records] == [
+        "modified",
+        "added",
+        "removed",
+        "moved",
+        "summary",
+    ]
+    counts = records[-1]["counts"]
+    assert counts == {"added": 1, "removed": 1, "modified": 1, "moved": 1}
+
+    # Without --moves every record is written in merge-join (id) order
+    cmd = [sys.executable, "scripts/ast_diff_cli.py", "--stream", "--no-hash-cache"]
+    out = subprocess.run(
+        [*cmd, str(old), str(new)], env=env, capture_output=True, text=True, check=True
+    )
+    records = [json.loads(line) for line in out.stdout.splitlines()]
+    ids = [r.get("node", r.get("new", {})).get("id") for r in records]
+    assert list(zip([r["kind"] for r in records], ids, strict=True)) == [
+        ("modified", "a"),
+        ("removed", "b"),
+        ("removed", "c"),
+        ("added", "c2"),
+        ("added", "d"),
+        ("summary", None),
+    ]
+
+    missing = subprocess.run(
+        [*cmd, str(tmp_path / "missing.jsonl"), str(new)],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert missing.returncode == 2 and "Streaming diff failed" in missing.stderr
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from maus.python.core import config_tree
+from maus.python.core.config_tree import TreeStats, analyze_tree
+from maus.python.core.constraint_rules import ConstraintRule, ConstraintRules
+from maus.python.core.semantic_config import SemanticConfigAnalyzer
+
+
+def _make_tree(root: Path) -> None:
+    (root / "app").mkdir(parents=True)
+    (root / "node_modules").mkdir()
+    (root / "app" / "window.json").write_text(
+        '{"overlay": {"opacity": 0.5}}', encoding="utf-8"
+    )
+    (root / "app" / "perf.yaml").write_text("fps: 60\nlatency: 5\n", encoding="utf-8")
+    (root / "timeline.toml").write_text("zoom = 2\n", encoding="utf-8")
+    (root / "perms.ini").write_text("[macos]\naccessibility = yes\n", encoding="utf-8")
+    (root / "node_modules" / "skip.json").write_text('{"fps": 1}', encoding="utf-8")
+    (root / "notes.md").write_text("fps", encoding="utf-8")
+
+
+def test_analyze_tree_parallel_matches_serial(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _make_tree(tmp_path)
+    serial_stats = TreeStats()
+    serial = list(analyze_tree(tmp_path, workers=1, stats=serial_stats))
+    assert [(r.path, r.tags) for r in serial] == [
+        ("app/perf.yaml", ["#Performance"]),
+        ("app/window.json", ["#BerryWindow"]),
+        ("perms.ini", ["#Permissions"]),
+        ("timeline.toml", ["#BerryTimeline"]),
+    ]
+    assert serial_stats.tag_counts == {
+        "#Performance": 1,
+        "#BerryWindow": 1,
+        "#Permissions": 1,
+        "#BerryTimeline": 1,
+    }
+    assert len(serial_stats.slowest) == 4
+
+    monkeypatch.setattr(config_tree, "PARALLEL_MIN_FILES", 0)
+    stats = TreeStats()
+    sc = SemanticConfigAnalyzer()
+    pooled = list(sc.analyze_tree(tmp_path, workers=2, documents=True, stats=stats))
+    assert stats.workers == 2
+    assert [(r.path, r.tags) for r in pooled] == [(r.path, r.tags) for r in serial]
+    window = pooled[1].document
+    assert window is not None and window.nodes[0].path == "$.overlay.opacity"
+
+
+def test_analyze_tree_manifest_skips_unchanged(tmp_path: Path) -> None:
+    root = tmp_path / "tree"
+    _make_tree(root)
+    manifest = tmp_path / "configs.manifest.json"
+
+    first = TreeStats()
+    list(analyze_tree(root, manifest_path=manifest, stats=first))
+    assert first.analyzed == 4 and manifest.exists()
+
+    window = root / "app" / "window.json"
+    window.write_text('{"zoom": 1}', encoding="utf-8")
+    perf = root / "app" / "perf.yaml"
+    st = perf.stat()
+    os.utime(perf, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    (root / "perms.ini").unlink()
+
+    second = TreeStats()
+    run = analyze_tree(root, manifest_path=manifest, stats=second)
+    results = {r.path: r for r in run}
+    assert (second.analyzed, second.rehashed, second.unchanged) == (1, 1, 1)
+    assert second.deleted == 1
+    assert results["app/window.json"].tags == ["#BerryTimeline"]
+    assert results["app/perf.yaml"].cached
+    assert results["app/perf.yaml"].tags == ["#Performance"]
+
+    # A different rule set cannot reuse the stored tags
+    rules = ConstraintRules([ConstraintRule("#Fast", frozenset({"fps"}))])
+    third = TreeStats()
+    tagged = list(
+        SemanticConfigAnalyzer(rules).analyze_tree(
+            root, manifest_path=manifest, stats=third
+        )
+    )
+    assert third.analyzed == 3
+    assert [r.tags for r in tagged] == [["#Fast"], [], []]
+
+
+def test_analyze_tree_reports_unreadable_files(tmp_path: Path) -> None:
+    (tmp_path / "bad.yaml").write_bytes(b"\xff\xfe fps: 1")
+    stats = TreeStats()
+    (result,) = analyze_tree(tmp_path, ["*.yaml"], stats=stats)
+    assert result.error and result.error.startswith("UnicodeDecodeError")
+    assert stats.errors == 1
+
+
+def test_analyzer_analyze_tree_forwards_node_limits(tmp_path: Path) -> None:
+    (tmp_path / "rec.json").write_text(
+        '{"events": [{"fps": 1}, {"fps": 2}, {"fps": 3}], "a": 1, "b": 2}',
+        encoding="utf-8",
+    )
+    sc = SemanticConfigAnalyzer()
+
+    def nodes(**limits: int) -> int:
+        (result,) = sc.analyze_tree(tmp_path, workers=1, documents=True, **limits)
+        assert result.document is not None
+        return len(result.document.nodes)
+
+    assert nodes() == 5
+    assert nodes(sample_arrays=1) == 3
+    assert nodes(max_nodes=2) == 2
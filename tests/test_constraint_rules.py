@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from maus.python.core.constraint_rules import (
+    CONSTRAINT_KEYS,
+    ConstraintRule,
+    ConstraintRules,
+)
+from maus.python.core.semantic_config import ConfigAnalysisCache, SemanticConfigAnalyzer
+
+RULES_FILE = (
+    Path(__file__).resolve().parents[1] / "src/maus/config/constraint_rules.json"
+)
+CONFIG = json.dumps(
+    {
+        "header": {"version": "1.0"},
+        "window": {"overlay": {"opacity": 0.5}, "grid": True},
+        "events": [{"zoom": 2}],
+    }
+)
+
+
+def test_shipped_rules_match_builtin_defaults() -> None:
+    shipped = ConstraintRules.from_file(RULES_FILE)
+    builtin = ConstraintRules.default()
+    assert {(r.tag, r.keywords) for r in shipped.rules} == set(CONSTRAINT_KEYS)
+    doc = SemanticConfigAnalyzer().analyze_text(CONFIG, "c.json")
+    assert SemanticConfigAnalyzer(shipped).infer_constraints(doc) == (
+        SemanticConfigAnalyzer(builtin).infer_constraints(doc)
+    )
+
+
+def test_weights_threshold_and_path_patterns() -> None:
+    rules = ConstraintRules.from_dict(
+        {
+            "threshold": 1.5,
+            "rules": [
+                {"tag": "#Data", "keywords": ["version"], "path": "header.*"},
+                {"tag": "#Data", "keywords": "events", "weight": 0.4},
+                {"tag": "#Data", "keywords": ["zoom"], "path": "$.events[*].*"},
+                {"tag": "#Window", "keywords": ["opacity"], "weight": 2},
+                {"tag": "#Window", "keywords": ["grid"], "weight": -1},
+                {"tag": "#Never", "keywords": ["zoom"], "path": "**.window.*"},
+            ],
+        }
+    )
+    assert rules.needs_paths
+    sc = SemanticConfigAnalyzer(rules)
+    doc = sc.analyze_text(CONFIG, "c.json")
+    fired = rules.fire(doc.nodes, lambda n: n.name, lambda n: n.path)
+    assert rules.scores(fired) == {"#Data": 2.0, "#Window": 1.0}
+    assert sc.infer_constraints(doc) == ["#Data"]
+    assert sc.constraints_for_text(CONFIG, "c.json") == ["#Data"]
+    with pytest.raises(ValueError, match="invalid rule #0"):
+        ConstraintRules.from_dict({"rules": [{"keywords": ["x"]}]})
+
+
+def test_many_rules_and_sampled_streams(tmp_path: Path) -> None:
+    rules = ConstraintRules(
+        [ConstraintRule(f"#T{i}", frozenset({f"key{i}"})) for i in range(500)]
+        + [ConstraintRule("#Late", frozenset({"zoom"}), path="$.events[*].zoom")]
+    )
+    sc = SemanticConfigAnalyzer(rules)
+    events = [{"key7": 1}] * 20 + [{"zoom": 1, "key499": 2}]
+    path = tmp_path / "rec.json"
+    path.write_text(json.dumps({"events": events}), encoding="utf-8")
+
+    sampled = sc.analyze_file(path, sample_arrays=5)
+    assert sampled.metadata["skipped_rules"] == ["#Late:500", "#T499:499", "#T7:7"]
+    expected = ["#Late", "#T499", "#T7"]
+    assert sc.infer_constraints(sampled) == expected
+    assert sc.infer_constraints(sc.analyze_file(path)) == expected
+    assert sc.constraints_for_file(path) == expected
+
+
+def test_cache_is_keyed_by_rules_version(tmp_path: Path) -> None:
+    yaml_rules = tmp_path / "rules.yaml"
+    yaml_rules.write_text(
+        "rules:\n  - tag: '#Custom'\n    keywords: [zoom]\n", encoding="utf-8"
+    )
+    custom = ConstraintRules.from_file(yaml_rules)
+    assert custom.version != ConstraintRules.default().version
+
+    cache = ConfigAnalysisCache(SemanticConfigAnalyzer())
+    assert "#BerryTimeline" in cache.constraints(CONFIG)
+    cache.analyzer.rules = custom
+    assert cache.constraints(CONFIG) == ["#Custom"]
+    assert cache.stats.misses == 2
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from maus.python.analysis.doc_snapshot import DocSnapshotBuilder, parse_markdown
+
+DOC = """# Title
+intro
+
+## Setup
+```json
+{"grid": 100}
+```
+
+## Setup
+```python
+# not a heading
+print("hi")
+```
+"""
+
+
+def test_parse_markdown_structure() -> None:
+    nodes = parse_markdown("Docs/a.md", DOC)
+    assert [(n.id, n.type) for n in nodes] == [
+        ("Docs/a.md", "DOCUMENT"),
+        ("Docs/a.md#title", "SECTION"),
+        ("Docs/a.md#setup:block1", "DATA"),
+        ("Docs/a.md#setup", "SECTION"),
+        ("Docs/a.md#setup-1:block1", "FUNCTION"),
+        ("Docs/a.md#setup-1", "SECTION"),
+    ]
+
+
+def test_builder_reuses_unchanged_files(tmp_path: Path) -> None:
+    docs = tmp_path / "Docs"
+    (docs / "sub").mkdir(parents=True)
+    (docs / "a.md").write_text(DOC, encoding="utf-8")
+    (docs / "sub" / "b.md").write_text("# B\nbody\n", encoding="utf-8")
+    cache = tmp_path / "cache.json"
+
+    first = DocSnapshotBuilder(docs, cache)
+    nodes = first.build()
+    first.save_cache()
+    assert first.stats.parsed == 2
+    assert [n.id for n in nodes] == sorted(n.id for n in nodes)
+
+    b = docs / "sub" / "b.md"
+    b.write_text("# B\nedited\n", encoding="utf-8")
+    os.utime(docs / "a.md", ns=(0, 0))  # touched but identical content
+    second = DocSnapshotBuilder(docs, cache)
+    nodes2 = second.build()
+    assert (second.stats.parsed, second.stats.rehashed) == (1, 1)
+    assert {n.id for n in nodes2} == {n.id for n in nodes}
+
+    b.unlink()
+    third = DocSnapshotBuilder(docs, cache)
+    third.build()
+    assert third.stats.removed == 1 and third.stats.files == 1
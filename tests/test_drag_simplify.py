@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from maus.python.core.drag_simplify import (
+    StreamingDragSimplifier,
+    simplify_events,
+    sync_deviation,
+)
+from maus.python.core.event_pipeline import EventPipeline, RawMouseEvent
+from maus.python.core.mathematic_grid import ScreenSpec
+from maus.python.core.maus_data_map import Action, Event, Grid
+
+
+def _evt(i: int, x: float, y: float, kind: str = "drag") -> Event:
+    return Event(
+        id=f"e{i}",
+        time=i * 10,
+        grid=Grid(x, y),
+        action=Action(type=kind, button="left", modifiers=[]),
+    )
+
+
+def _drag_with_corner() -> list[Event]:
+    events = [_evt(0, 0, 0, "click")]
+    events += [_evt(i, float(i), 0.0) for i in range(1, 21)]
+    events += [_evt(20 + i, 20.0, float(i)) for i in range(1, 21)]
+    events.append(_evt(41, 20, 20, "release"))
+    return events
+
+
+def _max_dev(original: list[Event], kept: list[Event]) -> float:
+    kept_ids = {e.id for e in kept}
+    worst = 0.0
+    for e in original:
+        if e.id in kept_ids or e.action.type != "drag":
+            continue
+        prev = max((k for k in kept if k.time < e.time), key=lambda k: k.time)
+        nxt = min((k for k in kept if k.time > e.time), key=lambda k: k.time)
+        worst = max(worst, sync_deviation(e, prev, nxt))
+    return worst
+
+
+def test_batch_keeps_endpoints_and_corner() -> None:
+    events = _drag_with_corner()
+    out, stats = simplify_events(events, tolerance=0.5)
+    ids = [e.id for e in out]
+    assert ids == ["e0", "e1", "e20", "e40", "e41"]
+    assert stats.events_in == 40 and stats.events_out == 3
+    assert stats.max_deviation <= 0.5
+
+
+def test_batch_max_gap_splits_long_segments() -> None:
+    events = [_evt(i, float(i), 0.0) for i in range(50)]
+    out, _ = simplify_events(events, tolerance=0.5, max_gap_ms=100)
+    assert out[0] is events[0] and out[-1] is events[-1]
+    assert all(b.time - a.time <= 100 for a, b in zip(out, out[1:], strict=False))
+
+
+def test_streaming_pipeline_simplifies_drag() -> None:
+    simplifier = StreamingDragSimplifier(tolerance=0.5)
+    pipe = EventPipeline(
+        ScreenSpec(128, 128), grid_size=128, time_scale=1.0, simplifier=simplifier
+    )
+    t0 = pipe.start_ms
+    for i in range(30):
+        pipe.process(
+            RawMouseEvent(
+                x=i, y=i, button="left", type="drag", modifiers=[], timestamp_ms=t0 + i
+            )
+        )
+    mdm = pipe.snapshot()
+    assert [(e.grid.x, e.grid.y) for e in mdm.events] == [(0.0, 0.0), (29.0, 29.0)]
+    pipe.process(
+        RawMouseEvent(
+            x=29, y=29, button="left", type="release", modifiers=[], timestamp_ms=t0
+        )
+    )
+    assert [e.action.type for e in pipe.events] == ["drag", "drag", "release"]
+    assert simplifier.stats.events_in == 30 and simplifier.stats.events_out == 2
+
+
+def test_streaming_respects_tolerance() -> None:
+    events = _drag_with_corner()
+    simplifier = StreamingDragSimplifier(tolerance=0.5, max_buffer=8)
+    out: list[Event] = []
+    for e in events:
+        out.extend(simplifier.push(e))
+    out.extend(simplifier.flush())
+    assert out[0].id == "e0" and out[1].id == "e1"
+    assert out[-2].id == "e40" and out[-1].id == "e41"
+    assert _max_dev(events, out) <= 0.5
+    assert simplifier.stats.max_deviation <= 0.5
+    assert simplifier.stats.events_out == len(out) - 2
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from maus.python.core import embedding_store, encoder
+from maus.python.core.embedding_store import EmbeddingStore, split_sections
+from maus.python.core.encoder import TransformerEncoder
+
+
+def _docs(root: Path) -> None:
+    (root / "user").mkdir(parents=True)
+    (root / "timeline.md").write_text(
+        "Intro text\n# Timeline [#BerryTimeline]\nzoom levels and playback speed\n"
+        "```\n# not a heading\n```\n## Selection\nselection ranges\n",
+        encoding="utf-8",
+    )
+    (root / "user" / "window.md").write_text(
+        "# Overlay\noverlay opacity clickthrough grid\n# Permissions\n"
+        "accessibility screen recording permission\n",
+        encoding="utf-8",
+    )
+
+
+def test_split_sections_at_headings_outside_fences() -> None:
+    text = "Intro\n# A [#Tag]\nbody\n```\n# code\n```\n# A\nmore"
+    sections = split_sections(text, "doc.md")
+    assert [s.id for s in sections] == ["doc.md#", "doc.md#A", "doc.md#A~2"]
+    assert sections[0].title == "doc.md"
+    assert sections[1].tags == ["#Tag"] and "# code" in sections[1].text
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_store_search_and_incremental_update(
+    tmp_path: Path, use_numpy: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if not use_numpy:
+        monkeypatch.setattr(embedding_store, "_np", None)
+        monkeypatch.setattr(encoder, "_np", None)
+    monkeypatch.setattr(embedding_store, "SEARCH_BLOCK", 2)
+    docs = tmp_path / "Docs"
+    _docs(docs)
+    enc = TransformerEncoder(dim=256, positional=False)
+    store = EmbeddingStore(tmp_path / "docs.emb", enc)
+
+    first = store.update(docs)
+    assert (first.added, first.encoded, first.sections) == (2, 5, 5)
+    hits = store.search_text("overlay opacity grid", k=3)
+    assert [sid for sid, _ in hits][0] == "user/window.md#Overlay"
+    assert hits[0][1] > hits[1][1] >= hits[2][1]
+    tagged = store.search_tagged(enc.encode("zoom levels playback"), k=1)
+    assert tagged == [
+        ("timeline.md#Timeline", pytest.approx(tagged[0][1]), ["#BerryTimeline"])
+    ]
+
+    # Unchanged tree: nothing re-encoded; a reopened store sees the same rows
+    assert store.update(docs).encoded == 0
+    reopened = EmbeddingStore(tmp_path / "docs.emb", enc)
+    assert reopened.load() and reopened.ids == store.ids
+    assert reopened.search_text("selection ranges", k=3) == store.search_text(
+        "selection ranges", k=3
+    )
+    assert not EmbeddingStore(tmp_path / "docs.emb", TransformerEncoder(128)).load()
+
+    (docs / "timeline.md").write_text("# Playback\nplayback speed\n", encoding="utf-8")
+    (docs / "user" / "window.md").unlink()
+    (docs / "new.md").write_text("# Grid\ngrid snapping\n", encoding="utf-8")
+    old_mapping = reopened._mm
+    stats = reopened.update(docs)
+    assert old_mapping is not None and old_mapping.closed
+    assert (stats.changed, stats.deleted, stats.added, stats.encoded) == (1, 1, 1, 2)
+    assert reopened.ids == ["new.md#Grid", "timeline.md#Playback"]
+    assert reopened.search_text("grid snapping", k=1)[0][0] == "new.md#Grid"
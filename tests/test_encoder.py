@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from maus.python.core import encoder
+from maus.python.core.encoder import TransformerEncoder
+
+TEXTS = ["Timeline zoom levels", "", "overlay opacity overlay grid", "a " * 300]
+
+
+def test_encode_batch_matches_encode_and_fallback(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    enc = TransformerEncoder(dim=64)
+    matrix = enc.encode_batch(TEXTS)
+    assert matrix.shape == (4, 64) and matrix.dtype.name == "float32"
+    for row, text in zip(matrix, TEXTS, strict=True):
+        assert row.tolist() == enc.encode(text).tolist()
+    assert matrix[1].sum() == 0 and matrix[3].sum() == 300
+
+    monkeypatch.setattr(encoder, "_np", None)
+    assert [enc.encode(t) for t in TEXTS] == matrix.tolist()
+    assert enc.encode_batch(TEXTS) == matrix.tolist()
+
+
+def test_encode_is_stable_across_processes() -> None:
+    code = (
+        "from maus.python.core.encoder import TransformerEncoder;"
+        "v = TransformerEncoder(97).encode('stable hashing across workers');"
+        "print([i for i, x in enumerate(v) if x])"
+    )
+    outputs = set()
+    for seed in ("1", "2"):
+        env = {**os.environ, "PYTHONHASHSEED": seed, "PYTHONPATH": "src"}
+        out = subprocess.run(
+            [sys.executable, "-c", code], env=env, capture_output=True, text=True
+        )
+        assert out.returncode == 0, out.stderr
+        outputs.add(out.stdout)
+    assert outputs == {"[44, 47, 94]\n"}
+
+
+def test_bag_of_words_mode_ignores_token_order() -> None:
+    enc = TransformerEncoder(dim=64, positional=False)
+    a, b = enc.encode_batch(["zoom timeline grid", "grid zoom timeline"])
+    assert a.tolist() == b.tolist() == enc.encode("timeline grid zoom").tolist()
+    positional = TransformerEncoder(dim=64)
+    assert (
+        positional.encode("zoom grid").tolist()
+        != positional.encode("grid zoom").tolist()
+    )
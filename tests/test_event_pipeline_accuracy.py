@@ -80,3 +80,22 @@ def test_pipeline_corners_and_out_of_bounds() -> None:
 
     # OOB high should be >= grid_size (or clamped to grid_size if implemented later)
     assert oob.grid.x >= 100 and oob.grid.y >= 100
+
+
+def test_pipeline_batch_matches_per_event() -> None:
+    screen = ScreenSpec(1920, 1080)
+    single = EventPipeline(screen, grid_size=100, time_scale=1.0)
+    batch = EventPipeline(screen, grid_size=100, time_scale=1.0)
+    batch.start_ms = single.start_ms
+    raws = [
+        RawMouseEvent(
+            x=x, y=y, button="left", type="move", modifiers=[], timestamp_ms=x
+        )
+        for x, y in [(0, 0), (960, 540), (1919, 1079), (-10, 2000)]
+    ]
+    for raw in raws:
+        single.process(raw)
+    batch.process_batch(raws)
+    assert [(e.grid, e.time) for e in single.events] == [
+        (e.grid, e.time) for e in batch.events
+    ]
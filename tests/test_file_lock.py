@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from maus.python.core.file_lock import FileLock
+
+
+def test_lock_excludes_other_holders_until_released(tmp_path: Path) -> None:
+    path = tmp_path / "models" / "x.lock"
+    with FileLock(path) as held:
+        assert held.locked and path.exists()
+        with pytest.raises(TimeoutError):
+            FileLock(path, timeout=0.1).acquire()
+
+        code = (
+            "import sys;from maus.python.core.file_lock import FileLock;"
+            "lock = FileLock(sys.argv[1], timeout=0.1)\n"
+            "try:\n    lock.acquire()\nexcept TimeoutError:\n    sys.exit(3)"
+        )
+        env = {**os.environ, "PYTHONPATH": "src"}
+        out = subprocess.run([sys.executable, "-c", code, str(path)], env=env)
+        assert out.returncode == 3
+    assert not held.locked
+
+    again = FileLock(path, timeout=0.1)
+    with again:
+        assert again.waited < 0.1
+        with pytest.raises(RuntimeError):
+            again.acquire()
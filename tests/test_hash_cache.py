@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from maus.python.analysis.ast_diff import hash_content
+from maus.python.analysis.hash_cache import HashCache, fill_content_hashes
+
+
+def _nodes(n: int) -> list[dict]:
+    return [
+        {"id": f"n{i}", "path": f"Docs/{i}.md", "content": f"body {i}", "mtime": 1}
+        for i in range(n)
+    ]
+
+
+def test_fill_content_hashes_parallel_matches_serial() -> None:
+    nodes = _nodes(200)
+    stats = fill_content_hashes(nodes, workers=4)
+    assert stats.hashed == 200
+    assert all(n["content_hash"] == hash_content(n["content"]) for n in nodes)
+
+
+def test_hash_cache_round_trip(tmp_path: Path) -> None:
+    cache_path = tmp_path / "hashes.json"
+    cache = HashCache(cache_path)
+    first = fill_content_hashes(_nodes(10), cache)
+    assert first.cache_misses == 10
+    cache.save()
+
+    nodes = _nodes(10)
+    nodes[0]["mtime"] = 2
+    nodes[0]["content"] = "edited"
+    nodes.append({"id": "x", "path": "x.md", "content": "no mtime"})
+    stats = fill_content_hashes(nodes, HashCache(cache_path))
+    assert stats.cache_hits == 9 and stats.cache_misses == 1
+    assert stats.uncacheable == 1 and stats.hashed == 2
+    assert nodes[0]["content_hash"] == hash_content("edited")
+
+
+def test_sibling_nodes_of_one_file_get_their_own_hashes(tmp_path: Path) -> None:
+    def siblings() -> list[dict]:
+        return [
+            {"id": "a", "path": "f.py", "mtime": 1, "content": "x=1"},
+            {"id": "b", "path": "f.py", "mtime": 1, "content": "y=2"},
+        ]
+
+    cache = HashCache(tmp_path / "hashes.json")
+    nodes = siblings()
+    assert fill_content_hashes(nodes, cache).hashed == 2
+    cache.save()
+    again = siblings()
+    stats = fill_content_hashes(again, HashCache(tmp_path / "hashes.json"))
+    assert stats.cache_hits == 2
+    for batch in (nodes, again):
+        assert [n["content_hash"] for n in batch] == [
+            hash_content("x=1"),
+            hash_content("y=2"),
+        ]
+
+
+def test_repeated_keys_in_one_run_are_deduplicated_not_hits(tmp_path: Path) -> None:
+    nodes = _nodes(3) + _nodes(3)
+    stats = fill_content_hashes(nodes, HashCache(tmp_path / "hashes.json"))
+    assert stats.cache_misses == 3 and stats.deduplicated == 3
+    assert stats.cache_hits == 0 and stats.hit_rate == 0.0
+    assert stats.hashed == 3
+    assert all(n["content_hash"] == hash_content(n["content"]) for n in nodes)
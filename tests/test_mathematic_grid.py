@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+import pytest
+
+from maus.python.core import mathematic_grid
 from maus.python.core.mathematic_grid import (
+    Display,
+    ScreenLayout,
     ScreenSpec,
     map_timestamp_to_timeline,
     normalized_to_grid,
@@ -26,3 +31,36 @@ def test_map_timestamp_to_timeline() -> None:
     assert t == 100.0
     t2 = map_timestamp_to_timeline(2000, 1000, 2.0)
     assert t2 == 500.0
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_screen_layout_single_display_matches_scalar(
+    use_numpy: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if not use_numpy:
+        monkeypatch.setattr(mathematic_grid, "_np", None)
+    spec = ScreenSpec(1920, 1080)
+    layout = ScreenLayout.single(spec)
+    xs = [0, 1, 959, 960, 1919, 1920, -10, 2000, 37]
+    ys = [0, 1, 539, 540, 1079, 1080, -5, 1200, 1013]
+    m = layout.map_pixels(xs, ys, 100)
+    for i, (x, y) in enumerate(zip(xs, ys, strict=True)):
+        xn, yn = pixel_to_normalized(x, y, spec)
+        gx, gy = normalized_to_grid(xn, yn, 100)
+        assert int(m.display[i]) == 0
+        assert float(m.xn[i]) == xn and float(m.yn[i]) == yn
+        assert int(m.gx[i]) == gx and int(m.gy[i]) == gy
+
+
+def test_screen_layout_multi_display_hidpi() -> None:
+    layout = ScreenLayout(
+        [
+            Display(2880, 1800, origin=(0, 0), scale=2.0),
+            Display(1920, 1080, origin=(1440, 0)),
+        ]
+    )
+    m = layout.map_pixels([720, 1440 + 960, 5000], [450, 540, 100], 100)
+    assert [int(d) for d in m.display] == [0, 1, 1]
+    assert float(m.xn[0]) == 0.5 and float(m.yn[0]) == 0.5
+    assert int(m.gx[1]) == 50 and int(m.gy[1]) == 50
+    assert layout.locate(-50, 10) == 0
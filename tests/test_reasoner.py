@@ -1,14 +1,44 @@
 from __future__ import annotations
 
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from maus.python.analysis.bayesian_extractor import BayesianRuleExtractor, TrainStats
+from maus.python.core.constraint_rules import ConstraintRules
 from maus.python.core.neural_symbolic_reasoner import (
     Context,
     NeuralSymbolicReasoner,
     UserProfile,
+    normalize_query,
 )
 
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def _write_docs(docs: Path) -> Path:
+    docs.mkdir(exist_ok=True)
+    (docs / "a.md").write_text("# A [#BerryTimeline]\ntimeline zoom", encoding="utf-8")
+    (docs / "b.md").write_text("# B [#BerryWindow]\noverlay opacity", encoding="utf-8")
+    return docs
+
+
+def _reasoner(tmp_path: Path, background: bool = False) -> NeuralSymbolicReasoner:
+    """A reasoner that trains on, and stores its model under, tmp_path."""
+    return NeuralSymbolicReasoner(
+        background,
+        docs_root=_write_docs(tmp_path / "Docs"),
+        model_dir=tmp_path / "models",
+    )
 
-def test_reasoner_semantic_constraints_added() -> None:
-    r = NeuralSymbolicReasoner()
+
+def test_reasoner_semantic_constraints_added(tmp_path: Path) -> None:
+    r = _reasoner(tmp_path)
     ctx = Context(
         current_state="idle",
         user_profile=UserProfile(
@@ -23,9 +53,9 @@ def test_reasoner_semantic_constraints_added() -> None:
     assert intent.logical_constraints is not None
 
 
-def test_reasoner_bayes_constraints_when_distribution() -> None:
-    r = NeuralSymbolicReasoner()
-    # Force model path invalid to lazy-train; ensure doesn't crash
+def test_reasoner_bayes_constraints_when_distribution(tmp_path: Path) -> None:
+    r = _reasoner(tmp_path)
+    # No model in tmp_path yet: the first query trains one from the docs
     ctx = Context(
         current_state="idle",
         user_profile=UserProfile(
@@ -36,4 +66,197 @@ def test_reasoner_bayes_constraints_when_distribution() -> None:
         ),
     )
     intent = r.understand_intent("timeline zoom levels", ctx)
-    assert isinstance(intent.logical_constraints, list)
+    assert "#BerryTimeline" in intent.logical_constraints
+    assert r.startup.model_source == "trained"
+    assert (tmp_path / "models" / "bayes_tags.nbin").exists()
+
+
+def test_background_warm_up_answers_degraded_until_ready(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    release = threading.Event()
+    ensure = NeuralSymbolicReasoner._ensure_bayes_trained
+
+    def slow_ensure(self: NeuralSymbolicReasoner) -> str:
+        release.wait(10)
+        return ensure(self)
+
+    monkeypatch.setattr(NeuralSymbolicReasoner, "_ensure_bayes_trained", slow_ensure)
+    r = _reasoner(tmp_path, background=True)
+    ctx = Context(
+        current_state="idle",
+        user_profile=UserProfile("clean", "beginner", "low", "soon"),
+        config_text='{"fps": 60}',
+    )
+    early = r.understand_intent("timeline zoom levels", ctx)
+    assert not r.ready and early.degraded
+    assert early.logical_constraints == ["#Performance"] and early.optimal_path == []
+
+    release.set()
+    assert r.wait_until_ready(10)
+    late = r.understand_intent("timeline zoom levels", ctx)
+    assert not late.degraded and "#Performance" in late.logical_constraints
+    stats = r.startup.to_dict()
+    assert stats["degraded_answers"] == 1 and stats["model_source"]
+    assert stats["first_answer_seconds"] <= stats["ready_seconds"]
+
+
+def test_failed_background_warm_up_still_becomes_ready(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def broken_ensure(self: NeuralSymbolicReasoner) -> str:
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(NeuralSymbolicReasoner, "_ensure_bayes_trained", broken_ensure)
+    r = _reasoner(tmp_path, background=True)
+    assert r.wait_until_ready(10)
+    assert r.startup.model_source == "unavailable"
+    assert r.startup.error == "RuntimeError: disk on fire"
+    ctx = Context(
+        current_state="idle",
+        user_profile=UserProfile("clean", "beginner", "low", "soon"),
+        config_text='{"fps": 60}',
+    )
+    intent = r.understand_intent("timeline zoom levels", ctx)
+    assert not intent.degraded and "#Performance" in intent.logical_constraints
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_truncated_model_file_is_retrained(tmp_path: Path, background: bool) -> None:
+    models = tmp_path / "models"
+    models.mkdir()
+    # Magic intact, but shorter than the header offsets that follow it
+    (models / "bayes_tags.nbin").write_bytes(b"MAUSNB\x00\x01\x00\x00\x00\x00")
+    r = _reasoner(tmp_path, background)
+    ctx = Context(
+        current_state="idle",
+        user_profile=UserProfile("clean", "beginner", "low", "soon"),
+    )
+    if background:
+        assert r.wait_until_ready(10)
+    intent = r.understand_intent("timeline zoom levels", ctx)
+    assert r.startup.model_source == "trained" and r.startup.error is None
+    assert not intent.degraded and "#BerryTimeline" in intent.logical_constraints
+    assert (models / "bayes_tags.nbin").stat().st_size > 24
+
+
+def test_import_and_construction_defer_heavy_modules() -> None:
+    code = (
+        "import sys;"
+        "from maus.python.core.neural_symbolic_reasoner import NeuralSymbolicReasoner;"
+        "r = NeuralSymbolicReasoner();"
+        "heavy = {'numpy', 'yaml', 'maus.python.analysis.bayesian_extractor'};"
+        "print(sorted(heavy & set(sys.modules)), r.ready)"
+    )
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout == "[] False\n"
+
+
+def test_concurrent_warm_ups_train_the_model_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    trains = []
+    train = BayesianRuleExtractor.train_incremental
+
+    def counted(self: BayesianRuleExtractor, *args: Path) -> TrainStats:
+        trains.append(threading.get_ident())
+        time.sleep(0.2)  # keep the others queued on the lock
+        return train(self, *args)
+
+    monkeypatch.setattr(BayesianRuleExtractor, "train_incremental", counted)
+    reasoners = []
+    for _ in range(4):
+        reasoners.append(_reasoner(tmp_path))
+    threads = [threading.Thread(target=r.warm_up) for r in reasoners]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(30)
+
+    sources = sorted(r.startup.model_source for r in reasoners)
+    assert len(trains) == 1 and sources == ["trained", "waited", "waited", "waited"]
+    assert len({r.startup.model_version for r in reasoners}) == 1
+    assert max(r.startup.lock_wait_seconds for r in reasoners) > 0.1
+    assert sorted(p.name for p in (tmp_path / "models").iterdir()) == [
+        "bayes_tags.lock",
+        "bayes_tags.manifest.json",
+        "bayes_tags.nbin",
+        "doc_embeddings.emb",
+        "doc_embeddings.lock",
+    ]
+
+
+def test_intent_cache_hits_invalidates_and_expires(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    r = _reasoner(tmp_path)
+    r.intent_cache.ttl = 60.0
+    profile = UserProfile("clean", "beginner", "low", "soon")
+    ctx = Context("idle", profile, config_text='{"fps": 60}')
+
+    first = r.understand_intent("Timeline zoom levels", ctx)
+    again = r.understand_intent("  timeline ZOOM levels? ", ctx)
+    stats = r.intent_cache.stats
+    assert (stats.hits, stats.misses) == (1, 1)
+    assert again.explicit_goal == "  timeline ZOOM levels? "
+    assert again.logical_constraints == first.logical_constraints
+    assert again.optimal_path == first.optimal_path
+    again.logical_constraints.append("#Mutated")
+    expert = UserProfile("terse", "expert", "high", "now")
+    other = Context("idle", expert, config_text='{"fps": 60}')
+    third = r.understand_intent("timeline zoom levels", other)
+    assert "#Mutated" not in third.logical_constraints
+    assert third.user_profile is other.user_profile and stats.hits == 2
+
+    # A different config is a different entry
+    r.understand_intent("timeline zoom levels", Context("idle", profile, "{}"))
+    assert stats.misses == 2 and len(r.intent_cache) == 2
+
+    clock[0] += 61
+    r.understand_intent("timeline zoom levels", ctx)
+    assert stats.expired == 1 and stats.misses == 3
+
+    # New rules (or a retrained model) drop every entry
+    rules = ConstraintRules.from_dict({"rules": [{"tag": "#X", "keywords": ["fps"]}]})
+    r.semantic.rules = rules
+    assert "#X" in r.understand_intent("timeline zoom levels", ctx).logical_constraints
+    assert stats.invalidations == 2 and len(r.intent_cache) == 1
+    assert stats.hit_rate == pytest.approx(2 / 6)
+    assert stats.to_dict()["hit_rate"] == 0.3333
+
+
+def test_normalize_query() -> None:
+    assert normalize_query(" Timeline, ZOOM-levels? ") == "timeline zoom levels"
+    assert normalize_query("Zoom \u212a") == "Zoom \u212a"  # Kelvin sign
+
+
+def test_intent_cache_drops_entries_when_the_model_is_retrained(
+    tmp_path: Path,
+) -> None:
+    r = _reasoner(tmp_path)
+    ctx = Context("idle", UserProfile("clean", "beginner", "low", "soon"))
+    r.understand_intent("timeline zoom", ctx)
+    r.understand_intent("timeline zoom", ctx)
+    stats = r.intent_cache.stats
+    assert (stats.hits, stats.misses, len(r.intent_cache)) == (1, 1, 1)
+
+    # Swap the bodies: the same tags and per-label totals, different counts
+    docs = tmp_path / "Docs"
+    swapped = {
+        "a.md": "# A [#BerryTimeline]\noverlay opacity",
+        "b.md": "# B [#BerryWindow]\ntimeline zoom",
+    }
+    for name, text in swapped.items():
+        (docs / name).write_text(text, encoding="utf-8")
+    old_version = r.bayesian.model_version
+    r.bayesian.train_incremental(docs, tmp_path / "models" / "bayes_tags.manifest.json")
+    assert r.bayesian.model_version != old_version
+
+    r.understand_intent("timeline zoom", ctx)
+    assert stats.invalidations == 1 and (stats.hits, stats.misses) == (1, 2)
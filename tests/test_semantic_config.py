@@ -1,6 +1,20 @@
 from __future__ import annotations
 
-from maus.python.core.semantic_config import SemanticConfigAnalyzer
+import io
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from maus.python.core.json_stream import JsonLeafStream
+from maus.python.core.semantic_config import (
+    ConfigAnalysisCache,
+    PathTrail,
+    SemanticConfigAnalyzer,
+    SemanticDocument,
+    SemanticNode,
+)
 
 
 def test_semantic_constraints_detection() -> None:
@@ -9,3 +23,148 @@ def test_semantic_constraints_detection() -> None:
     doc = sc.analyze_text(text, filename="config.json")
     tags = sc.infer_constraints(doc)
     assert "#BerryTimeline" in tags or "#MausDataMap" in tags
+
+
+def test_walker_names_paths_and_depth() -> None:
+    text = '{"header": {"version": "1"}, "events": [{"fps": 30}, 7], "a b": 1}'
+    sc = SemanticConfigAnalyzer()
+    doc = sc.analyze_text(text, filename="config.json")
+    assert [(n.name, n.path, n.depth) for n in doc.nodes] == [
+        ("version", "$.header.version", 2),
+        ("fps", "$.events[0].fps", 3),
+        ("1", "$.events[1]", 2),
+        ("b", "$.a b", 1),
+    ]
+    assert doc.nodes[0].importance == 1.3
+
+
+def test_semantic_node_renders_path_from_trail_once() -> None:
+    trail = PathTrail(PathTrail(None, "events"), 0)
+    node = SemanticNode("events", "int", None, 1.0, 2, trail)
+    assert node._path is None and node.path == "$.events[0]"
+    assert node._path == "$.events[0]"
+    assert node == SemanticNode("events", "int", "$.events[0]", 1.0, 2)
+    assert pickle.loads(pickle.dumps(node)) == node
+    assert SemanticNode("root", "str", None, 1.0).path == "$"
+
+
+def test_walker_handles_deep_configs_and_limits() -> None:
+    deep: dict = {}
+    cursor = deep
+    for _ in range(5000):  # far beyond the recursion limit
+        cursor["k"] = {}
+        cursor = cursor["k"]
+    cursor["zoom"] = 2
+    sc = SemanticConfigAnalyzer()
+    (leaf,) = sc.iter_nodes(deep)
+    assert leaf.name == "zoom" and leaf.depth == 5001
+
+    flat = "{" + ", ".join(f'"k{i}": {i}' for i in range(100)) + "}"
+    doc = sc.analyze_text(flat, filename="c.json", max_nodes=10)
+    assert len(doc.nodes) == 10 and doc.metadata["truncated"]
+    assert "truncated" not in sc.analyze_text(flat, "c.json", max_nodes=100).metadata
+
+
+def test_constraints_for_text_matches_document_path() -> None:
+    text = '{"timeline": {"zoom": 2}, "overlay": {"opacity": 0.5}, "fps": 60}'
+    sc = SemanticConfigAnalyzer()
+    expected = sc.infer_constraints(sc.analyze_text(text, filename="c.json"))
+    assert sc.constraints_for_text(text, filename="c.json") == expected
+    assert sc.constraints_for_text(text, filename="c.json", max_nodes=1) == [
+        "#BerryTimeline"
+    ]
+
+
+def test_config_analysis_cache_hits_evicts_and_invalidates() -> None:
+    calls: list[str] = []
+
+    class CountingAnalyzer(SemanticConfigAnalyzer):
+        def _parse(self, text: str, file_type: str) -> object:
+            calls.append(text)
+            return super()._parse(text, file_type)
+
+    cache = ConfigAnalysisCache(CountingAnalyzer(), max_entries=2)
+    a, b, c = '{"fps": 1}', '{"zoom": 2}', '{"opacity": 3}'
+
+    doc, tags = cache.analyze(a, "c.json")
+    assert tags == ["#Performance"] and doc.nodes[0].name == "fps"
+    assert cache.analyze(a, "c.json") == (doc, tags)
+    assert calls == [a]  # the repeat skipped parsing entirely
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    cache.constraints(b, "c.json")
+    cache.constraints(a, "c.json")  # refreshes a, so b is least recent
+    cache.constraints(c, "c.json")
+    assert cache.stats.evictions == 1 and len(cache) == 2
+    cache.constraints(b, "c.json")
+    assert calls == [a, b, c, b]
+
+    assert cache.invalidate(c, "c.json") == 1
+    assert cache.invalidate() == 1
+    assert len(cache) == 0 and cache.stats.invalidations == 2
+
+
+def _node_view(doc: SemanticDocument) -> list[tuple]:
+    return [(n.name, n.value_type, n.path, n.depth, n.importance) for n in doc.nodes]
+
+
+def test_streamed_json_matches_full_parse(tmp_path: Path) -> None:
+    data = {
+        "header": {"version": "1.0", "fps": 60.0, "a.b": None},
+        "events": [{"t": i, "x": [i, -1.5e3, True], "k": "q\\\"é"} for i in range(50)],
+        "empty": {},
+        "grid": [],
+    }
+    text = json.dumps(data, indent=1)
+    path = tmp_path / "rec.maus"
+    path.write_text(text, encoding="utf-8")
+    sc = SemanticConfigAnalyzer()
+    full = sc.analyze_text(text, filename="rec.json")
+
+    streamed = sc.analyze_file(path)
+    assert streamed.metadata["streamed"]
+    assert _node_view(streamed) == _node_view(full)
+    # Chunk boundaries land inside keys, strings, numbers and escapes
+    for chunk in (16, 17, 23):
+        leaves = JsonLeafStream(io.StringIO(text), chunk_size=chunk)
+        got = [(name, vt, t.render() if t else "$", d) for name, vt, t, d, _ in leaves]
+        assert got == [(n, vt, p, d) for n, vt, p, d, _ in _node_view(full)]
+    assert sc.constraints_for_file(path) == sc.infer_constraints(full)
+
+
+def test_streamed_json_numbers_split_at_every_chunk_offset(tmp_path: Path) -> None:
+    events = [
+        {"t": 1697040000.123 + i, "fps": 12345678.25, "e": -6.02214076e-23, "n": i}
+        for i in range(20)
+    ]
+    text = json.dumps({"header": {"version": 1, "scale": 2.5e10}, "events": events})
+    path = tmp_path / "rec.maus"
+    path.write_text(text, encoding="utf-8")
+    sc = SemanticConfigAnalyzer()
+    full = sc.analyze_text(text, filename="rec.json")
+    want = [(n, vt, p, d) for n, vt, p, d, _ in _node_view(full)]
+    # A chunk may end right after the integer part, the "." or the "e-"
+    for chunk in range(16, 48):
+        leaves = JsonLeafStream(io.StringIO(text), chunk_size=chunk)
+        got = [(name, vt, t.render() if t else "$", d) for name, vt, t, d, _ in leaves]
+        assert got == want, chunk
+    assert sc.constraints_for_file(path) == sc.infer_constraints(full)
+
+
+def test_streamed_json_sampling_keeps_constraint_tags(tmp_path: Path) -> None:
+    events = [{"t": i} for i in range(100)] + [{"zoom": 2, "opacity": 1}]
+    path = tmp_path / "rec.json"
+    path.write_text(json.dumps({"events": events}), encoding="utf-8")
+    sc = SemanticConfigAnalyzer()
+
+    doc = sc.analyze_file(path, sample_arrays=3)
+    assert [n.path for n in doc.nodes] == [f"$.events[{i}].t" for i in range(3)]
+    assert doc.metadata["skipped_leaves"] == 99
+    assert sc.infer_constraints(doc) == ["#BerryTimeline", "#BerryWindow"]
+    assert sc.infer_constraints(sc.analyze_file(path)) == sc.infer_constraints(doc)
+
+    assert sc.analyze_file(path, max_nodes=2).metadata["truncated"]
+    path.write_text('{"fps": 1, "zoom": }', encoding="utf-8")
+    assert sc.analyze_file(path).nodes == []
+    with pytest.raises(ValueError):
+        list(JsonLeafStream('{"fps": 1, "zoom": }'))